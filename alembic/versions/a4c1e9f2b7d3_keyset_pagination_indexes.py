@@ -0,0 +1,28 @@
+"""keyset pagination indexes
+
+Revision ID: a4c1e9f2b7d3
+Revises: d3e81674cc60
+Create Date: 2026-10-16 10:12:41.208113
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4c1e9f2b7d3'
+down_revision: Union[str, None] = 'd3e81674cc60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_causes_created_at_id', 'causes', ['created_at', 'id'], unique=False)
+    op.create_index('ix_donations_user_id_id', 'donations', ['user_id', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_donations_user_id_id', table_name='donations')
+    op.drop_index('ix_causes_created_at_id', table_name='causes')
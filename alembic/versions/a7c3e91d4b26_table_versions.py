@@ -0,0 +1,33 @@
+"""table versions
+
+Revision ID: a7c3e91d4b26
+Revises: e2f7c4a9d815
+Create Date: 2026-10-16 19:42:31.207518
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7c3e91d4b26'
+down_revision: Union[str, None] = 'e2f7c4a9d815'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'table_versions',
+        sa.Column('table_name', sa.String(), nullable=False),
+        sa.Column('shard', sa.Integer(), nullable=False),
+        sa.Column('version', sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint('table_name', 'shard'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('table_versions')
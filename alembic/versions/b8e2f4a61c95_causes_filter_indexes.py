@@ -0,0 +1,35 @@
+"""causes filter indexes
+
+Revision ID: b8e2f4a61c95
+Revises: a4c1e9f2b7d3
+Create Date: 2026-10-16 11:03:27.514902
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8e2f4a61c95'
+down_revision: Union[str, None] = 'a4c1e9f2b7d3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_causes_institute_active_created',
+        'causes',
+        ['institute_id', 'is_active', 'created_at', 'id'],
+        unique=False,
+    )
+    op.create_index(
+        'ix_causes_active_created', 'causes', ['is_active', 'created_at', 'id'], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_causes_active_created', table_name='causes')
+    op.drop_index('ix_causes_institute_active_created', table_name='causes')
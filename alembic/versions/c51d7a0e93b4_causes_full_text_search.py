@@ -0,0 +1,84 @@
+"""causes full text search
+
+Revision ID: c51d7a0e93b4
+Revises: b8e2f4a61c95
+Create Date: 2026-10-16 12:21:09.873140
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c51d7a0e93b4'
+down_revision: Union[str, None] = 'b8e2f4a61c95'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        # Generated column: filled for existing rows and kept up to date by Postgres
+        op.execute(
+            """
+            ALTER TABLE causes ADD COLUMN search_vector tsvector
+            GENERATED ALWAYS AS (
+                setweight(to_tsvector('simple', coalesce(title, '')), 'A')
+                || setweight(to_tsvector('simple', coalesce(description, '')), 'B')
+            ) STORED
+            """
+        )
+        op.execute('CREATE INDEX ix_causes_search_vector ON causes USING GIN (search_vector)')
+    elif dialect == 'sqlite':
+        op.execute(
+            """
+            CREATE VIRTUAL TABLE causes_fts USING fts5(
+                title, description, content='causes', content_rowid='id',
+                tokenize='unicode61 remove_diacritics 2'
+            )
+            """
+        )
+        op.execute(
+            """
+            CREATE TRIGGER causes_fts_ai AFTER INSERT ON causes BEGIN
+                INSERT INTO causes_fts (rowid, title, description)
+                VALUES (new.id, new.title, new.description);
+            END
+            """
+        )
+        op.execute(
+            """
+            CREATE TRIGGER causes_fts_ad AFTER DELETE ON causes BEGIN
+                INSERT INTO causes_fts (causes_fts, rowid, title, description)
+                VALUES ('delete', old.id, old.title, old.description);
+            END
+            """
+        )
+        op.execute(
+            """
+            CREATE TRIGGER causes_fts_au AFTER UPDATE OF title, description ON causes
+            BEGIN
+                INSERT INTO causes_fts (causes_fts, rowid, title, description)
+                VALUES ('delete', old.id, old.title, old.description);
+                INSERT INTO causes_fts (rowid, title, description)
+                VALUES (new.id, new.title, new.description);
+            END
+            """
+        )
+        # Index the causes that already exist
+        op.execute("INSERT INTO causes_fts (causes_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        op.execute('DROP INDEX IF EXISTS ix_causes_search_vector')
+        op.execute('ALTER TABLE causes DROP COLUMN IF EXISTS search_vector')
+    elif dialect == 'sqlite':
+        op.execute('DROP TRIGGER IF EXISTS causes_fts_au')
+        op.execute('DROP TRIGGER IF EXISTS causes_fts_ad')
+        op.execute('DROP TRIGGER IF EXISTS causes_fts_ai')
+        op.execute('DROP TABLE IF EXISTS causes_fts')
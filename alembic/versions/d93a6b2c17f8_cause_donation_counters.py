@@ -0,0 +1,46 @@
+"""cause donation counters
+
+Revision ID: d93a6b2c17f8
+Revises: c51d7a0e93b4
+Create Date: 2026-10-16 14:02:51.390417
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd93a6b2c17f8'
+down_revision: Union[str, None] = 'c51d7a0e93b4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'cause_donation_counters',
+        sa.Column('cause_id', sa.Integer(), nullable=False),
+        sa.Column('shard', sa.Integer(), nullable=False),
+        sa.Column('donations_count', sa.Integer(), nullable=False),
+        sa.Column('paid_count', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['cause_id'], ['causes.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('cause_id', 'shard'),
+    )
+    # Backfill the counters of existing donations into shard 0
+    op.execute(
+        """
+        INSERT INTO cause_donation_counters (cause_id, shard, donations_count, paid_count)
+        SELECT donations.cause_id, 0, count(donations.id),
+               sum(CASE WHEN donations.is_paid THEN 1 ELSE 0 END)
+        FROM donations
+        JOIN causes ON causes.id = donations.cause_id
+        GROUP BY donations.cause_id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('cause_donation_counters')
@@ -0,0 +1,35 @@
+"""
+Deletes the expired idempotency keys.
+
+Expired keys are already ignored and reclaimed by new requests; this command
+only keeps the table small. Run it periodically, e.g. from cron.
+
+Usage
+-----
+    python -m app.commands.purge_idempotency_keys
+"""
+
+import argparse
+
+from app.infra.db.database import SessionLocal
+from app.infra.logger.config import logger
+from app.modules.idempotency.repository import IdempotencyRepository
+
+
+def main() -> None:
+    """
+    Deletes the expired keys and logs how many were removed.
+    """
+    argparse.ArgumentParser(description=__doc__.split("\n\n", maxsplit=1)[0].strip()).parse_args()
+
+    db = SessionLocal()
+    try:
+        purged = IdempotencyRepository(db).purge_expired()
+    finally:
+        db.close()
+
+    logger.info("Expired idempotency keys purged: %s", purged)
+
+
+if __name__ == "__main__":
+    main()
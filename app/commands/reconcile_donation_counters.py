@@ -0,0 +1,44 @@
+"""
+Recomputes the per-cause donation counters from the donations table.
+
+The counters are maintained incrementally by the donation writes; this command
+rebuilds them from scratch, e.g. after a manual data fix or a restore.
+
+Usage
+-----
+    python -m app.commands.reconcile_donation_counters [--dry-run]
+"""
+
+import argparse
+
+from app.infra.db.database import SessionLocal
+from app.infra.logger.config import logger
+from app.modules.cause.repository import DonationCounterRepository
+
+
+def main() -> None:
+    """
+    Runs the reconciliation and logs how many causes had wrong counters.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n", maxsplit=1)[0].strip())
+    parser.add_argument(
+        "--dry-run", action="store_true", help="only report the causes with wrong counters"
+    )
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        report = DonationCounterRepository(db).reconcile(dry_run=args.dry_run)
+    finally:
+        db.close()
+
+    logger.info(
+        "Donation counters reconciled: %s causes, %s wrong, %s corrected",
+        report["causes"],
+        report["wrong"],
+        report["corrected"],
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Marks the donations listed in a payment settlement file as paid.
+
+The file holds donation ids, one per line, or is a CSV file with a `donation_id`
+(or `id`) column. Donations are updated with set-based UPDATEs in chunks of
+DONATION_RECONCILE_CHUNK_SIZE ids, each chunk being committed on its own.
+
+Usage
+-----
+    python -m app.commands.reconcile_payments SETTLEMENT [--institute-id ID]
+"""
+
+import argparse
+
+from app.infra.db.database import SessionLocal
+from app.infra.logger.config import logger
+from app.modules.donation.repository import DonationRepository
+from app.modules.donation.settlement import SettlementReconciliation
+
+
+def main() -> None:
+    """
+    Runs the reconciliation and logs how many donations were matched, changed and missing.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n", maxsplit=1)[0].strip())
+    parser.add_argument(
+        "settlement",
+        type=argparse.FileType(encoding="utf-8-sig"),
+        help="the settlement file, or - for standard input",
+    )
+    parser.add_argument(
+        "--institute-id", type=int, help="only update the donations to this institute's causes"
+    )
+    args = parser.parse_args()
+
+    reconciliation = SettlementReconciliation()
+    with args.settlement as settlement, SessionLocal() as db:
+        repository = DonationRepository(db)
+        for line in settlement:
+            try:
+                chunk = reconciliation.add(line.rstrip("\r\n"))
+            except ValueError as e:
+                raise SystemExit(str(e)) from e
+            if chunk:
+                reconciliation.record(repository.mark_paid(chunk, institute_id=args.institute_id))
+
+        chunk = reconciliation.finish()
+        if chunk:
+            reconciliation.record(repository.mark_paid(chunk, institute_id=args.institute_id))
+
+    report = reconciliation.report
+    logger.info(
+        "Payments reconciled: %s received, %s matched, %s changed, %s missing, %s invalid",
+        report["received"],
+        report["matched"],
+        report["changed"],
+        report["missing"],
+        report["invalid"],
+    )
+
+
+if __name__ == "__main__":
+    main()
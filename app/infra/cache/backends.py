@@ -0,0 +1,269 @@
+"""
+Storage backends of the cache.
+
+A backend stores opaque values under string keys, with an optional TTL. Each
+operation exists in a sync and an async (`a`-prefixed) flavour, so the cache can
+be used from the repositories, which are sync code, and from coroutines.
+
+`MemoryBackend` keeps the values in a bounded LRU in the worker process.
+`RedisBackend` shares them between processes through any server speaking the
+Redis protocol; it needs the optional `redis` package.
+"""
+
+import importlib.util
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence
+
+from sqlalchemy.util import await_only
+from sqlalchemy.util.concurrency import in_greenlet
+
+REDIS_AVAILABLE = importlib.util.find_spec("redis") is not None
+if REDIS_AVAILABLE:
+    import redis
+    import redis.asyncio
+else:
+    redis = None
+
+# What a backend raises when the server can't be reached or a value can't be
+# (un)pickled; the cache falls back to computing the values on these
+BACKEND_ERRORS = (OSError, pickle.PickleError) + ((redis.RedisError,) if redis else ())
+
+
+class MemoryBackend:
+    """
+    Bounded, thread-safe LRU store with per-entry TTLs.
+
+    Values are kept as is, without being copied or serialized, so callers must not
+    mutate the values they store or get back.
+
+    Attributes
+    ----------
+    max_size : int
+        Maximum number of entries kept; the least recently used entry is evicted
+        when the store is full.
+    """
+
+    def __init__(self, max_size: int) -> None:
+        self.max_size = max_size
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def get_many(self, keys: Sequence[str]) -> List[Any]:
+        """
+        Returns the values stored under keys, None for the unknown or expired ones.
+        """
+        now = time.monotonic()
+        values = []
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is not None and entry[0] is not None and entry[0] <= now:
+                    del self._entries[key]
+                    entry = None
+                if entry is None:
+                    values.append(None)
+                    continue
+                self._entries.move_to_end(key)
+                values.append(entry[1])
+        return values
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """
+        Stores a value, for `ttl` seconds or until evicted.
+        """
+        with self._lock:
+            self._store(key, value, ttl)
+
+    def add(self, key: str, value: Any) -> bool:
+        """
+        Stores a value without TTL unless the key already holds one.
+
+        Returns
+        -------
+        bool
+            True if the value was stored.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (entry[0] is None or entry[0] > time.monotonic()):
+                return False
+            self._store(key, value, None)
+            return True
+
+    def set_many(self, values: Dict[str, Any]) -> None:
+        """
+        Stores several values without TTL.
+        """
+        with self._lock:
+            for key, value in values.items():
+                self._store(key, value, None)
+
+    def delete(self, keys: Sequence[str]) -> None:
+        """
+        Removes keys.
+        """
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self, prefix: str) -> None:
+        """
+        Removes every key starting with `prefix`.
+        """
+        with self._lock:
+            for key in [key for key in self._entries if key.startswith(prefix)]:
+                del self._entries[key]
+
+    def _store(self, key: str, value: Any, ttl: Optional[float]) -> None:
+        if self.max_size <= 0:
+            return
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    # Nothing to wait for: the async flavour runs the same code
+
+    async def aget_many(self, keys: Sequence[str]) -> List[Any]:
+        return self.get_many(keys)
+
+    async def aset(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        self.set(key, value, ttl)
+
+    async def aadd(self, key: str, value: Any) -> bool:
+        return self.add(key, value)
+
+    async def aset_many(self, values: Dict[str, Any]) -> None:
+        self.set_many(values)
+
+    async def adelete(self, keys: Sequence[str]) -> None:
+        self.delete(keys)
+
+    async def aclear(self, prefix: str) -> None:
+        self.clear(prefix)
+
+    async def aclose(self) -> None:
+        pass
+
+    def stats(self) -> dict:
+        """
+        Returns the size of the store.
+        """
+        with self._lock:
+            return {
+                "backend": "memory",
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "evictions": self.evictions,
+            }
+
+
+class RedisBackend:
+    """
+    Store on a Redis-protocol server, values being pickled.
+
+    It holds a sync and an async client. The sync methods are also called from
+    repositories running on an `AsyncSession` (inside `run_sync`); there they await
+    the async client through the session's greenlet instead of blocking the event
+    loop on the sync one.
+
+    Attributes
+    ----------
+    client : redis.Redis
+        The sync client.
+    async_client : redis.asyncio.Redis
+        The async client.
+    """
+
+    def __init__(self, client, async_client) -> None:
+        self.client = client
+        self.async_client = async_client
+
+    @classmethod
+    def from_url(cls, url: str) -> "RedisBackend":
+        """
+        Connects to the server at `url`, e.g. redis://localhost:6379/0.
+        """
+        return cls(redis.Redis.from_url(url), redis.asyncio.Redis.from_url(url))
+
+    def get_many(self, keys: Sequence[str]) -> List[Any]:
+        if in_greenlet():
+            return await_only(self.aget_many(keys))
+        return [_loads(value) for value in self.client.mget(keys)]
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        if in_greenlet():
+            await_only(self.aset(key, value, ttl))
+            return
+        self.client.set(key, pickle.dumps(value), px=_milliseconds(ttl))
+
+    def add(self, key: str, value: Any) -> bool:
+        if in_greenlet():
+            return await_only(self.aadd(key, value))
+        return bool(self.client.set(key, pickle.dumps(value), nx=True))
+
+    def set_many(self, values: Dict[str, Any]) -> None:
+        if in_greenlet():
+            await_only(self.aset_many(values))
+            return
+        self.client.mset({key: pickle.dumps(value) for key, value in values.items()})
+
+    def delete(self, keys: Sequence[str]) -> None:
+        if in_greenlet():
+            await_only(self.adelete(keys))
+            return
+        if keys:
+            self.client.delete(*keys)
+
+    def clear(self, prefix: str) -> None:
+        if in_greenlet():
+            await_only(self.aclear(prefix))
+            return
+        keys = list(self.client.scan_iter(match=f"{prefix}*"))
+        if keys:
+            self.client.delete(*keys)
+
+    async def aget_many(self, keys: Sequence[str]) -> List[Any]:
+        return [_loads(value) for value in await self.async_client.mget(keys)]
+
+    async def aset(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        await self.async_client.set(key, pickle.dumps(value), px=_milliseconds(ttl))
+
+    async def aadd(self, key: str, value: Any) -> bool:
+        return bool(await self.async_client.set(key, pickle.dumps(value), nx=True))
+
+    async def aset_many(self, values: Dict[str, Any]) -> None:
+        await self.async_client.mset({key: pickle.dumps(value) for key, value in values.items()})
+
+    async def adelete(self, keys: Sequence[str]) -> None:
+        if keys:
+            await self.async_client.delete(*keys)
+
+    async def aclear(self, prefix: str) -> None:
+        keys = [key async for key in self.async_client.scan_iter(match=f"{prefix}*")]
+        if keys:
+            await self.async_client.delete(*keys)
+
+    async def aclose(self) -> None:
+        """
+        Closes the connections of both clients.
+        """
+        self.client.close()
+        await self.async_client.aclose()
+
+    def stats(self) -> dict:
+        return {"backend": "redis"}
+
+
+def _loads(value: Optional[bytes]) -> Any:
+    return pickle.loads(value) if value is not None else None
+
+
+def _milliseconds(ttl: Optional[float]) -> Optional[int]:
+    return max(1, int(ttl * 1000)) if ttl is not None else None
@@ -0,0 +1,357 @@
+"""
+Read-through cache of query results, with tag-based invalidation.
+
+Values are computed by `get_or_set` (or `aget_or_set` from coroutines) on a
+miss and kept for a TTL under a namespaced key. Each value can carry tags, e.g.
+`cause:42`; writes call `invalidate` with the tags they affect after committing,
+which drops every value carrying one of them.
+
+Tags are versioned rather than tracked: a tag is a key holding a random token,
+stored along with the value when it is cached, and invalidating the tag replaces
+the token. A value whose tokens no longer match is a miss. Invalidation is thus
+a single write whatever the number of values tagged, and a value computed from
+data read before a write can't be stored as current after it, since it carries
+the tokens read before the invalidation.
+
+To avoid a stampede of recomputations when a popular value expires, values are
+refreshed early with the XFetch algorithm: a reader may recompute a value
+before its expiry, with a probability rising as the expiry gets closer and as the
+value takes longer to compute (`CACHE_EARLY_REFRESH_BETA` scales it, 0 disables
+it). In-process, concurrent async misses of a key are also coalesced.
+
+The cache never fails a request: when the backend is unreachable, values are
+computed as if nothing were cached.
+"""
+
+import math
+import random
+import time
+import uuid
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Hashable,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+)
+
+from app.config.env_variables import (
+    CACHE_BACKEND,
+    CACHE_EARLY_REFRESH_BETA,
+    CACHE_KEY_PREFIX,
+    CACHE_MAX_SIZE,
+    CACHE_REDIS_URL,
+    CACHE_TTL_SECONDS,
+)
+from app.infra.concurrency.singleflight import SingleFlight
+from app.infra.logger.config import logger
+
+from .backends import BACKEND_ERRORS, REDIS_AVAILABLE, MemoryBackend, RedisBackend
+
+T = TypeVar("T")
+
+
+class Cache:
+    """
+    Namespaced read-through cache over a `MemoryBackend` or a `RedisBackend`.
+
+    Attributes
+    ----------
+    backend : MemoryBackend or RedisBackend, optional
+        Where values are stored; None disables caching.
+    prefix : str
+        Prefix of every key, so that several applications can share a server.
+    ttl : float
+        Default time to live of the values, in seconds.
+    beta : float
+        Weight of the early refresh; 0 disables it.
+    """
+
+    def __init__(
+        self, backend, prefix: str = "cache", ttl: float = 60, beta: float = 1.0
+    ) -> None:
+        self.backend = backend
+        self.prefix = prefix
+        self.ttl = ttl
+        self.beta = beta
+        self._flight = SingleFlight("cache")
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.early_refreshes = 0
+        self.invalidations = 0
+        self.errors = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend is not None
+
+    # ttl and tags are keyword-only options, after the three arguments naming the value
+    def get_or_set(  # pylint: disable=too-many-arguments
+        self,
+        namespace: str,
+        key: Hashable,
+        fn: Callable[[], T],
+        *,
+        ttl: Optional[float] = None,
+        tags: Sequence[str] = (),
+    ) -> T:
+        """
+        Returns the cached value of a key, computing and storing it on a miss.
+
+        Parameters
+        ----------
+        namespace : str
+            The kind of value, e.g. `cause`.
+        key : Hashable
+            Identifies the value within the namespace, e.g. the ID of the cause; tuples
+            of arguments are fine.
+        fn : Callable[[], Any]
+            Computes the value. Exceptions are not cached.
+        ttl : float, optional
+            Time to live of the value, in seconds (default is the cache's TTL).
+        tags : Sequence[str], optional
+            Tags whose invalidation drops the value.
+
+        Returns
+        -------
+        Any
+            The cached or computed value.
+        """
+        if not self.enabled:
+            return fn()
+
+        cache_key, tag_keys = self._key(namespace, key), self._tag_keys(tags)
+        try:
+            hit, value, tokens = self._lookup(self.backend.get_many([cache_key, *tag_keys]))
+            if hit:
+                return value
+            if None in tokens:
+                tokens = self._init_tags(tag_keys, tokens)
+        except BACKEND_ERRORS as e:
+            self._error("read", e)
+            return fn()
+
+        started = time.monotonic()
+        value = fn()
+        entry = self._entry(value, time.monotonic() - started, ttl, tokens)
+        try:
+            self.backend.set(cache_key, entry, ttl or self.ttl)
+        except BACKEND_ERRORS as e:
+            self._error("write", e)
+        return value
+
+    # ttl and tags are keyword-only options, after the three arguments naming the value
+    async def aget_or_set(  # pylint: disable=too-many-arguments
+        self,
+        namespace: str,
+        key: Hashable,
+        fn: Callable[[], Awaitable[T]],
+        *,
+        ttl: Optional[float] = None,
+        tags: Sequence[str] = (),
+    ) -> T:
+        """
+        Async version of `get_or_set`, where `fn` is a coroutine function.
+
+        Concurrent misses of the same key in this process share a single call of `fn`.
+        """
+        if not self.enabled:
+            return await fn()
+
+        cache_key, tag_keys = self._key(namespace, key), self._tag_keys(tags)
+        try:
+            hit, value, tokens = self._lookup(
+                await self.backend.aget_many([cache_key, *tag_keys])
+            )
+            if hit:
+                return value
+        except BACKEND_ERRORS as e:
+            self._error("read", e)
+            return await fn()
+
+        async def compute():
+            nonlocal tokens
+            try:
+                if None in tokens:
+                    tokens = await self._ainit_tags(tag_keys, tokens)
+            except BACKEND_ERRORS as e:
+                self._error("read", e)
+                return await fn()
+
+            started = time.monotonic()
+            value = await fn()
+            entry = self._entry(value, time.monotonic() - started, ttl, tokens)
+            try:
+                await self.backend.aset(cache_key, entry, ttl or self.ttl)
+            except BACKEND_ERRORS as e:
+                self._error("write", e)
+            return value
+
+        return await self._flight.do(cache_key, compute)
+
+    def invalidate(self, *tags: str) -> None:
+        """
+        Drops every value carrying one of the tags.
+
+        Call it after committing the write that changed the cached data.
+        """
+        if not self.enabled or not tags:
+            return
+        try:
+            self.backend.set_many({key: _new_token() for key in self._tag_keys(tags)})
+            self.invalidations += len(tags)
+        except BACKEND_ERRORS as e:
+            self._error("invalidate", e)
+
+    async def ainvalidate(self, *tags: str) -> None:
+        """
+        Async version of `invalidate`.
+        """
+        if not self.enabled or not tags:
+            return
+        try:
+            await self.backend.aset_many({key: _new_token() for key in self._tag_keys(tags)})
+            self.invalidations += len(tags)
+        except BACKEND_ERRORS as e:
+            self._error("invalidate", e)
+
+    def delete(self, namespace: str, key: Hashable) -> None:
+        """
+        Drops a value.
+        """
+        if not self.enabled:
+            return
+        try:
+            self.backend.delete([self._key(namespace, key)])
+        except BACKEND_ERRORS as e:
+            self._error("delete", e)
+
+    async def adelete(self, namespace: str, key: Hashable) -> None:
+        """
+        Async version of `delete`.
+        """
+        if not self.enabled:
+            return
+        try:
+            await self.backend.adelete([self._key(namespace, key)])
+        except BACKEND_ERRORS as e:
+            self._error("delete", e)
+
+    def clear(self) -> None:
+        """
+        Drops every value and tag of the cache.
+        """
+        if self.enabled:
+            self.backend.clear(f"{self.prefix}:")
+
+    async def aclose(self) -> None:
+        """
+        Closes the connections of the backend.
+        """
+        if self.enabled:
+            await self.backend.aclose()
+
+    def _key(self, namespace: str, key: Hashable) -> str:
+        if isinstance(key, tuple):
+            key = ":".join(map(str, key))
+        return f"{self.prefix}:{namespace}:{key}"
+
+    def _tag_keys(self, tags: Sequence[str]) -> Tuple[str, ...]:
+        return tuple(f"{self.prefix}:tag:{tag}" for tag in tags)
+
+    def _lookup(self, values: list) -> Tuple[bool, Any, tuple]:
+        entry, tokens = values[0], tuple(values[1:])
+        if entry is None:
+            self.misses += 1
+            return False, None, tokens
+
+        value, expires_at, delta, entry_tokens = entry
+        if entry_tokens != tokens:
+            self.stale += 1
+            self.misses += 1
+            return False, None, tokens
+        # XFetch: -log(u) is exponentially distributed, so the earlier before the expiry,
+        # the less likely the refresh
+        refresh_at = expires_at + delta * self.beta * math.log(1.0 - random.random())
+        if self.beta and time.time() >= refresh_at:
+            self.early_refreshes += 1
+            self.misses += 1
+            return False, None, tokens
+
+        self.hits += 1
+        return True, value, tokens
+
+    def _init_tags(self, tag_keys: Tuple[str, ...], tokens: tuple) -> tuple:
+        # A tag never invalidated, or evicted, gets a token before the value is stored
+        # with it; if another reader set one meanwhile, theirs is kept
+        for key, token in zip(tag_keys, tokens):
+            if token is None:
+                self.backend.add(key, _new_token())
+        return tuple(self.backend.get_many(tag_keys))
+
+    async def _ainit_tags(self, tag_keys: Tuple[str, ...], tokens: tuple) -> tuple:
+        for key, token in zip(tag_keys, tokens):
+            if token is None:
+                await self.backend.aadd(key, _new_token())
+        return tuple(await self.backend.aget_many(tag_keys))
+
+    def _entry(self, value: Any, delta: float, ttl: Optional[float], tokens: tuple) -> tuple:
+        return (value, time.time() + (ttl or self.ttl), delta, tokens)
+
+    def _error(self, operation: str, error: Exception) -> None:
+        self.errors += 1
+        logger.warning("Cache %s failed: %s", operation, error)
+
+    def stats(self) -> dict:
+        """
+        Returns the cache counters.
+
+        Returns
+        -------
+        dict
+            Hits and misses, the misses due to an invalidated tag or an early refresh,
+            the tags invalidated, backend errors and the backend's own stats.
+        """
+        return {
+            "enabled": self.enabled,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "stale": self.stale,
+            "early_refreshes": self.early_refreshes,
+            "invalidations": self.invalidations,
+            "errors": self.errors,
+            "backend": self.backend.stats() if self.enabled else None,
+            "flight": self._flight.stats(),
+        }
+
+
+def _new_token() -> str:
+    return uuid.uuid4().hex
+
+
+def build_backend(name: str):
+    """
+    Builds the backend named by CACHE_BACKEND: "memory", "redis" or "none".
+    """
+    if name == "none":
+        return None
+    if name == "redis":
+        if not REDIS_AVAILABLE:
+            raise RuntimeError('CACHE_BACKEND="redis" needs the redis package')
+        return RedisBackend.from_url(CACHE_REDIS_URL)
+    if name == "memory":
+        return MemoryBackend(max_size=CACHE_MAX_SIZE)
+    raise ValueError(f"Unknown CACHE_BACKEND: {name}")
+
+
+cache = Cache(
+    build_backend(CACHE_BACKEND),
+    prefix=CACHE_KEY_PREFIX,
+    ttl=CACHE_TTL_SECONDS,
+    beta=CACHE_EARLY_REFRESH_BETA,
+)
@@ -0,0 +1,100 @@
+"""
+Single-flight execution of concurrent identical calls.
+
+When several coroutines ask for the same key while a call for that key is
+already running, they wait for the running call instead of starting their own,
+and all of them receive its result or its exception. Nothing is cached: once
+the call finishes, the next request for the key starts a new one.
+"""
+
+import asyncio
+from typing import Awaitable, Callable, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls sharing a key into one in-flight execution.
+
+    Attributes
+    ----------
+    name : str
+        Name reported in the metrics.
+    calls : int
+        Number of calls received.
+    executions : int
+        Number of calls that actually ran.
+    coalesced : int
+        Number of calls that joined an execution already in flight.
+    errors : int
+        Number of executions that raised.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self._in_flight: dict = {}
+        self.calls = 0
+        self.executions = 0
+        self.coalesced = 0
+        self.errors = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        Runs `fn` for `key`, or joins the execution already running for it.
+
+        The execution runs in its own task, so a caller being cancelled does not
+        cancel the work the other callers are waiting on.
+
+        Parameters
+        ----------
+        key : Hashable
+            Identifies calls that can share a result.
+        fn : Callable[[], Awaitable]
+            Coroutine function producing the result.
+
+        Returns
+        -------
+        Any
+            The result of the shared execution.
+
+        Raises
+        ------
+        Exception
+            Whatever the shared execution raised.
+        """
+        self.calls += 1
+        task = self._in_flight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            self.executions += 1
+            task = asyncio.ensure_future(fn())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done: self._done(key, done))
+        return await asyncio.shield(task)
+
+    def _done(self, key: Hashable, task: asyncio.Future) -> None:
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        if not task.cancelled() and task.exception() is not None:
+            self.errors += 1
+
+    def stats(self) -> dict:
+        """
+        Returns the coalescing counters.
+
+        Returns
+        -------
+        dict
+            Calls received, executions, coalesced calls, errors and the number of
+            executions currently in flight.
+        """
+        return {
+            "name": self.name,
+            "calls": self.calls,
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+            "errors": self.errors,
+            "in_flight": len(self._in_flight),
+        }
@@ -0,0 +1,25 @@
+"""
+Helpers for the background tasks started with the application.
+"""
+
+import asyncio
+from typing import Optional
+
+
+async def cancel_task(task: Optional[asyncio.Task]) -> None:
+    """
+    Cancels a background task and waits until it has stopped.
+
+    Parameters
+    ----------
+    task : asyncio.Task, optional
+        The task to cancel; None is ignored, so callers can pass a task that was never
+        started.
+    """
+    if task is None:
+        return
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
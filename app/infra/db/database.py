@@ -1,19 +1,145 @@
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from app.config.env_variables import (
+    ASYNC_DATABASE_URL,
+    DATABASE_REPLICA_URLS,
+    DATABASE_URL,
+    DB_MAX_OVERFLOW,
+    DB_MODE,
+    DB_POOL_PRE_PING,
+    DB_POOL_RECYCLE,
+    DB_POOL_SIZE,
+    DB_POOL_TIMEOUT,
+    REPLICA_HEALTH_CHECK_INTERVAL,
+)
+
+from .pool_metrics import PoolMetrics
+from .routing import Replica, ReplicaSet, RoutingSession
+
+
+def pool_options(metrics: PoolMetrics, pool_class: type = QueuePool) -> dict:
+    """
+    Builds the connection pool arguments of an engine from the configuration.
+
+    Parameters
+    ----------
+    metrics : PoolMetrics
+        The metrics the pool reports its checkout wait times to.
+    pool_class : type
+        The pool class to instrument.
+
+    Returns
+    -------
+    dict
+        Keyword arguments for `create_engine`/`create_async_engine`.
+    """
+    return {
+        "poolclass": metrics.pool_class(pool_class),
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+
+
+def create_instrumented_engine(name: str, url: str):
+    """
+    Creates a sync engine whose pool reports to `PoolMetrics(name)`.
+    """
+    metrics = PoolMetrics(name)
+    new_engine = create_engine(url, **pool_options(metrics))
+    metrics.attach(new_engine)
+    return new_engine
+
+
+def create_instrumented_async_engine(name: str, url: str):
+    """
+    Creates an async engine whose pool reports to `PoolMetrics(name)`.
+    """
+    metrics = PoolMetrics(name)
+    new_engine = create_async_engine(url, **pool_options(metrics, AsyncAdaptedQueuePool))
+    metrics.attach(new_engine.sync_engine)
+    return new_engine
 
-from app.config.env_variables import DATABASE_URL
 
 # Create the SQLAlchemy engine
-engine = create_engine(DATABASE_URL)
+engine = create_instrumented_engine("primary", DATABASE_URL)
 
-# Create a local session factory, bound to the engine
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Read replicas, used by the repository methods marked as read-only
+replica_set = ReplicaSet(
+    [
+        Replica(f"replica_{i}", create_instrumented_engine(f"replica_{i}", url))
+        for i, url in enumerate(DATABASE_REPLICA_URLS)
+    ],
+    check_interval=REPLICA_HEALTH_CHECK_INTERVAL,
+)
+
+# Create a local session factory, bound to the engine. Objects are not expired at
+# commit: writes return their rows with RETURNING, so nothing needs to be reloaded.
+SessionLocal = sessionmaker(
+    class_=RoutingSession,
+    autocommit=False,
+    autoflush=False,
+    expire_on_commit=False,
+    bind=engine,
+    replicas=replica_set,
+)
 
 # Create the declarative base class for the models to inherit from
 Base = declarative_base()
 
 
+def to_async_url(url: str) -> str:
+    """
+    Derives the URL of the async driver from a sync database URL.
+
+    Parameters
+    ----------
+    url : str
+        A sync SQLAlchemy database URL, e.g. `postgresql://...`.
+
+    Returns
+    -------
+    str
+        The same URL using the asyncpg (PostgreSQL) or aiosqlite (SQLite) driver.
+    """
+    scheme, _, rest = url.partition("://")
+    driver = {"postgresql": "postgresql+asyncpg", "sqlite": "sqlite+aiosqlite"}
+    return f"{driver.get(scheme.split('+')[0], scheme)}://{rest}"
+
+
+# In async mode, an AsyncEngine and its session factory are created alongside the sync ones
+async_engine = None
+async_replica_set = None
+AsyncSessionLocal = None
+if DB_MODE == "async":
+    async_engine = create_instrumented_async_engine(
+        "primary_async", ASYNC_DATABASE_URL or to_async_url(DATABASE_URL)
+    )
+    async_replica_set = ReplicaSet(
+        [
+            Replica(
+                f"replica_{i}_async",
+                create_instrumented_async_engine(f"replica_{i}_async", to_async_url(url)),
+            )
+            for i, url in enumerate(DATABASE_REPLICA_URLS)
+        ],
+        check_interval=REPLICA_HEALTH_CHECK_INTERVAL,
+    )
+    AsyncSessionLocal = async_sessionmaker(
+        bind=async_engine,
+        sync_session_class=RoutingSession,
+        autoflush=False,
+        expire_on_commit=False,
+        replicas=async_replica_set,
+    )
+
+
 # Dependency for database sessions
 def get_db():
     """
@@ -36,3 +162,21 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    """
+    Async counterpart of `get_db`, providing an `AsyncSession` for a single request.
+
+    Yields
+    ------
+    AsyncSession
+        An instance of the async database session.
+    """
+
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+# The session dependency used by the repositories, selected by DB_MODE
+get_session = get_async_db if DB_MODE == "async" else get_db
@@ -9,8 +9,10 @@ The `__all__` list explicitly declares the names that should be imported when
 namespace exposed by the module and prevent unintended imports.
 """
 
-from app.modules.cause.models import Cause
+from app.infra.db.versions import TableVersion
+from app.modules.cause.models import Cause, CauseDonationCounter
 from app.modules.donation.models import Donation
+from app.modules.idempotency.models import IdempotencyKey
 from app.modules.institute.models import Institute
 
 # Import models from each module
@@ -21,5 +23,8 @@ __all__ = [
     "User",
     "Donation",
     "Cause",
+    "CauseDonationCounter",
     "Institute",
+    "IdempotencyKey",
+    "TableVersion",
 ]
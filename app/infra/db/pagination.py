@@ -0,0 +1,174 @@
+"""
+Keyset (cursor) pagination.
+
+Instead of `OFFSET`, which makes the database walk and discard every row before
+the requested page, pages are selected with a `WHERE (key) > (last key seen)`
+condition on an indexed, unique ordering key such as `(created_at, id)` or
+`id`. Fetching any page therefore costs the same whatever its depth.
+
+The position of a page is handed to clients as an opaque cursor: the ordering
+key of the last row of the previous page, JSON encoded and base64url encoded.
+"""
+
+import base64
+import binascii
+import json
+from datetime import date, datetime
+from typing import Any, List, NamedTuple, Optional, Sequence
+
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Query
+
+from app.config.env_variables import PAGE_SIZE_DEFAULT, PAGE_SIZE_MAX
+
+
+class Page(NamedTuple):
+    """
+    A page of results.
+
+    Attributes
+    ----------
+    items : list
+        The rows of the page.
+    next_cursor : str, optional
+        The cursor of the following page, or None if this is the last one.
+    """
+
+    items: List[Any]
+    next_cursor: Optional[str]
+
+
+def page_size(limit: Optional[int]) -> int:
+    """
+    Caps a requested page size.
+
+    Parameters
+    ----------
+    limit : int, optional
+        The page size asked by the client.
+
+    Returns
+    -------
+    int
+        `PAGE_SIZE_DEFAULT` when no size is given, otherwise `limit` bounded to
+        `[1, PAGE_SIZE_MAX]`.
+    """
+    if not limit:
+        return PAGE_SIZE_DEFAULT
+    return max(1, min(limit, PAGE_SIZE_MAX))
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """
+    Encodes an ordering key into an opaque cursor.
+
+    Parameters
+    ----------
+    values : Sequence
+        The values of the ordering columns of the last row of a page.
+
+    Returns
+    -------
+    str
+        The cursor.
+    """
+    payload = [
+        value.isoformat() if isinstance(value, (date, datetime)) else value for value in values
+    ]
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, columns: Sequence) -> tuple:
+    """
+    Decodes a cursor back into the ordering key it was built from.
+
+    Parameters
+    ----------
+    cursor : str
+        The cursor sent by the client.
+    columns : Sequence
+        The ordering columns, used to restore the type of each value.
+
+    Returns
+    -------
+    tuple
+        The values of the ordering columns.
+
+    Raises
+    ------
+    ValueError
+        If the cursor is malformed or does not match the ordering columns.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+        raise ValueError("Invalid cursor") from e
+
+    if not isinstance(payload, list) or len(payload) != len(columns):
+        raise ValueError("Invalid cursor")
+
+    values = []
+    for column, value in zip(columns, payload):
+        python_type = column.type.python_type
+        try:
+            if python_type is datetime:
+                value = datetime.fromisoformat(value)
+            elif python_type is int and not isinstance(value, int):
+                raise TypeError
+        except (TypeError, ValueError) as e:
+            raise ValueError("Invalid cursor") from e
+        values.append(value)
+    return tuple(values)
+
+
+def paginate(
+    query: Query,
+    columns: Sequence,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+    descending: bool = False,
+) -> Page:
+    """
+    Fetches one page of a query, ordered by a unique key.
+
+    Parameters
+    ----------
+    query : Query
+        The query to paginate, with its filters but no ordering.
+    columns : Sequence
+        The ordering key; the last column must make it unique (usually the id).
+    cursor : str, optional
+        The cursor returned with the previous page; None for the first page.
+    limit : int, optional
+        The requested page size, capped by `page_size`.
+    descending : bool, optional
+        Whether to walk the key from the largest value down (default is False).
+
+    Returns
+    -------
+    Page
+        The rows of the page and the cursor of the next one.
+
+    Raises
+    ------
+    ValueError
+        If the cursor is invalid.
+    """
+    limit = page_size(limit)
+    key = tuple_(*columns) if len(columns) > 1 else columns[0]
+
+    if cursor:
+        values = decode_cursor(cursor, columns)
+        position = tuple_(*values) if len(values) > 1 else values[0]
+        query = query.filter(key < position if descending else key > position)
+
+    order_by = [column.desc() if descending else column.asc() for column in columns]
+    rows = query.order_by(*order_by).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor([getattr(rows[-1], column.key) for column in columns])
+    return Page(items=rows, next_cursor=next_cursor)
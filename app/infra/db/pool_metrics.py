@@ -0,0 +1,169 @@
+"""
+Instrumentation of the SQLAlchemy connection pools.
+
+Each engine gets a `PoolMetrics` fed by the pool events (connections opened,
+closed, invalidated, checked out and checked in) and by a pool subclass timing
+how long every checkout waited for a connection. The numbers are exposed on the
+internal stats endpoint to size the pool of each worker.
+"""
+
+import bisect
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+# Upper bounds, in seconds, of the checkout wait histogram buckets
+WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+# Every instrumented pool, by name
+registry: dict = {}
+
+
+class PoolMetrics:
+    """
+    Counters and checkout wait-time histogram of one connection pool.
+
+    Attributes
+    ----------
+    name : str
+        Name of the pool, e.g. "primary".
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.pool = None
+        self._lock = threading.Lock()
+        self.connections_opened = 0
+        self.connections_closed = 0
+        self.connections_invalidated = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.checkout_timeouts = 0
+        self.wait_buckets = [0] * (len(WAIT_BUCKETS) + 1)
+        self.wait_count = 0
+        self.wait_sum = 0.0
+        self.wait_max = 0.0
+        registry[name] = self
+
+    def pool_class(self, base: type) -> type:
+        """
+        Returns a subclass of `base` that records checkout wait times here.
+
+        The metrics are bound to the class rather than to the pool instance so that
+        they survive `Pool.recreate()`, e.g. when the engine is disposed.
+
+        Parameters
+        ----------
+        base : type
+            The pool class to instrument, e.g. `QueuePool`.
+
+        Returns
+        -------
+        type
+            The instrumented pool class, to pass as `poolclass` to the engine.
+        """
+        metrics = self
+
+        class InstrumentedPool(base):
+            def _do_get(self):
+                start = time.perf_counter()
+                try:
+                    return super()._do_get()
+                except PoolTimeoutError:
+                    metrics.record_timeout()
+                    raise
+                finally:
+                    metrics.observe_wait(time.perf_counter() - start)
+
+        InstrumentedPool.__name__ = f"Instrumented{base.__name__}"
+        return InstrumentedPool
+
+    def attach(self, engine) -> None:
+        """
+        Subscribes to the pool events of a (sync) engine.
+
+        Parameters
+        ----------
+        engine : Engine
+            The engine whose pool is observed; pass `AsyncEngine.sync_engine` for async engines.
+        """
+        self.pool = engine.pool
+        event.listen(engine, "connect", self._on_connect)
+        event.listen(engine, "close", self._on_close)
+        event.listen(engine, "close_detached", self._on_close)
+        event.listen(engine, "invalidate", self._on_invalidate)
+        event.listen(engine, "checkout", self._on_checkout)
+        event.listen(engine, "checkin", self._on_checkin)
+
+    def _on_connect(self, *_) -> None:
+        with self._lock:
+            self.connections_opened += 1
+
+    def _on_close(self, *_) -> None:
+        with self._lock:
+            self.connections_closed += 1
+
+    def _on_invalidate(self, *_) -> None:
+        with self._lock:
+            self.connections_invalidated += 1
+
+    def _on_checkout(self, *_) -> None:
+        with self._lock:
+            self.checkouts += 1
+
+    def _on_checkin(self, *_) -> None:
+        with self._lock:
+            self.checkins += 1
+
+    def record_timeout(self) -> None:
+        with self._lock:
+            self.checkout_timeouts += 1
+
+    def observe_wait(self, seconds: float) -> None:
+        """
+        Records how long a checkout waited for a connection.
+        """
+        with self._lock:
+            self.wait_buckets[bisect.bisect_left(WAIT_BUCKETS, seconds)] += 1
+            self.wait_count += 1
+            self.wait_sum += seconds
+            self.wait_max = max(self.wait_max, seconds)
+
+    def snapshot(self) -> dict:
+        """
+        Returns the current state of the pool and its counters.
+
+        Returns
+        -------
+        dict
+            Pool occupancy, connection churn and the checkout wait histogram, whose buckets
+            are cumulative counts keyed by their upper bound in seconds.
+        """
+        pool = self.pool
+        with self._lock:
+            cumulative = 0
+            histogram = {}
+            for bound, count in zip(WAIT_BUCKETS + ("+Inf",), self.wait_buckets):
+                cumulative += count
+                histogram[str(bound)] = cumulative
+
+            return {
+                "pool_size": pool.size() if pool is not None else None,
+                "checked_out": pool.checkedout() if pool is not None else None,
+                "checked_in": pool.checkedin() if pool is not None else None,
+                "overflow": max(pool.overflow(), 0) if pool is not None else None,
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "checkout_timeouts": self.checkout_timeouts,
+                "connections_opened": self.connections_opened,
+                "connections_closed": self.connections_closed,
+                "connections_invalidated": self.connections_invalidated,
+                "checkout_wait": {
+                    "count": self.wait_count,
+                    "sum": self.wait_sum,
+                    "max": self.wait_max,
+                    "buckets": histogram,
+                },
+            }
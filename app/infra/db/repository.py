@@ -0,0 +1,102 @@
+"""
+Awaitable access to the repositories in both database modes.
+
+Routes always `await` repository methods. In sync mode the repository runs on
+Starlette's threadpool through `ThreadedRepository`; in async mode an
+`AsyncRepository` adapter runs the same queries on an `AsyncSession` with
+`run_sync`, whose driver I/O is awaited on the event loop instead of blocking a
+worker thread.
+"""
+
+from typing import Generic, Type, TypeVar, get_args, get_origin
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+R = TypeVar("R")
+
+
+class ThreadedRepository:
+    """
+    Wraps a sync repository so that each method call runs on the threadpool.
+
+    Attributes
+    ----------
+    repository : object
+        The wrapped sync repository.
+    """
+
+    def __init__(self, repository) -> None:
+        self.repository = repository
+
+    def __getattr__(self, name: str):
+        method = getattr(self.repository, name)
+
+        async def call(*args, **kwargs):
+            return await run_in_threadpool(method, *args, **kwargs)
+
+        return call
+
+
+class AsyncRepository(Generic[R]):
+    """
+    Base class of the async repositories.
+
+    An async repository is an adapter, not a second implementation: each method of
+    the sync repository `R` is exposed as a coroutine that runs it on the
+    `AsyncSession` through `run_sync`, so queries are written once and executed by the
+    async driver. Subclasses name the repository they adapt as the type argument, e.g.
+    `class AsyncUserRepository(AsyncRepository[UserRepository])`.
+
+    Attributes
+    ----------
+    db : AsyncSession
+        The async database session used for database operations.
+    repository_class : type
+        The sync repository class, taken from the type argument.
+    """
+
+    repository_class: Type[R]
+
+    def __init_subclass__(cls, **kwargs) -> None:
+        super().__init_subclass__(**kwargs)
+        for base in getattr(cls, "__orig_bases__", ()):
+            if get_origin(base) is AsyncRepository:
+                cls.repository_class = get_args(base)[0]
+
+    def __init__(self, db: AsyncSession) -> None:
+        self.db = db
+
+    def __getattr__(self, name: str):
+        if not callable(getattr(self.repository_class, name, None)):
+            raise AttributeError(name)
+
+        async def call(*args, **kwargs):
+            return await self.db.run_sync(
+                lambda session: getattr(self.repository_class(session), name)(*args, **kwargs)
+            )
+
+        return call
+
+
+def make_repository(db, repository_class: type, async_repository_class: type):
+    """
+    Builds the awaitable repository matching the kind of session.
+
+    Parameters
+    ----------
+    db : Session or AsyncSession
+        The session provided by `get_session`.
+    repository_class : type
+        The sync repository class.
+    async_repository_class : type
+        The async repository class.
+
+    Returns
+    -------
+    ThreadedRepository or AsyncRepository
+        A repository whose methods can be awaited.
+    """
+    if isinstance(db, AsyncSession):
+        return async_repository_class(db)
+    return ThreadedRepository(repository_class(db))
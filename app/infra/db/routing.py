@@ -0,0 +1,190 @@
+"""
+Routing of read-only queries to read replicas.
+
+`RoutingSession` sends the queries issued by repository methods decorated with
+`read_only` to a healthy replica, and everything else to the primary. Once a
+session has written anything, all its later queries go to the primary so a
+request always reads its own writes. Replicas failing their periodic health
+check are skipped until they recover, falling back to the primary.
+"""
+
+import asyncio
+import functools
+import itertools
+from typing import Optional
+
+from sqlalchemy import event, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.infra.concurrency.tasks import cancel_task
+from app.infra.logger.config import logger
+
+
+class Replica:
+    """
+    A read replica and its health.
+
+    Attributes
+    ----------
+    name : str
+        Name used in logs and metrics.
+    engine : Engine or AsyncEngine
+        The engine connected to the replica.
+    healthy : bool
+        Whether the last health check succeeded.
+    """
+
+    def __init__(self, name: str, engine) -> None:
+        self.name = name
+        self.engine = engine
+        self.healthy = True
+
+    @property
+    def sync_engine(self):
+        return self.engine.sync_engine if isinstance(self.engine, AsyncEngine) else self.engine
+
+
+class ReplicaSet:
+    """
+    The replicas available to a session factory, chosen round-robin among the healthy ones.
+
+    Attributes
+    ----------
+    replicas : list[Replica]
+        The configured replicas.
+    check_interval : float
+        Number of seconds between two health checks.
+    """
+
+    def __init__(self, replicas: list, check_interval: float) -> None:
+        self.replicas = replicas
+        self.check_interval = check_interval
+        self._cycle = itertools.cycle(replicas) if replicas else None
+        self._task: Optional[asyncio.Task] = None
+
+    def choose(self) -> Optional[Replica]:
+        """
+        Returns the next healthy replica, or None if none is available.
+        """
+        for _ in range(len(self.replicas)):
+            replica = next(self._cycle)
+            if replica.healthy:
+                return replica
+        return None
+
+    def mark_unhealthy(self, replica: Replica, error: Exception) -> None:
+        if replica.healthy:
+            logger.error("Replica %s marked unhealthy: %s", replica.name, error)
+        replica.healthy = False
+
+    @staticmethod
+    def _ping(engine) -> None:
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+
+    async def check(self) -> None:
+        """
+        Runs one health check of every replica.
+        """
+        for replica in self.replicas:
+            try:
+                if isinstance(replica.engine, AsyncEngine):
+                    async with replica.engine.connect() as connection:
+                        await connection.execute(text("SELECT 1"))
+                else:
+                    await run_in_threadpool(self._ping, replica.engine)
+            except (DBAPIError, OSError) as e:
+                self.mark_unhealthy(replica, e)
+            else:
+                if not replica.healthy:
+                    logger.info("Replica %s is healthy again", replica.name)
+                replica.healthy = True
+
+    async def _run(self) -> None:
+        while True:
+            await self.check()
+            await asyncio.sleep(self.check_interval)
+
+    async def start(self) -> None:
+        """
+        Starts the periodic health checks.
+        """
+        if self.replicas and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """
+        Stops the periodic health checks.
+        """
+        await cancel_task(self._task)
+        self._task = None
+
+
+class RoutingSession(Session):
+    """
+    Session sending read-only queries to a replica and everything else to the primary.
+
+    Queries are routed to a replica only while `info["read_only"]` is set (see `read_only`)
+    and the session has not written anything yet.
+    """
+
+    def __init__(self, *args, replicas: ReplicaSet = None, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.replicas = replicas
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if (
+            self.replicas is not None
+            and self.info.get("read_only")
+            and not self.info.get("wrote")
+            and not self._flushing
+        ):
+            replica = self.replicas.choose()
+            if replica is not None:
+                self.info["replica"] = replica
+                return replica.sync_engine
+        return super().get_bind(mapper, clause=clause, **kwargs)
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def _flushed(session, _flush_context) -> None:
+    session.info["wrote"] = True
+
+
+@event.listens_for(RoutingSession, "do_orm_execute")
+def _executed(orm_execute_state) -> None:
+    if not orm_execute_state.is_select:
+        orm_execute_state.session.info["wrote"] = True
+
+
+def read_only(method):
+    """
+    Marks a repository method as read-only so its queries may be served by a replica.
+
+    If the replica fails while the method runs, it is marked unhealthy and the method is
+    retried once on the primary.
+    """
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        info = self.db.info
+        previous = info.get("read_only", False)
+        info["read_only"] = True
+        info.pop("replica", None)
+        try:
+            return method(self, *args, **kwargs)
+        except DBAPIError as e:
+            replica = info.pop("replica", None)
+            if replica is None or not isinstance(self.db, RoutingSession):
+                raise
+            self.db.replicas.mark_unhealthy(replica, e)
+            self.db.rollback()
+            info["read_only"] = False
+            return method(self, *args, **kwargs)
+        finally:
+            info["read_only"] = previous
+
+    return wrapper
@@ -0,0 +1,62 @@
+"""
+Dialect-aware statement builders shared by the repositories.
+"""
+
+from typing import Optional, Sequence
+
+from sqlalchemy import Integer, any_, literal
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.dml import Insert
+from sqlalchemy.sql.elements import ColumnElement
+
+# Dialects whose INSERT supports ON CONFLICT DO NOTHING/DO UPDATE
+ON_CONFLICT_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+def on_conflict_insert(db: Session, entity) -> Optional[Insert]:
+    """
+    Builds an INSERT supporting ON CONFLICT clauses for the database of a session.
+
+    Parameters
+    ----------
+    db : Session
+        The session the statement will be executed on.
+    entity : type or Table
+        The mapped class or table to insert into.
+
+    Returns
+    -------
+    Insert or None
+        The dialect's INSERT construct, or None if the dialect has no ON CONFLICT support,
+        in which case callers fall back to a check followed by a plain INSERT.
+    """
+    insert = ON_CONFLICT_INSERTS.get(db.get_bind().dialect.name)
+    return insert(entity) if insert is not None else None
+
+
+def in_ids(db: Session, column, ids: Sequence[int]) -> ColumnElement:
+    """
+    Builds the condition that an integer column is one of many values.
+
+    On Postgres the values are sent as a single array parameter (`column = ANY(:ids)`),
+    so the statement text and its plan do not depend on the number of values. Other
+    databases get a plain `IN`.
+
+    Parameters
+    ----------
+    db : Session
+        The session the statement will be executed on.
+    column : Column
+        The integer column to match.
+    ids : Sequence[int]
+        The values to match.
+
+    Returns
+    -------
+    ColumnElement
+        The condition.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        return column == any_(literal(list(ids), postgresql.ARRAY(Integer)))
+    return column.in_(ids)
@@ -0,0 +1,86 @@
+"""
+Per-table version counters, to tell cheaply whether a table changed.
+
+The repository write paths bump the version of the tables they change, in the
+same transaction, so readers can compare a single number instead of the rows
+(e.g. to build the ETag of a list). As with the donation counters, a version is
+spread over TABLE_VERSION_SHARDS rows and each write bumps a random one, so that
+concurrent writes don't queue on a single row lock; the version is the sum of
+its shards.
+"""
+
+import random
+
+from sqlalchemy import BigInteger, Column, Integer, String, func
+from sqlalchemy.orm import Session
+
+from app.config.env_variables import TABLE_VERSION_SHARDS
+
+from .database import Base
+from .statements import on_conflict_insert
+
+
+class TableVersion(Base):
+    """
+    One shard of the version of a table.
+    """
+
+    __tablename__ = "table_versions"
+
+    table_name = Column(String, primary_key=True)
+    shard = Column(Integer, primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
+
+
+def bump_version(db: Session, table_name: str) -> None:
+    """
+    Increments the version of a table, in the session's transaction.
+
+    Parameters
+    ----------
+    db : Session
+        The session of the write that changed the table.
+    table_name : str
+        The name of the table.
+    """
+    shard = random.randrange(TABLE_VERSION_SHARDS)
+    statement = on_conflict_insert(db, TableVersion)
+    if statement is not None:
+        db.execute(
+            statement.values(table_name=table_name, shard=shard, version=1).on_conflict_do_update(
+                index_elements=[TableVersion.table_name, TableVersion.shard],
+                set_={"version": TableVersion.version + 1},
+            )
+        )
+        return
+
+    updated = (
+        db.query(TableVersion)
+        .filter_by(table_name=table_name, shard=shard)
+        .update({TableVersion.version: TableVersion.version + 1}, synchronize_session=False)
+    )
+    if not updated:
+        db.add(TableVersion(table_name=table_name, shard=shard, version=1))
+
+
+def get_version(db: Session, table_name: str) -> int:
+    """
+    Reads the version of a table.
+
+    Parameters
+    ----------
+    db : Session
+        The session to read with.
+    table_name : str
+        The name of the table.
+
+    Returns
+    -------
+    int
+        The version, 0 if the table was never bumped.
+    """
+    return (
+        db.query(func.coalesce(func.sum(TableVersion.version), 0))
+        .filter(TableVersion.table_name == table_name)
+        .scalar()
+    )
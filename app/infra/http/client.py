@@ -0,0 +1,134 @@
+"""
+Shared asynchronous HTTP client for outbound calls.
+
+A single `httpx.AsyncClient` is created when the application starts and reused
+by every request, so TLS connections to upstream services are kept alive and
+pooled instead of being re-established on each call. A semaphore bounds the
+number of concurrent outbound requests so a slow upstream cannot pile up an
+unbounded number of pending calls.
+"""
+
+import asyncio
+from typing import Optional
+
+import httpx
+
+from app.config.env_variables import (
+    HTTP_CONNECT_TIMEOUT,
+    HTTP_MAX_CONCURRENCY,
+    HTTP_MAX_CONNECTIONS,
+    HTTP_MAX_KEEPALIVE_CONNECTIONS,
+    HTTP_READ_TIMEOUT,
+)
+
+DEFAULT_TIMEOUT = httpx.Timeout(HTTP_READ_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT)
+DEFAULT_LIMITS = httpx.Limits(
+    max_connections=HTTP_MAX_CONNECTIONS,
+    max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+)
+
+
+class HttpClient:
+    """
+    Connection-pooled async HTTP client with per-call timeouts.
+
+    Attributes
+    ----------
+    timeout : httpx.Timeout
+        Default timeouts; `connect` and `read` can be overridden per call.
+    limits : httpx.Limits
+        Size of the connection pool.
+    max_concurrency : int
+        Maximum number of requests in flight at the same time.
+    """
+
+    def __init__(
+        self,
+        timeout: httpx.Timeout = DEFAULT_TIMEOUT,
+        limits: httpx.Limits = DEFAULT_LIMITS,
+        max_concurrency: int = HTTP_MAX_CONCURRENCY,
+    ) -> None:
+        self.timeout = timeout
+        self.limits = limits
+        self.max_concurrency = max_concurrency
+        self._client: Optional[httpx.AsyncClient] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    async def start(self) -> None:
+        """
+        Creates the underlying connection pool. Called once on application startup.
+        """
+        if self._client is None:
+            self._client = httpx.AsyncClient(limits=self.limits, timeout=self._timeout())
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+    async def close(self) -> None:
+        """
+        Closes every pooled connection. Called on application shutdown.
+        """
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            self._semaphore = None
+
+    def _timeout(
+        self, connect_timeout: Optional[float] = None, read_timeout: Optional[float] = None
+    ) -> httpx.Timeout:
+        if connect_timeout is None and read_timeout is None:
+            return self.timeout
+        read = read_timeout if read_timeout is not None else self.timeout.read
+        connect = connect_timeout if connect_timeout is not None else self.timeout.connect
+        return httpx.Timeout(read, connect=connect)
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        connect_timeout: Optional[float] = None,
+        read_timeout: Optional[float] = None,
+        **kwargs,
+    ) -> httpx.Response:
+        """
+        Sends a request through the shared pool.
+
+        Parameters
+        ----------
+        method : str
+            The HTTP method.
+        url : str
+            The URL to request.
+        connect_timeout : float, optional
+            Overrides the default connect timeout for this call.
+        read_timeout : float, optional
+            Overrides the default read timeout for this call.
+        **kwargs
+            Passed through to `httpx.AsyncClient.request`.
+
+        Returns
+        -------
+        httpx.Response
+            The response received.
+
+        Raises
+        ------
+        RuntimeError
+            If the client was not started.
+        httpx.HTTPError
+            If the request failed or timed out.
+        """
+        if self._client is None:
+            raise RuntimeError("HTTP client is not started")
+
+        async with self._semaphore:
+            return await self._client.request(
+                method, url, timeout=self._timeout(connect_timeout, read_timeout), **kwargs
+            )
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+
+
+http_client = HttpClient()
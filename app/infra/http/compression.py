@@ -0,0 +1,450 @@
+"""
+Compression of the response bodies, negotiated from `Accept-Encoding`.
+
+A pure ASGI middleware: it never buffers more than the message it is handed, so
+streaming responses (e.g. the CSV exports) are compressed chunk by chunk, each
+chunk being flushed so clients can decode it as soon as it arrives. Brotli is
+preferred when the optional `brotli` package is installed and the client
+accepts it, gzip otherwise. Bodies under the minimum size, content types that
+don't compress (images, Parquet) and responses marked `no-transform` or already
+encoded are sent as is.
+
+Compressed bodies of responses carrying an ETag are kept in a bounded LRU, so
+polling clients that miss the 304 (e.g. first fetch of a page) don't pay the
+compression again while the resource is unchanged. Their ETag is weakened
+(`W/"..."`), as the compressed bytes differ from the identity representation,
+and so is the ETag of a 304 answering a revalidation of the compressed body;
+`If-None-Match` uses the weak comparison, so revalidation keeps working.
+
+Bytes in and out and compression CPU time are recorded per route, for the
+internal stats endpoint.
+"""
+
+import importlib.util
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Callable, NamedTuple, Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+BROTLI_AVAILABLE = importlib.util.find_spec("brotli") is not None
+if BROTLI_AVAILABLE:
+    import brotli
+else:
+    brotli = None
+
+# Content types worth compressing; anything else is sent as is
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "application/xml",
+)
+
+# Bodies from this size on are compressed on the threadpool rather than on the event
+# loop (zlib and brotli release the GIL)
+OFFLOAD_SIZE = 256 * 1024
+
+
+class GzipEncoder:
+    """
+    Incremental gzip encoder.
+    """
+
+    name = "gzip"
+
+    def __init__(self, level: int) -> None:
+        # wbits 31: deflate in a gzip container
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        """
+        Compresses a chunk; every chunk is flushed so the client can decode it.
+        """
+        body = self._compressor.compress(data)
+        return body + self._compressor.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+
+class BrotliEncoder:
+    """
+    Incremental brotli encoder.
+    """
+
+    name = "br"
+
+    def __init__(self, quality: int) -> None:
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        """
+        Compresses a chunk; every chunk is flushed so the client can decode it.
+        """
+        body = self._compressor.process(data)
+        return body + (self._compressor.finish() if final else self._compressor.flush())
+
+
+def negotiate(accept_encoding: str, encodings: tuple) -> Optional[str]:
+    """
+    Picks the encoding of a response from the `Accept-Encoding` of the request.
+
+    Parameters
+    ----------
+    accept_encoding : str
+        The header, e.g. "gzip, deflate, br;q=0.9".
+    encodings : tuple
+        The encodings available, by order of preference.
+
+    Returns
+    -------
+    str or None
+        The accepted encoding with the highest q-value (ties going to the preferred
+        one), or None to send the body as is.
+    """
+    weights = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        weight = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0.0
+        if name:
+            weights[name.strip().lower()] = weight
+
+    best, best_weight = None, 0.0
+    for encoding in encodings:
+        weight = weights.get(encoding, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = encoding, weight
+    return best
+
+
+class CompressionMetrics:
+    """
+    Responses compressed, bytes in and out and compression CPU time, per route.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._routes: dict = {}
+
+    def _route(self, route: str) -> dict:
+        stats = self._routes.get(route)
+        if stats is None:
+            stats = self._routes[route] = {
+                "responses": 0,
+                "compressed": {},
+                "bytes_in": 0,
+                "bytes_out": 0,
+                "cpu_seconds": 0.0,
+                "cache_hits": 0,
+            }
+        return stats
+
+    def response(self, route: str, encoding: Optional[str]) -> None:
+        """
+        Counts a response, compressed with `encoding` or sent as is (None).
+        """
+        with self._lock:
+            stats = self._route(route)
+            stats["responses"] += 1
+            if encoding is not None:
+                stats["compressed"][encoding] = stats["compressed"].get(encoding, 0) + 1
+
+    def body(self, route: str, size_in: int, size_out: int, cpu: float) -> None:
+        """
+        Records a compressed body, or a chunk of a streaming one.
+        """
+        with self._lock:
+            stats = self._route(route)
+            stats["bytes_in"] += size_in
+            stats["bytes_out"] += size_out
+            stats["cpu_seconds"] += cpu
+
+    def cache_hit(self, route: str, size_in: int, size_out: int) -> None:
+        """
+        Records a body served from the cache of compressed bodies.
+        """
+        with self._lock:
+            stats = self._route(route)
+            stats["bytes_in"] += size_in
+            stats["bytes_out"] += size_out
+            stats["cache_hits"] += 1
+
+    def snapshot(self) -> dict:
+        """
+        Returns the counters of each route.
+
+        Returns
+        -------
+        dict
+            Per route template: responses seen, compressed responses per encoding, bytes
+            before and after compression, their ratio, CPU seconds spent compressing
+            (in total and per MiB before compression) and bodies served from the cache
+            of compressed bodies.
+        """
+        with self._lock:
+            routes = {}
+            for route, stats in self._routes.items():
+                mebibytes = stats["bytes_in"] / (1024 * 1024)
+                routes[route] = {
+                    **stats,
+                    "compressed": dict(stats["compressed"]),
+                    "ratio": (
+                        stats["bytes_out"] / stats["bytes_in"] if stats["bytes_in"] else None
+                    ),
+                    "cpu_seconds_per_mib": (
+                        stats["cpu_seconds"] / mebibytes if mebibytes else None
+                    ),
+                }
+            return routes
+
+
+compression_metrics = CompressionMetrics()
+
+
+class CompressedBodyCache:
+    """
+    LRU of compressed bodies, bounded by their total size.
+
+    Entries are looked up by route, ETag and encoding, and only served when the length
+    and CRC-32 of the uncompressed body match too, so a body that changed under the
+    same ETag is compressed again rather than served stale.
+    """
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple, body: bytes) -> Optional[bytes]:
+        """
+        Returns the compressed `body` stored under `key`, or None.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            length, checksum, compressed = entry
+        if length != len(body) or checksum != zlib.crc32(body):
+            return None
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+        return compressed
+
+    def set(self, key: tuple, body: bytes, compressed: bytes) -> None:
+        """
+        Stores the compressed `body`, evicting the least recently used bodies to make room.
+        """
+        if len(compressed) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.size -= len(previous[2])
+            self._entries[key] = (len(body), zlib.crc32(body), compressed)
+            self.size += len(compressed)
+            while self.size > self.max_bytes:
+                _, (_, _, evicted) = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+
+
+class CompressionConfig(NamedTuple):
+    """
+    Settings of the compression middleware.
+
+    Attributes
+    ----------
+    minimum_size : int
+        Bodies smaller than this many bytes are sent as is.
+    gzip_level : int
+        The zlib compression level, 1 to 9.
+    brotli_quality : int
+        The brotli quality, 0 to 11.
+    cache_max_bytes : int
+        Total size of the compressed bodies kept for the responses carrying an ETag.
+    """
+
+    minimum_size: int = 1024
+    gzip_level: int = 6
+    brotli_quality: int = 4
+    cache_max_bytes: int = 32 * 1024 * 1024
+
+
+class CompressionMiddleware:
+    """
+    Compresses the response bodies with gzip or brotli.
+
+    Attributes
+    ----------
+    config : CompressionConfig
+        The size threshold, compression levels and cache size.
+    cache : CompressedBodyCache
+        Compressed bodies of the responses carrying an ETag.
+    """
+
+    def __init__(self, app: ASGIApp, config: CompressionConfig = CompressionConfig()) -> None:
+        self.app = app
+        self.config = config
+        self.encodings = ("br", "gzip") if BROTLI_AVAILABLE else ("gzip",)
+        self.cache = CompressedBodyCache(config.cache_max_bytes)
+
+    def encoder(self, encoding: str):
+        """
+        Builds a new encoder for a response.
+        """
+        if encoding == "br":
+            return BrotliEncoder(self.config.brotli_quality)
+        return GzipEncoder(self.config.gzip_level)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding", ""), self.encodings)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        await CompressionResponder(self, scope, encoding)(receive, send)
+
+
+class CompressionResponder:
+    """
+    Compresses the response of one request, holding back its start message until the
+    first body chunk tells whether and how to compress it.
+    """
+
+    def __init__(self, middleware: CompressionMiddleware, scope: Scope, encoding: str) -> None:
+        self.middleware = middleware
+        self.scope = scope
+        self.encoding = encoding
+        self.start: Optional[Message] = None
+        self.encoder = None
+        self.passthrough = False
+        self.send: Callable = None
+
+    async def __call__(self, receive: Receive, send: Send) -> None:
+        self.send = send
+        await self.middleware.app(self.scope, receive, self.send_compressed)
+
+    @property
+    def route(self) -> str:
+        # The router stores the matched route in the scope
+        route = self.scope.get("route")
+        return getattr(route, "path", None) or "<unmatched>"
+
+    async def send_compressed(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.start = message
+            return
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self.encoder is None:
+            await self.first_chunk(message, body, more_body)
+            return
+
+        message["body"] = await self.compress(body, final=not more_body)
+        await self.send(message)
+
+    async def first_chunk(self, message: Message, body: bytes, more_body: bool) -> None:
+        headers = MutableHeaders(raw=self.start["headers"])
+        if self.start["status"] == 304:
+            compressible = False
+            if self.revalidates_compressed(headers.get("etag")):
+                self.weaken_etag(headers)
+                headers.add_vary_header("Accept-Encoding")
+        else:
+            compressible = self.compressible(headers)
+        if compressible:
+            headers.add_vary_header("Accept-Encoding")
+        if not compressible or (
+            not more_body and len(body) < self.middleware.config.minimum_size
+        ):
+            compression_metrics.response(self.route, None)
+            self.passthrough = True
+            await self.send(self.start)
+            await self.send(message)
+            return
+
+        self.encoder = self.middleware.encoder(self.encoding)
+        etag = headers.get("etag")
+        headers["Content-Encoding"] = self.encoding
+        self.weaken_etag(headers)
+        compression_metrics.response(self.route, self.encoding)
+
+        if more_body:
+            del headers["Content-Length"]
+            message["body"] = await self.compress(body, final=False)
+        else:
+            message["body"] = await self.compress_body(body, etag)
+            headers["Content-Length"] = str(len(message["body"]))
+
+        await self.send(self.start)
+        await self.send(message)
+
+    async def compress_body(self, body: bytes, etag: Optional[str]) -> bytes:
+        # Only bodies identified by an ETag are worth keeping: others may differ on
+        # every request
+        if not etag:
+            return await self.compress(body, final=True)
+        cache = self.middleware.cache
+        key = (self.route, etag, self.encoding)
+        compressed = cache.get(key, body)
+        if compressed is not None:
+            compression_metrics.cache_hit(self.route, len(body), len(compressed))
+            return compressed
+        compressed = await self.compress(body, final=True)
+        cache.set(key, body, compressed)
+        return compressed
+
+    def revalidates_compressed(self, etag: Optional[str]) -> bool:
+        # The client holds the compressed representation when it revalidated with the
+        # weak ETag sent along with it
+        if not etag or etag.startswith("W/"):
+            return False
+        if_none_match = Headers(scope=self.scope).get("if-none-match", "")
+        return "W/" + etag in (tag.strip() for tag in if_none_match.split(","))
+
+    @staticmethod
+    def weaken_etag(headers: MutableHeaders) -> None:
+        # The compressed bytes differ from the identity representation
+        etag = headers.get("etag")
+        if etag and not etag.startswith("W/"):
+            headers["ETag"] = "W/" + etag
+
+    @staticmethod
+    def compressible(headers: MutableHeaders) -> bool:
+        if "content-encoding" in headers:
+            return False
+        if "no-transform" in headers.get("cache-control", ""):
+            return False
+        content_type = headers.get("content-type", "").split(";")[0].strip().lower()
+        return content_type.startswith(COMPRESSIBLE_TYPES) or content_type.endswith("+json")
+
+    async def compress(self, body: bytes, final: bool) -> bytes:
+        if len(body) >= OFFLOAD_SIZE:
+            compressed, cpu = await run_in_threadpool(self._compress, body, final)
+        else:
+            compressed, cpu = self._compress(body, final)
+        compression_metrics.body(self.route, len(body), len(compressed), cpu)
+        return compressed
+
+    def _compress(self, body: bytes, final: bool) -> Tuple[bytes, float]:
+        started = time.thread_time()
+        compressed = self.encoder.compress(body, final)
+        return compressed, time.thread_time() - started
@@ -0,0 +1,76 @@
+"""
+Conditional GET: strong ETags and `If-None-Match` handling.
+
+Routes compute the ETag of a resource from a cheap version query (an
+`updated_at`, a table version) before loading it. When the client already holds
+that version, they answer 304 Not Modified without loading the rows or
+serializing a body.
+"""
+
+import hashlib
+
+from fastapi import Request, Response
+
+# The API requires authentication, so responses may only be stored by the client,
+# which must revalidate them (with If-None-Match) before each reuse.
+PRIVATE_CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(*parts) -> str:
+    """
+    Builds a strong ETag from the values identifying a version of a resource.
+
+    Parameters
+    ----------
+    *parts
+        The values, e.g. the resource name, its id and its `updated_at`.
+
+    Returns
+    -------
+    str
+        The quoted ETag.
+    """
+    digest = hashlib.sha256(repr(parts).encode("utf-8")).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """
+    Tells whether the `If-None-Match` header of a request matches an ETag.
+
+    Parameters
+    ----------
+    request : Request
+        The request.
+    etag : str
+        The current ETag of the resource.
+
+    Returns
+    -------
+    bool
+        True if the client already holds this version of the resource.
+    """
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # If-None-Match uses the weak comparison, which ignores the W/ prefix
+    return any(tag.strip().replace("W/", "", 1) == etag for tag in header.split(","))
+
+
+def not_modified(etag: str, cache_control: str = PRIVATE_CACHE_CONTROL) -> Response:
+    """
+    Builds a 304 Not Modified response.
+    """
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": cache_control})
+
+
+def set_cache_headers(
+    response: Response, etag: str, cache_control: str = PRIVATE_CACHE_CONTROL
+) -> None:
+    """
+    Sets the ETag and Cache-Control headers of a response.
+    """
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = cache_control
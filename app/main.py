@@ -1,22 +1,54 @@
 from dotenv import load_dotenv
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import declarative_base
+from starlette.concurrency import run_in_threadpool
 
-from app.config.env_variables import ALLOWED_ORIGINS, validate_env_variables
-from app.infra.db.database import engine
+from app.config.env_variables import (
+    ALLOWED_ORIGINS,
+    AUTH_MODE,
+    COMPRESSION_BROTLI_QUALITY,
+    COMPRESSION_CACHE_MAX_BYTES,
+    COMPRESSION_ENABLED,
+    COMPRESSION_GZIP_LEVEL,
+    COMPRESSION_MINIMUM_SIZE,
+    DONATION_INGEST_ENABLED,
+    validate_env_variables,
+)
+from app.infra.cache.cache import cache
+from app.infra.db.database import async_replica_set, engine, replica_set
+from app.infra.http.client import http_client
+from app.infra.http.compression import CompressionConfig, CompressionMiddleware
 from app.infra.logger.config import logger
 from app.infra.logger.middleware import LoggerMiddleware
+from app.modules.auth.google.jwks import google_jwks
+from app.modules.donation.export import export_workers
+from app.modules.donation.ingest import donation_ingest
 from app.router.routes import main_router
 
 # Load environment variables and validate them
 load_dotenv()
 validate_env_variables()
 
-# Initialize the FastAPI application
-app = FastAPI()
+# Initialize the FastAPI application; responses are encoded with orjson
+app = FastAPI(default_response_class=ORJSONResponse)
 logger.info("Starting API...")
 
+# Compress the responses with gzip or brotli, as negotiated with the client; added first
+# so that it is the innermost middleware and sees whole response bodies, which the other
+# middlewares stream in chunks
+if COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        config=CompressionConfig(
+            minimum_size=COMPRESSION_MINIMUM_SIZE,
+            gzip_level=COMPRESSION_GZIP_LEVEL,
+            brotli_quality=COMPRESSION_BROTLI_QUALITY,
+            cache_max_bytes=COMPRESSION_CACHE_MAX_BYTES,
+        ),
+    )
+
 # Add CORS middleware to allow cross-origin requests from the specified origins
 app.add_middleware(
     CORSMiddleware,
@@ -37,9 +69,42 @@ Base = declarative_base()
 
 
 @app.on_event("startup")
-def startup_event():
+async def startup_event():
     """
     This function creates all database tables defined in SQLAlchemy models
     if they don't already exist, using the engine bound to our SQLAlchemy Base.
     """
     Base.metadata.create_all(bind=engine)
+
+    # Open the shared connection pool used for outbound HTTP calls
+    await http_client.start()
+
+    # Health-check the read replicas in the background
+    await replica_set.start()
+    if async_replica_set is not None:
+        await async_replica_set.start()
+
+    # Load Google's signing keys and keep them fresh in the background
+    if AUTH_MODE == "id_token":
+        await google_jwks.start()
+
+    # Write donation creates in batches from a background writer
+    if DONATION_INGEST_ENABLED:
+        await donation_ingest.start()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """
+    This function stops the background workers started on startup, after the donations
+    queued for ingestion are written, and the export worker processes, and closes the
+    shared HTTP connection pool and the connections of the cache.
+    """
+    await donation_ingest.stop()
+    await google_jwks.stop()
+    await run_in_threadpool(export_workers.shutdown)
+    await replica_set.stop()
+    if async_replica_set is not None:
+        await async_replica_set.stop()
+    await http_client.close()
+    await cache.aclose()
@@ -0,0 +1,168 @@
+"""
+In-process cache for resolved bearer tokens.
+
+Validating a Google access token means a round trip to Google's userinfo
+endpoint. Since the same token is presented on every request of a session, the
+resolved identity is kept in a bounded LRU cache with a per-entry TTL so only
+the first request (and one per TTL window afterwards) pays for the lookup.
+
+Tokens are never stored in clear text: entries are keyed by the SHA-256 digest
+of the token. The underlying `TTLCache` is generic and also backs the cache of
+authenticated principals.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from app.config.env_variables import AUTH_CACHE_MAX_SIZE, AUTH_CACHE_TTL_SECONDS
+
+
+class TTLCache:
+    """
+    Bounded, thread-safe LRU cache with a per-entry TTL.
+
+    Attributes
+    ----------
+    max_size : int
+        Maximum number of entries kept; the least recently used entry is
+        evicted when the cache is full.
+    ttl : float
+        Number of seconds an entry stays valid after being stored.
+    """
+
+    def __init__(self, max_size: int, ttl: float) -> None:
+        """
+        Initializes an empty cache.
+
+        Parameters
+        ----------
+        max_size : int
+            Maximum number of entries kept in the cache.
+        ttl : float
+            Time to live of each entry, in seconds.
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def _key(self, key: str) -> str:
+        return key
+
+    def get(self, key: str):
+        """
+        Returns the value cached for a key.
+
+        Parameters
+        ----------
+        key : str
+            The key to look up.
+
+        Returns
+        -------
+        Any
+            The cached value, or None if the key is unknown or expired.
+        """
+        key = self._key(key)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value) -> None:
+        """
+        Stores a value.
+
+        Parameters
+        ----------
+        key : str
+            The key to store the value under.
+        value : Any
+            The value to cache.
+        """
+        if self.max_size <= 0:
+            return
+
+        key = self._key(key)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def evict(self, key: str) -> bool:
+        """
+        Removes a key from the cache.
+
+        Parameters
+        ----------
+        key : str
+            The key to remove.
+
+        Returns
+        -------
+        bool
+            True if the key was cached, False otherwise.
+        """
+        with self._lock:
+            return self._entries.pop(self._key(key), None) is not None
+
+    def clear(self) -> None:
+        """
+        Removes every entry from the cache.
+        """
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """
+        Returns the cache counters.
+
+        Returns
+        -------
+        dict
+            Current size, configuration and hit/miss/eviction counters.
+        """
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+
+class TokenCache(TTLCache):
+    """
+    TTL cache of resolved identities keyed by the SHA-256 digest of the bearer token.
+
+    Tokens passed to `get`, `set` and `evict` must not include the "Bearer " prefix.
+    """
+
+    def _key(self, key: str) -> str:
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+token_cache = TokenCache(max_size=AUTH_CACHE_MAX_SIZE, ttl=AUTH_CACHE_TTL_SECONDS)
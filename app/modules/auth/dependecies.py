@@ -1,52 +1,197 @@
+import hashlib
+
+import httpx
 from fastapi import HTTPException, Depends, Header
-from sqlalchemy.orm import Session
+from jose.exceptions import JWTError
+from starlette.concurrency import run_in_threadpool
 
-from app.infra.db.database import get_db
-from app.modules.user.repository import UserRepository
+from app.config.env_variables import AUTH_MODE
+from app.infra.concurrency.singleflight import SingleFlight
+from app.infra.db.database import AsyncSessionLocal, SessionLocal
+from app.infra.http.client import http_client
+from app.modules.user.principal import Principal, principal_cache
+from app.modules.user.repository import AsyncUserRepository, UserRepository
 from app.infra.logger.config import logger
 
+from .cache import token_cache
 from .google.google_oauth import GoogleOAuth
+from .google.id_token import verify_id_token
+from .session import session_tokens
+
+google_oauth = GoogleOAuth(http_client)
+
+# Concurrent requests carrying the same token share one identity + user lookup
+identity_flight = SingleFlight("identity")
 
 
 def get_google_oauth() -> GoogleOAuth:
     """
-    Dependency that provides a GoogleOAuth instance.
+    Dependency that provides the shared GoogleOAuth instance.
 
     This function is used with FastAPI's dependency injection system to get a GoogleOAuth
+    bound to the application-wide HTTP client created on startup.
 
     Returns
     -------
     GoogleOAuth
-        An instance of GoogleOAuth.
+        The GoogleOAuth instance.
     """
-    return GoogleOAuth()
+    return google_oauth
 
 
-def get_current_user(token: str = Header(None), db: Session = Depends(get_db)):
-    if not token:
-        raise HTTPException(status_code=401, detail="Unauthorized")
+def get_bearer_token(token: str = Header(None)) -> str:
+    """
+    Dependency that extracts the bearer token from the `token` header.
 
-    # Decode the token to get user details
-    user_details = GoogleOAuth().get_token(token)
+    Returns
+    -------
+    str
+        The token without the "Bearer " prefix.
+
+    Raises
+    ------
+    HTTPException
+        If no token was provided.
+    """
     if not token:
         logger.error("No token provided")
         raise HTTPException(status_code=401, detail="Unauthorized")
 
     if token.startswith("Bearer "):
         token = token[7:]
-        logger.debug("Token after removing Bearer: %s", token)
+    return token
+
+
+async def resolve_identity(token: str) -> dict:
+    """
+    Resolves a bearer token into the identity it belongs to.
+
+    With `AUTH_MODE=session` the token is a session token minted by the API and verified
+    locally. With `AUTH_MODE=id_token` the token is a Google ID token verified locally against
+    the cached signing keys. Otherwise it is a Google access token: identities are served from the
+    token cache when possible, and Google's userinfo endpoint is queried on a miss.
+
+    Parameters
+    ----------
+    token : str
+        The bearer token, without the "Bearer " prefix.
+
+    Returns
+    -------
+    dict
+        The identity returned by Google, including the user's email.
+
+    Raises
+    ------
+    HTTPException
+        If the token is invalid or does not carry an email, or if Google could not be reached.
+    """
+    if AUTH_MODE == "session":
+        try:
+            return session_tokens.decode(token)
+        except JWTError as e:
+            logger.error("Invalid session token: %s", e)
+            raise HTTPException(status_code=401, detail="Invalid token") from e
+
+    if AUTH_MODE == "id_token":
+        try:
+            return verify_id_token(token)
+        except JWTError as e:
+            logger.error("Invalid ID token: %s", e)
+            raise HTTPException(status_code=401, detail="Invalid token") from e
+
+    user_details = token_cache.get(token)
+    if user_details is not None:
+        return user_details
+
+    try:
+        user_details = await google_oauth.get_token(token)
+    except httpx.HTTPError as e:
+        logger.error("Network-related error while validating token: %s", e)
+        raise HTTPException(status_code=503, detail="Service unavailable") from e
 
     if not user_details:
         raise HTTPException(status_code=401, detail="Invalid token")
 
-    email = user_details.get('email')
-    if not email:
+    if not user_details.get('email'):
         raise HTTPException(status_code=401, detail="Token does not include email")
 
-    # Fetch user from database
-    user_repo = UserRepository(db)
-    usr = user_repo.get_user_by_email(email)
-    if not usr:
-        raise HTTPException(status_code=404, detail="usr not found")
+    token_cache.set(token, user_details)
+    return user_details
+
+
+def load_principal(email: str):
+    """
+    Fetches the principal of a user by email using a short-lived session of its own.
+
+    The session is not tied to any request, since the principal it returns may be shared by
+    every request coalesced on the same token.
+
+    Parameters
+    ----------
+    email : str
+        The email of the user to fetch.
+
+    Returns
+    -------
+    Principal
+        The principal of the user, or None if not found.
+    """
+    db = SessionLocal()
+    try:
+        user = UserRepository(db).get_user_by_email(email)
+        return Principal.from_user(user) if user else None
+    finally:
+        db.close()
+
+
+async def load_principal_async(email: str):
+    """
+    Async counterpart of `load_principal`, used in async database mode.
+    """
+    async with AsyncSessionLocal() as db:
+        user = await AsyncUserRepository(db).get_user_by_email(email)
+        return Principal.from_user(user) if user else None
+
+
+async def authenticate(token: str) -> Principal:
+    """
+    Resolves a token into its identity and the matching principal.
+
+    Principals are served from the principal cache when possible, so most authenticated
+    requests do not query the users table.
+
+    Parameters
+    ----------
+    token : str
+        The bearer token, without the "Bearer " prefix.
+
+    Returns
+    -------
+    Principal
+        The authenticated user.
+
+    Raises
+    ------
+    HTTPException
+        If the token is invalid or the user does not exist.
+    """
+    user_details = await resolve_identity(token)
+    email = user_details['email']
+
+    principal = principal_cache.get(email)
+    if principal is None:
+        if AsyncSessionLocal is not None:
+            principal = await load_principal_async(email)
+        else:
+            principal = await run_in_threadpool(load_principal, email)
+        if not principal:
+            raise HTTPException(status_code=404, detail="usr not found")
+        principal_cache.set(email, principal)
+
+    return principal
+
 
-    return usr
+async def get_current_user(token: str = Depends(get_bearer_token)) -> Principal:
+    key = hashlib.sha256(token.encode("utf-8")).hexdigest()
+    return await identity_flight.do(key, lambda: authenticate(token))
@@ -1,6 +1,6 @@
 from fastapi.security import OAuth2PasswordBearer
-import requests
 from app.config.env_variables import GOOGLE_CLIENT_ID, GOOGLE_CLIENT_SECRET, GOOGLE_REDIRECT_URI
+from app.infra.http.client import HttpClient
 from .schemas import GoogleUser
 
 
@@ -9,7 +9,8 @@ class GoogleOAuth:
     Handles OAuth2 operations for Google authentication.
     """
 
-    def __init__(self):
+    def __init__(self, http_client: HttpClient):
+        self.http_client = http_client
         self.oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
         self.client_id = GOOGLE_CLIENT_ID
         self.client_secret = GOOGLE_CLIENT_SECRET
@@ -31,7 +32,7 @@ class GoogleOAuth:
         """
         return {"url": self.login_url}
 
-    def auth_google(self, code: str) -> GoogleUser:
+    async def auth_google(self, code: str) -> GoogleUser:
         """
         Handles the authentication of the user with Google using the code received from Google
         after user consent.
@@ -49,39 +50,42 @@ class GoogleOAuth:
             "redirect_uri": self.redirect_uri,
             "grant_type": "authorization_code",
         }
-        response = requests.post(self.token_url, data=data, timeout=100)
-        access_token = response.json().get("access_token")
-        return self.get_user_info(access_token)
+        response = await self.http_client.post(self.token_url, data=data)
+        tokens = response.json()
+        return await self.get_user_info(tokens.get("access_token"), tokens.get("id_token"))
 
-    def get_user_info(self, access_token: str) -> dict:
+    async def get_user_info(self, access_token: str, id_token: str = None) -> dict:
         """
         Retrieves user information from Google using the access token.
 
         Args:
             access_token (str): Access token provided by Google.
+            id_token (str): ID token provided by Google alongside the access token, if any.
 
         Returns:
             dict: A dictionary containing the user's information.
         """
-        response = requests.get(
-            self.user_info_url, headers={"Authorization": f"Bearer {access_token}"}, timeout=100
+        response = await self.http_client.get(
+            self.user_info_url, headers={"Authorization": f"Bearer {access_token}"}
         )
         info = response.json()
-        data = {**info, "access_token": access_token}
+        data = {**info, "access_token": access_token, "id_token": id_token}
         return GoogleUser(**data)
 
-    def get_token(self, token: str) -> dict:
+    async def get_token(self, token: str) -> dict:
         """
-        Decodes a JWT token using the application's secret.
+        Resolves an access token into the user's information using Google's userinfo endpoint.
         Args:
-            token (str): The JWT token to decode.
+            token (str): The access token to resolve.
 
         Returns:
-            dict: The decoded token.
+            dict: The user's information, or an empty dict if Google rejected the token.
         """
 
-        response = requests.get(
-            self.user_info_url, headers={"Authorization": f"Bearer {token}"}, timeout=100
+        response = await self.http_client.get(
+            self.user_info_url, headers={"Authorization": f"Bearer {token}"}
         )
+        if response.status_code != 200:
+            return {}
         info = response.json()
         return info
@@ -0,0 +1,52 @@
+from jose import jwt
+from jose.exceptions import JWTError
+
+from app.config.env_variables import GOOGLE_CLIENT_ID
+
+from .jwks import JWKSCache, google_jwks
+
+GOOGLE_ISSUERS = ("https://accounts.google.com", "accounts.google.com")
+
+
+def verify_id_token(
+    token: str, jwks: JWKSCache = google_jwks, audience: str = GOOGLE_CLIENT_ID
+) -> dict:
+    """
+    Verifies a Google ID token locally and returns its claims.
+
+    The signature is checked against the cached Google signing keys, and the
+    `aud`, `iss` and `exp` claims are validated. No network call is made.
+
+    Args:
+        token (str): The ID token to verify.
+        jwks (JWKSCache): The key set used to verify the signature.
+        audience (str): The expected `aud` claim, i.e. our OAuth client id.
+
+    Returns:
+        dict: The verified claims of the token.
+
+    Raises:
+        JWTError: If the token is malformed, signed by an unknown key, expired or issued for
+        another audience or by another issuer.
+    """
+    header = jwt.get_unverified_header(token)
+    key = jwks.get_key(header.get("kid"))
+    if key is None:
+        raise JWTError("Token signed by an unknown key")
+
+    claims = jwt.decode(
+        token,
+        key,
+        algorithms=[key.get("alg", "RS256")],
+        audience=audience,
+        issuer=GOOGLE_ISSUERS,
+        options={
+            "require_aud": True,
+            "require_iss": True,
+            "require_exp": True,
+            "verify_at_hash": False,
+        },
+    )
+    if claims.get("email_verified") is False:
+        raise JWTError("Token email is not verified")
+    return claims
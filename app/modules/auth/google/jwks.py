@@ -0,0 +1,186 @@
+"""
+Cache of the public keys Google uses to sign its ID tokens.
+
+Keys are loaded from Google's JWKS endpoint (or from a local JWKS file, which is
+handy for tests and air-gapped environments) and refreshed by a background
+task according to the `Cache-Control`/`Expires` headers Google sends, so that
+verifying a token never waits on the network.
+"""
+
+import asyncio
+import json
+import time
+from email.utils import parsedate_to_datetime
+from typing import NamedTuple, Optional
+
+import httpx
+
+from app.config.env_variables import GOOGLE_JWKS_FILE, GOOGLE_JWKS_URL
+from app.infra.concurrency.tasks import cancel_task
+from app.infra.http.client import HttpClient, http_client
+from app.infra.logger.config import logger
+
+
+class RefreshPolicy(NamedTuple):
+    """
+    How often a key set is reloaded.
+
+    Attributes
+    ----------
+    min_refresh : float
+        Lower bound, in seconds, between two refreshes.
+    max_refresh : float
+        Upper bound, in seconds, between two refreshes.
+    """
+
+    min_refresh: float = 60
+    max_refresh: float = 24 * 3600
+
+
+class JWKSCache:
+    """
+    Holds a JSON Web Key Set indexed by key id and keeps it fresh.
+
+    Attributes
+    ----------
+    http_client : HttpClient
+        The shared client used to download the key set.
+    url : str
+        The JWKS endpoint to load keys from.
+    path : str, optional
+        A local JWKS file; when set it takes precedence over `url`.
+    policy : RefreshPolicy
+        The bounds on how often the keys are reloaded.
+    """
+
+    def __init__(
+        self,
+        client: HttpClient,
+        url: str,
+        path: Optional[str] = None,
+        policy: RefreshPolicy = RefreshPolicy(),
+    ) -> None:
+        self.http_client = client
+        self.url = url
+        self.path = path
+        self.policy = policy
+        self._keys: dict = {}
+        self._last_refresh = 0.0
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def get_key(self, kid: Optional[str]) -> Optional[dict]:
+        """
+        Returns the JWK with the given key id, without touching the network.
+
+        If the key id is unknown the background refresher is woken up, since
+        that usually means Google rotated its keys.
+
+        Parameters
+        ----------
+        kid : str
+            The `kid` header of the token being verified.
+
+        Returns
+        -------
+        dict or None
+            The matching JWK, or None if it is not known (yet).
+        """
+        key = self._keys.get(kid)
+        if key is None:
+            self.request_refresh()
+        return key
+
+    def request_refresh(self) -> None:
+        """
+        Asks the background refresher to reload the keys early.
+
+        Requests are ignored while the keys are younger than `policy.min_refresh`.
+        """
+        if (
+            self._wakeup is not None
+            and time.monotonic() - self._last_refresh >= self.policy.min_refresh
+        ):
+            self._wakeup.set()
+
+    async def refresh(self) -> float:
+        """
+        Reloads the key set.
+
+        Returns
+        -------
+        float
+            The number of seconds the loaded keys may be cached for.
+        """
+        if self.path:
+            with open(self.path, encoding="utf-8") as jwks_file:
+                jwks = json.load(jwks_file)
+            max_age = self.policy.min_refresh
+        else:
+            response = await self.http_client.get(self.url)
+            response.raise_for_status()
+            jwks = response.json()
+            max_age = self._max_age(response.headers)
+
+        self._keys = {key["kid"]: key for key in jwks.get("keys", []) if "kid" in key}
+        self._last_refresh = time.monotonic()
+        logger.info("Loaded %s signing keys, next refresh in %ss", len(self._keys), max_age)
+        return max_age
+
+    def _max_age(self, headers) -> float:
+        """
+        Computes how long a JWKS response may be cached from its headers.
+        """
+        max_age = None
+        for directive in headers.get("Cache-Control", "").split(","):
+            name, _, value = directive.strip().partition("=")
+            if name.lower() == "max-age" and value.isdigit():
+                max_age = int(value) - int(headers.get("Age", "0") or 0)
+
+        if max_age is None and headers.get("Expires"):
+            try:
+                expires = parsedate_to_datetime(headers["Expires"]).timestamp()
+                max_age = expires - time.time()
+            except (TypeError, ValueError):
+                max_age = None
+
+        if max_age is None:
+            max_age = self.policy.min_refresh
+        return min(max(max_age, self.policy.min_refresh), self.policy.max_refresh)
+
+    async def _run(self, delay: float) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                delay = await self.refresh()
+            except (OSError, ValueError, httpx.HTTPError) as e:
+                logger.error("Could not refresh signing keys: %s", e)
+                delay = self.policy.min_refresh
+
+    async def start(self) -> None:
+        """
+        Loads the keys once and starts the background refresher.
+        """
+        delay = self.policy.min_refresh
+        try:
+            delay = await self.refresh()
+        except (OSError, ValueError, httpx.HTTPError) as e:
+            logger.error("Could not load signing keys: %s", e)
+
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run(delay))
+
+    async def stop(self) -> None:
+        """
+        Stops the background refresher.
+        """
+        await cancel_task(self._task)
+        self._task = None
+        self._wakeup = None
+
+
+google_jwks = JWKSCache(client=http_client, url=GOOGLE_JWKS_URL, path=GOOGLE_JWKS_FILE)
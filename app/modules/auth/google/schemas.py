@@ -12,6 +12,7 @@ class GoogleUser(BaseModel):
     picture: str
     locale: Optional[str] = None
     access_token: str
+    id_token: Optional[str] = None
 
     class Config:
         from_attributes = True
@@ -1,20 +1,24 @@
+import httpx
 from fastapi import APIRouter, Depends, HTTPException, status
-from requests.exceptions import RequestException
 from jose.exceptions import JWTError
 from pydantic import ValidationError
 
+from app.config.env_variables import AUTH_MODE
 from app.infra.logger.config import logger
 from app.modules.user.dependencies import get_user_repository
 from app.modules.user.repository import UserRepository
 from app.modules.user.schemas import UserCreate
-from .dependecies import get_google_oauth
+from .cache import token_cache
+from .dependecies import get_bearer_token, get_google_oauth
 from .google.google_oauth import GoogleOAuth
+from .schemas import RefreshSession
+from .session import REFRESH, session_tokens
 
 auth_router = APIRouter(prefix="/auth", tags=["Auth"])
 
 
 @auth_router.get("/google/login")
-def login_google(google_oauth: GoogleOAuth = Depends(get_google_oauth)):
+async def login_google(google_oauth: GoogleOAuth = Depends(get_google_oauth)):
     """
     Initiates a login request using Google OAuth. Redirects user to Google's login page.
 
@@ -28,21 +32,23 @@ def login_google(google_oauth: GoogleOAuth = Depends(get_google_oauth)):
 
 
 @auth_router.get("/google/callback")
-def auth_google(
+async def auth_google(
     code: str,
     google_oauth: GoogleOAuth = Depends(get_google_oauth),
     user_repository: UserRepository = Depends(get_user_repository),
 ):
     try:
-        user_info = google_oauth.auth_google(code)
+        user_info = await google_oauth.auth_google(code)
         if not user_info.email:
             raise HTTPException(status_code=400, detail="Email not provided in Google data")
 
-        db_user = user_repository.get_user_by_email(email=user_info.email)
+        db_user = await user_repository.get_user_by_email(email=user_info.email)
         if db_user:
             return {
                 "user": db_user,
                 "access_token": user_info.access_token,
+                "id_token": user_info.id_token,
+                **(session_tokens.issue(db_user) if AUTH_MODE == "session" else {}),
             }
 
         user_obj = {
@@ -52,15 +58,17 @@ def auth_google(
             "picture": user_info.picture or "",
             "locale": user_info.locale or "",
         }
-        created_user = user_repository.create_user(user=UserCreate(**user_obj))
+        created_user = await user_repository.create_user(user=UserCreate(**user_obj))
         return {
             "user": created_user,
             "access_token": user_info.access_token,
+            "id_token": user_info.id_token,
+            **(session_tokens.issue(created_user) if AUTH_MODE == "session" else {}),
         }
     except ValidationError as ve:
         logger.error("Validation error for GoogleUser: %s", ve)
         raise HTTPException(status_code=400, detail=f"Invalid user data: {ve.errors()}") from ve
-    except RequestException as e:
+    except httpx.HTTPError as e:
         logger.error("Network-related error during Google authentication: %s", e)
         raise HTTPException(status_code=503, detail="Service unavailable") from e
     except Exception as e:
@@ -69,7 +77,9 @@ def auth_google(
 
 
 @auth_router.get("/google/token")
-def get_authenticated_user(token: str, google_oauth: GoogleOAuth = Depends(get_google_oauth)):
+async def get_authenticated_user(
+    token: str, google_oauth: GoogleOAuth = Depends(get_google_oauth)
+):
     """
     Decodes the provided JWT token to extract the user's information stored within.
 
@@ -81,7 +91,7 @@ def get_authenticated_user(token: str, google_oauth: GoogleOAuth = Depends(get_g
         The decoded information from the JWT token.
     """
     try:
-        return google_oauth.get_user_info(token)
+        return await google_oauth.get_user_info(token)
     except JWTError as e:
         logger.error("Error decoding token: %s, token = %s", e, token)
         raise HTTPException(
@@ -92,3 +102,54 @@ def get_authenticated_user(token: str, google_oauth: GoogleOAuth = Depends(get_g
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid token"
         ) from e
+
+
+@auth_router.post("/refresh")
+async def refresh_session(
+    data: RefreshSession,
+    user_repository: UserRepository = Depends(get_user_repository),
+):
+    """
+    Exchanges a refresh token for a new session token and refresh token.
+
+    The user is read again so that the new tokens carry its current institute, and inactive
+    users cannot extend their session.
+
+    Args:
+        data (RefreshSession): The refresh token issued by the Google callback or a previous
+            refresh.
+        user_repository (UserRepository): The user repository dependency.
+
+    Returns:
+        The new session token, refresh token and session token lifetime.
+    """
+    if AUTH_MODE != "session":
+        raise HTTPException(status_code=404, detail="Session tokens are not enabled")
+
+    try:
+        claims = session_tokens.decode(data.refresh_token, token_type=REFRESH)
+    except JWTError as e:
+        logger.error("Invalid refresh token: %s", e)
+        raise HTTPException(status_code=401, detail="Invalid token") from e
+
+    user = await user_repository.get_user_by_id(user_id=int(claims["sub"]))
+    if not user or not user.is_active:
+        raise HTTPException(status_code=401, detail="Invalid token")
+
+    return session_tokens.issue(user)
+
+
+@auth_router.post("/logout")
+async def logout(token: str = Depends(get_bearer_token)):
+    """
+    Drops the provided token from the token validation cache so that the next request using it
+    is validated against Google again.
+
+    Args:
+        token (str): The bearer token to evict.
+
+    Returns:
+        A message confirming the logout.
+    """
+    token_cache.evict(token)
+    return {"message": "Logged out successfully"}
@@ -0,0 +1,5 @@
+from pydantic import BaseModel
+
+
+class RefreshSession(BaseModel):
+    refresh_token: str
@@ -0,0 +1,121 @@
+"""
+Short-lived session tokens issued by the API itself.
+
+After the Google callback the API can mint its own HMAC-signed JWTs carrying
+the user's id, email and institute. Verifying them is pure CPU work, so
+authenticated requests no longer depend on Google being reachable. A longer
+lived refresh token is issued alongside and exchanged at `/auth/refresh`.
+"""
+
+import time
+
+from jose import jwt
+from jose.exceptions import JWTClaimsError, JWTError
+
+from app.config.env_variables import (
+    SESSION_ALGORITHM,
+    SESSION_REFRESH_TTL_SECONDS,
+    SESSION_SECRET,
+    SESSION_TOKEN_TTL_SECONDS,
+)
+
+ISSUER = "api-donation"
+ACCESS = "access"
+REFRESH = "refresh"
+
+
+class SessionTokens:
+    """
+    Mints and verifies app-signed session and refresh tokens.
+
+    Attributes
+    ----------
+    secret : str
+        The HMAC secret the tokens are signed with.
+    algorithm : str
+        The JWS algorithm, e.g. HS256.
+    ttl : int
+        Lifetime of session tokens, in seconds.
+    refresh_ttl : int
+        Lifetime of refresh tokens, in seconds.
+    """
+
+    def __init__(self, secret: str, algorithm: str, ttl: int, refresh_ttl: int) -> None:
+        self.secret = secret
+        self.algorithm = algorithm
+        self.ttl = ttl
+        self.refresh_ttl = refresh_ttl
+
+    def _encode(self, user, token_type: str, ttl: int) -> str:
+        now = int(time.time())
+        claims = {
+            "iss": ISSUER,
+            "sub": str(user.id),
+            "email": user.email,
+            "institute_id": user.institute_id,
+            "typ": token_type,
+            "iat": now,
+            "exp": now + ttl,
+        }
+        return jwt.encode(claims, self.secret, algorithm=self.algorithm)
+
+    def issue(self, user) -> dict:
+        """
+        Mints a session token and a refresh token for a user.
+
+        Parameters
+        ----------
+        user : User
+            The user the tokens are issued to.
+
+        Returns
+        -------
+        dict
+            The session token, the refresh token and the session token lifetime.
+        """
+        return {
+            "session_token": self._encode(user, ACCESS, self.ttl),
+            "refresh_token": self._encode(user, REFRESH, self.refresh_ttl),
+            "token_type": "Bearer",
+            "expires_in": self.ttl,
+        }
+
+    def decode(self, token: str, token_type: str = ACCESS) -> dict:
+        """
+        Verifies a token minted by `issue` and returns its claims.
+
+        Parameters
+        ----------
+        token : str
+            The token to verify.
+        token_type : str
+            The expected token type, "access" or "refresh".
+
+        Returns
+        -------
+        dict
+            The verified claims.
+
+        Raises
+        ------
+        JWTError
+            If the token is malformed, tampered with, expired or of another type.
+        """
+        claims = jwt.decode(
+            token,
+            self.secret,
+            algorithms=[self.algorithm],
+            issuer=ISSUER,
+            options={"require_exp": True, "require_iss": True, "require_sub": True},
+        )
+        if claims.get("typ") != token_type:
+            raise JWTClaimsError("Invalid token type")
+        return claims
+
+
+session_tokens = SessionTokens(
+    secret=SESSION_SECRET,
+    algorithm=SESSION_ALGORITHM,
+    ttl=SESSION_TOKEN_TTL_SECONDS,
+    refresh_ttl=SESSION_REFRESH_TTL_SECONDS,
+)
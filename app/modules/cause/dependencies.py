@@ -1,12 +1,13 @@
 from fastapi import Depends
 from sqlalchemy.orm import Session
 
-from app.infra.db.database import get_db
+from app.infra.db.database import get_session
+from app.infra.db.repository import make_repository
 
-from .repository import CauseRepository
+from .repository import AsyncCauseRepository, CauseRepository
 
 
-def get_cause_repository(db: Session = Depends(get_db)) -> CauseRepository:
+def get_cause_repository(db: Session = Depends(get_session)) -> CauseRepository:
     """
     Dependency that provides a CauseRepository instance.
 
@@ -15,13 +16,14 @@ def get_cause_repository(db: Session = Depends(get_db)) -> CauseRepository:
 
     Parameters
     ----------
-    db : Session
+    db : Session or AsyncSession
         The SQLAlchemy session dependency injected by FastAPI, used to perform
         database operations.
 
     Returns
     -------
     CauseRepository
-        An instance of CauseRepository initialized with the given database session.
+        A CauseRepository bound to the given session whose methods are awaited: run on the
+        threadpool in sync mode, or as AsyncCauseRepository in async mode.
     """
-    return CauseRepository(db)
+    return make_repository(db, CauseRepository, AsyncCauseRepository)
@@ -0,0 +1,167 @@
+"""
+Incremental parsing of cause import uploads.
+
+Uploads are read chunk by chunk from the request stream and turned into
+validated rows as soon as a full record is available, so an import never holds
+more than one batch of rows in memory.
+
+Two formats are accepted:
+
+- CSV (default) with a header line naming the columns `title`, `description`,
+  `payment_link` and optionally `image_links` (space separated URLs);
+- NDJSON (`Content-Type: application/x-ndjson`), one JSON object per line with
+  the same fields, `image_links` being a list.
+"""
+
+import codecs
+import csv
+import json
+from typing import AsyncIterator, List, Optional, Tuple
+
+from pydantic import ValidationError
+
+from app.config.env_variables import UPLOAD_MAX_LINE_LENGTH
+
+from .schemas import ImportCause
+
+NDJSON_CONTENT_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+
+
+async def iter_lines(
+    stream: AsyncIterator[bytes], max_length: int = UPLOAD_MAX_LINE_LENGTH
+) -> AsyncIterator[str]:
+    """
+    Splits a stream of UTF-8 bytes into lines, without the line terminators.
+
+    Raises
+    ------
+    ValueError
+        If a line is longer than `max_length` characters.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    # The start of the current line, kept as the pieces received so far
+    pending: List[str] = []
+    pending_length = 0
+    async for chunk in stream:
+        text = decoder.decode(chunk)
+        start = 0
+        end = text.find("\n")
+        while end != -1:
+            if pending_length + end - start > max_length:
+                raise ValueError(f"Line longer than {max_length} characters")
+            pending.append(text[start:end])
+            yield "".join(pending).rstrip("\r")
+            pending, pending_length = [], 0
+            start = end + 1
+            end = text.find("\n", start)
+
+        pending_length += len(text) - start
+        if pending_length > max_length:
+            raise ValueError(f"Line longer than {max_length} characters")
+        pending.append(text[start:])
+
+    pending.append(decoder.decode(b"", final=True))
+    line = "".join(pending)
+    if len(line) > max_length:
+        raise ValueError(f"Line longer than {max_length} characters")
+    if line:
+        yield line.rstrip("\r")
+
+
+async def iter_csv_records(
+    stream: AsyncIterator[bytes], max_length: int = UPLOAD_MAX_LINE_LENGTH
+) -> AsyncIterator[Tuple[int, List[str]]]:
+    """
+    Parses CSV records, including quoted fields spanning several lines.
+
+    Yields
+    ------
+    tuple[int, list[str]]
+        The line number where the record starts and its fields.
+
+    Raises
+    ------
+    ValueError
+        If a record is longer than `max_length` characters.
+    """
+    record, start, line_number = [], 0, 0
+    quotes, length = 0, 0
+    async for line in iter_lines(stream, max_length):
+        line_number += 1
+        if not record:
+            start = line_number
+        record.append(line)
+        length += len(line) + 1
+        if length > max_length + 1:
+            raise ValueError(f"Record longer than {max_length} characters")
+        # Quotes are escaped by doubling them, so a record is complete once its
+        # quotes are balanced.
+        quotes += line.count('"')
+        if quotes % 2 == 0:
+            text = "\n".join(record)
+            record, quotes, length = [], 0, 0
+            if text.strip():
+                yield start, parse_csv_record(text)
+
+    if record:
+        yield start, parse_csv_record("\n".join(record))
+
+
+def parse_csv_record(text: str) -> List[str]:
+    """
+    Splits the text of one CSV record into its fields.
+    """
+    return next(csv.reader([text]), [])
+
+
+async def iter_import_rows(
+    stream: AsyncIterator[bytes], content_type: Optional[str]
+) -> AsyncIterator[Tuple[int, Optional[ImportCause], Optional[list]]]:
+    """
+    Parses and validates the rows of an import upload.
+
+    Parameters
+    ----------
+    stream : AsyncIterator[bytes]
+        The request body.
+    content_type : str, optional
+        The Content-Type of the request, which selects the format.
+
+    Yields
+    ------
+    tuple[int, ImportCause or None, list or None]
+        The line number of the row, and either the validated row or its errors.
+    """
+    if (content_type or "").split(";")[0].strip().lower() in NDJSON_CONTENT_TYPES:
+        line_number = 0
+        async for line in iter_lines(stream):
+            line_number += 1
+            if not line.strip():
+                continue
+            try:
+                yield line_number, ImportCause.model_validate(json.loads(line)), None
+            except ValueError as e:
+                yield line_number, None, import_errors(e)
+        return
+
+    header = None
+    async for line_number, fields in iter_csv_records(stream):
+        if header is None:
+            header = [name.strip() for name in fields]
+            continue
+        data = dict(zip(header, fields))
+        if "image_links" in data:
+            data["image_links"] = data["image_links"].split()
+        try:
+            yield line_number, ImportCause.model_validate(data), None
+        except ValidationError as e:
+            yield line_number, None, import_errors(e)
+
+
+def import_errors(error: ValueError) -> list:
+    """
+    Describes why a row was rejected.
+    """
+    if isinstance(error, ValidationError):
+        return error.errors(include_url=False, include_context=False, include_input=False)
+    return [str(error)]
@@ -1,11 +1,48 @@
-from sqlalchemy import JSON, Boolean, Column, ForeignKey, Integer, String
-from sqlalchemy.orm import relationship
+from sqlalchemy import (
+    DDL,
+    JSON,
+    Boolean,
+    Column,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    event,
+    func,
+    select,
+)
+from sqlalchemy.orm import column_property, relationship
 
+from app.infra.db.database import Base
 from app.infra.db.shared.models import TimeStampModel
 
 
+class CauseDonationCounter(Base):
+    """
+    One shard of the donation counters of a cause.
+
+    Each cause has up to DONATION_COUNTER_SHARDS rows, and every write updates a
+    random one, so concurrent donations to the same cause rarely wait on each
+    other's row lock. The counts of a cause are the sums over its shards.
+    """
+
+    __tablename__ = "cause_donation_counters"
+
+    cause_id = Column(Integer, ForeignKey("causes.id", ondelete="CASCADE"), primary_key=True)
+    shard = Column(Integer, primary_key=True)
+    donations_count = Column(Integer, nullable=False, default=0)
+    paid_count = Column(Integer, nullable=False, default=0)
+
+
 class Cause(TimeStampModel):
     __tablename__ = "causes"
+    __table_args__ = (
+        Index("ix_causes_created_at_id", "created_at", "id"),
+        Index(
+            "ix_causes_institute_active_created", "institute_id", "is_active", "created_at", "id"
+        ),
+        Index("ix_causes_active_created", "is_active", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, nullable=False)
@@ -17,3 +54,76 @@ class Cause(TimeStampModel):
     donations = relationship("Donation", back_populates="cause")
     institute_id = Column(Integer, ForeignKey('institute.id'))
     institute = relationship("Institute", back_populates="causes")
+
+    donations_count = column_property(
+        select(func.coalesce(func.sum(CauseDonationCounter.donations_count), 0))
+        .where(CauseDonationCounter.cause_id == id)
+        .correlate_except(CauseDonationCounter)
+        .scalar_subquery()
+    )
+    paid_donations_count = column_property(
+        select(func.coalesce(func.sum(CauseDonationCounter.paid_count), 0))
+        .where(CauseDonationCounter.cause_id == id)
+        .correlate_except(CauseDonationCounter)
+        .scalar_subquery()
+    )
+
+
+# Full-text search over title and description.
+#
+# On Postgres the causes table gets a generated, weighted `search_vector` tsvector
+# column with a GIN index. On SQLite an external-content FTS5 table mirrors the
+# searchable columns and is kept in sync by triggers. Neither is mapped on the model,
+# since they only exist on their dialect; the migration creates the same objects.
+SEARCH_CONFIG = "simple"
+
+POSTGRES_SEARCH_DDL = [
+    f"""
+    ALTER TABLE causes ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(title, '')), 'A')
+        || setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(description, '')), 'B')
+    ) STORED
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_causes_search_vector ON causes USING GIN (search_vector)",
+]
+
+SQLITE_SEARCH_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS causes_fts USING fts5(
+        title, description, content='causes', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS causes_fts_ai AFTER INSERT ON causes BEGIN
+        INSERT INTO causes_fts (rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS causes_fts_ad AFTER DELETE ON causes BEGIN
+        INSERT INTO causes_fts (causes_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS causes_fts_au AFTER UPDATE OF title, description ON causes
+    BEGIN
+        INSERT INTO causes_fts (causes_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO causes_fts (rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END
+    """,
+]
+
+for statement in POSTGRES_SEARCH_DDL:
+    event.listen(Cause.__table__, "after_create", DDL(statement).execute_if(dialect="postgresql"))
+for statement in SQLITE_SEARCH_DDL:
+    event.listen(Cause.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+event.listen(
+    Cause.__table__,
+    "before_drop",
+    DDL("DROP TABLE IF EXISTS causes_fts").execute_if(dialect="sqlite"),
+)
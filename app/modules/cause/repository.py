@@ -1,8 +1,113 @@
+import csv
+import io
+import json
+import random
+import re
+import time
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import (
+    case,
+    column,
+    exists,
+    func,
+    insert,
+    literal,
+    literal_column,
+    select,
+    table,
+    text,
+    update,
+)
 from sqlalchemy.orm import Session
+from sqlalchemy.util import await_only
+
+from app.config.env_variables import CACHE_TTL_SECONDS, DONATION_COUNTER_SHARDS
+from app.infra.cache.cache import cache
+from app.infra.db.models import Cause, CauseDonationCounter, Donation, Institute, User
+from app.infra.db.pagination import Page, page_size, paginate
+from app.infra.db.repository import AsyncRepository
+from app.infra.db.routing import read_only
+from app.infra.db.statements import on_conflict_insert
+from app.infra.db.versions import bump_version, get_version
+
+from .models import SEARCH_CONFIG
+from .schemas import CauseFilters, CauseSchema, CreateCause, ImportCause, UpdateCause
+
+# Words of a search query; anything else is dropped so the query cannot inject
+# tsquery or FTS5 operators.
+SEARCH_TERM = re.compile(r"\w+")
+
+CAUSES_FTS = table("causes_fts", column("rowid"))
+
+# Columns returned by the writes to a cause. The donation counters are column
+# properties, which the ORM cannot load from a RETURNING clause, so the row is
+# returned as plain columns and validated straight into a `CauseSchema`.
+CAUSE_RETURNING = (
+    *Cause.__table__.c,
+    Cause.donations_count.expression.label("donations_count"),
+    Cause.paid_donations_count.expression.label("paid_donations_count"),
+)
+
+# Postgres staging table of cause imports. `ord` keeps the upload order, so the
+# first of several rows with the same title wins.
+IMPORT_STAGING_COLUMNS = ("title", "description", "payment_link", "image_links")
+CREATE_IMPORT_STAGING = """
+    CREATE TEMPORARY TABLE cause_import_staging (
+        ord serial,
+        title text NOT NULL,
+        description text NOT NULL,
+        payment_link text NOT NULL,
+        image_links text NOT NULL
+    ) ON COMMIT DROP
+"""
+MERGE_IMPORT_STAGING = """
+    INSERT INTO causes (
+        title, description, payment_link, image_links, is_active, institute_id,
+        created_at, updated_at
+    )
+    SELECT DISTINCT ON (staging.title)
+        staging.title, staging.description, staging.payment_link,
+        staging.image_links::json, true, :institute_id, :now, :now
+    FROM cause_import_staging AS staging
+    WHERE NOT EXISTS (
+        SELECT 1 FROM causes
+        WHERE causes.institute_id = :institute_id AND causes.title = staging.title
+    )
+    ORDER BY staging.title, staging.ord
+    RETURNING causes.id
+"""
+
+
+def invalidate_causes(*cause_ids: int) -> None:
+    """
+    Drops the cached pages of causes and the cached causes with the given IDs.
+
+    Called after committing any write that changes a cause itself.
+    """
+    cache.invalidate("causes", *(f"cause:{cause_id}" for cause_id in cause_ids))
 
-from app.infra.db.models import Cause, Institute
 
-from .schemas import CauseSchema, CreateCause, UpdateCause
+def invalidate_donation_counts(*cause_ids: int) -> None:
+    """
+    Drops the cached causes with the given IDs after a change to their donation counts.
+
+    Donations are written far more often than causes, so they leave the cached pages of
+    causes, and the version of the list, alone: see `donation_counts_period`.
+    """
+    cache.invalidate(*(f"cause:{cause_id}" for cause_id in cause_ids))
+
+
+def donation_counts_period() -> int:
+    """
+    Numbers the periods of CACHE_TTL_SECONDS the donation counts of listed causes are
+    refreshed at.
+
+    Part of the version and cache key of the pages of causes, so the counts they show
+    are at most one period old, without a donation invalidating every page.
+    """
+    return int(time.time() // max(CACHE_TTL_SECONDS, 1))
 
 
 class CauseRepository:
@@ -26,141 +131,375 @@ class CauseRepository:
         """
         self.db = db
 
-    def list_causes(self):
+    @read_only
+    def list_causes(
+        self,
+        cursor: Optional[str] = None,
+        limit: Optional[int] = None,
+        filters: Optional[CauseFilters] = None,
+    ) -> Page:
         """
-        List all causes in the database.
+        List causes in the database, one page at a time.
+
+        Causes are filtered in the database, ordered by creation date and paginated with
+        a keyset cursor over `(created_at, id)`. The filters and the ordering match the
+        `(institute_id, is_active, created_at, id)` and `(is_active, created_at, id)`
+        indexes on the causes table. Pages are cached until a cause changes; the donation
+        counts they show are refreshed every CACHE_TTL_SECONDS.
+
+        Parameters
+        ----------
+        cursor : str, optional
+            The cursor returned with the previous page; None for the first page.
+        limit : int, optional
+            The maximum number of causes to return.
+        filters : CauseFilters, optional
+            The institute, state and creation dates to filter on, and the sort order
+            (default is every cause, oldest first).
+
+        Returns
+        -------
+        Page
+            The causes of the page, as `CauseSchema`, and the cursor of the next page.
+        """
+        filters = filters or CauseFilters()
+
+        def load() -> Page:
+            query = self.db.query(Cause)
+            if filters.institute_id is not None:
+                query = query.filter(Cause.institute_id == filters.institute_id)
+            if filters.is_active is not None:
+                query = query.filter(Cause.is_active == filters.is_active)
+            if filters.created_after is not None:
+                query = query.filter(Cause.created_at >= filters.created_after)
+            if filters.created_before is not None:
+                query = query.filter(Cause.created_at < filters.created_before)
+
+            page = paginate(
+                query,
+                (Cause.created_at, Cause.id),
+                cursor=cursor,
+                limit=limit,
+                descending=filters.descending,
+            )
+            return page._replace(
+                items=[CauseSchema.model_validate(cause) for cause in page.items]
+            )
+
+        key = (cursor, page_size(limit), *filters.model_dump().values(), donation_counts_period())
+        return cache.get_or_set("causes", key, load, tags=("causes",))
+
+    @read_only
+    def search_causes(self, q: str, limit: Optional[int] = None) -> list[CauseSchema]:
+        """
+        Full-text search over the title and description of causes.
+
+        Every word of the query must match, the last characters of each word being
+        treated as a prefix ("edu" matches "education"). Results are ranked by
+        relevance, with title matches ranking above description matches. Postgres uses
+        the GIN-indexed `search_vector` column, SQLite the `causes_fts` FTS5 table.
 
-        This method retrieves all causes from the database.
+        Parameters
+        ----------
+        q : str
+            The search query.
+        limit : int, optional
+            The maximum number of causes to return.
 
         Returns
         -------
-        List[Cause]
-            A list of all causes retrieved from the database.
+        list[CauseSchema]
+            The matching causes, best match first.
         """
-        causes = self.db.query(Cause).all()
-        if not causes:
+        terms = SEARCH_TERM.findall(q)
+        if not terms:
             return []
+
+        if self.db.get_bind().dialect.name == "postgresql":
+            tsquery = func.to_tsquery(SEARCH_CONFIG, " & ".join(f"{term}:*" for term in terms))
+            search_vector = literal_column("causes.search_vector")
+            query = (
+                self.db.query(Cause)
+                .filter(search_vector.op("@@")(tsquery))
+                .order_by(func.ts_rank(search_vector, tsquery).desc(), Cause.id)
+            )
+        else:
+            match = " AND ".join(f'"{term}"*' for term in terms)
+            query = (
+                self.db.query(Cause)
+                .join(CAUSES_FTS, CAUSES_FTS.c.rowid == Cause.id)
+                .filter(literal_column("causes_fts").op("MATCH")(match))
+                .order_by(literal_column("bm25(causes_fts, 10.0, 1.0)"), Cause.id)
+            )
+
+        causes = query.limit(page_size(limit)).all()
         return [CauseSchema.model_validate(cause) for cause in causes]
 
-    def create_cause(self, user_id: int, data: CreateCause):
+    def create_cause(self, user_id: int, data: CreateCause) -> CauseSchema:
         """
         Create a new cause in the database.
 
-        This method creates a new cause in the database using the data provided in the
-        CreateCause schema.
+        The cause is created with a single INSERT ... SELECT ... RETURNING statement,
+        guarded by the checks that the user is an admin of the institute and that the
+        institute has no cause with the same title. Only when no row is inserted are the
+        checks run again to tell which one failed.
 
         Parameters
         ----------
+        user_id : int
+            The ID of the user creating the cause.
         data : CreateCause
             The schema representing the cause to be created.
 
         Returns
         -------
-        CreateCause
+        CauseSchema
             The schema representing the created cause.
-        """
 
-        if self.get_cause_by_title(title=data.title, institute_id=data.institute_id):
+        Raises
+        ------
+        ValueError
+            If the cause already exists, the institute does not exist or the user is not
+            one of its admins.
+        """
+        values = {
+            "title": data.title,
+            "description": data.description,
+            "payment_link": data.payment_link,
+            "image_links": data.image_links,
+            "is_active": True,
+            "institute_id": data.institute_id,
+        }
+        is_admin = exists().where(User.id == user_id, User.institute_id == data.institute_id)
+        title_taken = exists().where(
+            Cause.institute_id == data.institute_id, Cause.title == data.title
+        )
+        rows = select(
+            *(literal(value, type_=Cause.__table__.c[key].type) for key, value in values.items())
+        ).where(is_admin, ~title_taken)
+        row = self.db.execute(
+            insert(Cause).from_select(list(values), rows).returning(*CAUSE_RETURNING)
+        ).first()
+
+        if row is None:
+            self.db.rollback()
+            if self.get_cause_by_title(title=data.title, institute_id=data.institute_id):
+                raise ValueError("Cause already exists")
+            self.get_institute_for_admin(user_id=user_id, institute_id=data.institute_id)
+            # Both checks pass again: the title was taken by a concurrent request
             raise ValueError("Cause already exists")
 
-        if not self.is_user_allowed_by_institute(
-            user_id=user_id, institute_id=data.institute_id
-        ):
-            raise ValueError("User not allowed")
+        bump_version(self.db, Cause.__tablename__)
+        self.db.commit()
+        cause = CauseSchema.model_validate(row)
+        invalidate_causes(cause.id)
+        return cause
 
-        cause = Cause(
-            title=data.title,
-            description=data.description,
-            payment_link=data.payment_link,
-            image_links=data.image_links,
-            is_active=True,
-        )
+    def begin_cause_import(self, user_id: int, institute_id: int) -> None:
+        """
+        Starts a bulk import of causes into an institute.
 
-        institute = self.db.query(Institute).filter(Institute.id == data.institute_id).first()
-        cause.institute = institute
+        The user is authorized once for the whole import. On Postgres a temporary staging
+        table, dropped at commit, is created to receive the rows. The import runs in the
+        session's transaction until `finish_cause_import` commits it.
 
-        self.db.add(cause)
-        self.db.commit()
-        self.db.refresh(cause)
+        Parameters
+        ----------
+        user_id : int
+            The ID of the user importing the causes.
+        institute_id : int
+            The ID of the institute the causes are imported into.
 
-        return {
-            "id": cause.id,
-            "title": cause.title,
-            "description": cause.description,
-            "payment_link": cause.payment_link,
-            "image_links": cause.image_links,
-            "institute_id": cause.institute_id,
-            "is_active": True,
-        }
+        Raises
+        ------
+        ValueError
+            If the institute does not exist or the user is not one of its admins.
+        """
+        self.get_institute_for_admin(user_id=user_id, institute_id=institute_id)
+        self.db.info["causes_imported"] = 0
+        if self.db.get_bind().dialect.name == "postgresql":
+            self.db.execute(text(CREATE_IMPORT_STAGING))
 
-    def update_cause(self, cause_id: int, user_id: int, data: UpdateCause):
+    def stage_causes(self, institute_id: int, causes: list[ImportCause]) -> int:
         """
-        Update a cause in the database.
+        Loads a batch of imported causes.
 
-        This method updates a cause in the database using the data provided in the
-        UpdateCause schema.
+        On Postgres the batch is streamed into the staging table with COPY. Other
+        databases insert the causes directly, skipping titles the institute already has.
 
         Parameters
         ----------
-        data : UpdateCause
-            The schema representing the cause to be updated.
-        cause_id : str
-            The ID of the cause to update.
         institute_id : int
-            The ID of the institute to which the cause belongs.
+            The ID of the institute the causes are imported into.
+        causes : list[ImportCause]
+            The batch of causes.
 
         Returns
         -------
-        Cause
-
+        int
+            The number of causes created by this call (always 0 on Postgres, where the
+            causes are created by `finish_cause_import`).
         """
-        if not self.is_user_allowed(user_id=user_id, cause_id=cause_id):
-            raise ValueError("User not allowed")
+        if self.db.get_bind().dialect.name == "postgresql":
+            self._copy_to_staging(causes)
+            return 0
+
+        existing = {
+            title
+            for (title,) in self.db.query(Cause.title).filter(
+                Cause.institute_id == institute_id,
+                Cause.title.in_({cause.title for cause in causes}),
+            )
+        }
+        rows = []
+        for cause in causes:
+            if cause.title in existing:
+                continue
+            existing.add(cause.title)
+            rows.append({**cause.model_dump(), "institute_id": institute_id, "is_active": True})
+
+        if rows:
+            self.db.execute(insert(Cause), rows)
+        self.db.info["causes_imported"] += len(rows)
+        return len(rows)
+
+    def finish_cause_import(self, institute_id: int) -> int:
+        """
+        Completes a bulk import of causes and commits it.
 
-        cause = self.db.query(Cause).filter(Cause.id == cause_id).first()
-        if not cause:
-            raise ValueError("Cause not found")
+        On Postgres the staged rows are merged into the causes table with a single
+        INSERT ... SELECT, skipping titles that already exist in the institute or are
+        repeated in the upload. If the import created any cause, here or in
+        `stage_causes`, the version of the causes table is bumped and the cached pages
+        of causes are dropped.
 
-        # Assuming `data` is a Pydantic model, use `dict()` to get a dictionary of the fields
-        update_data = data.model_dump(exclude_unset=True)
-        for key, value in update_data.items():
-            setattr(cause, key, value)
+        Parameters
+        ----------
+        institute_id : int
+            The ID of the institute the causes are imported into.
 
+        Returns
+        -------
+        int
+            The number of causes created by the merge.
+        """
+        created = 0
+        if self.db.get_bind().dialect.name == "postgresql":
+            now = datetime.now()
+            result = self.db.execute(
+                text(MERGE_IMPORT_STAGING), {"institute_id": institute_id, "now": now}
+            )
+            created = len(result.all())
+        imported = created + self.db.info.pop("causes_imported", 0)
+        if imported:
+            bump_version(self.db, Cause.__tablename__)
         self.db.commit()
-        self.db.refresh(cause)
-        return CauseSchema.model_validate(cause)
+        if imported:
+            invalidate_causes()
+        return created
 
-    def toogle_cause_active(self, user_id: int, cause_id: str):
+    def _copy_to_staging(self, causes: list[ImportCause]) -> None:
+        """
+        Streams a batch of causes into the staging table with COPY.
+        """
+        records = [
+            (cause.title, cause.description, cause.payment_link, json.dumps(cause.image_links))
+            for cause in causes
+        ]
+        connection = self.db.connection().connection.driver_connection
+        if self.db.get_bind().dialect.driver == "asyncpg":
+            await_only(
+                connection.copy_records_to_table(
+                    "cause_import_staging", records=records, columns=IMPORT_STAGING_COLUMNS
+                )
+            )
+            return
+
+        buffer = io.StringIO()
+        # Quoting every field keeps empty strings apart from NULLs
+        csv.writer(buffer, quoting=csv.QUOTE_ALL).writerows(records)
+        buffer.seek(0)
+        with connection.cursor() as cursor:
+            cursor.copy_expert(
+                f"COPY cause_import_staging ({', '.join(IMPORT_STAGING_COLUMNS)}) "
+                "FROM STDIN WITH (FORMAT csv)",
+                buffer,
+            )
+
+    def update_cause(self, cause_id: int, user_id: int, data: UpdateCause):
         """
         Update a cause in the database.
 
-        This method updates a cause in the database using the data provided in the
-        UpdateCause schema.
+        The cause is updated with a single UPDATE ... RETURNING statement, restricted to
+        the causes of the institutes the user is an admin of.
 
         Parameters
         ----------
-        cause_id : str
+        cause_id : int
             The ID of the cause to update.
-        institute_id : int
-            The ID of the institute to which the cause belongs.
+        user_id : int
+            The ID of the user updating the cause.
+        data : UpdateCause
+            The schema representing the cause fields to be updated.
 
         Returns
         -------
-        Cause
+        CauseSchema
+            The schema representing the updated cause.
+        """
+        return self._update_cause(cause_id, user_id, data.model_dump(exclude_unset=True))
 
+    def toogle_cause_active(self, user_id: int, cause_id: int):
         """
-        if not self.is_user_allowed(user_id=user_id, cause_id=cause_id):
-            raise ValueError("User not allowed")
+        Activate or deactivate a cause.
 
-        cause = self.db.query(Cause).filter(Cause.id == cause_id).first()
-        if not cause:
-            raise ValueError("Cause not found")
+        The flag is flipped in the database (`SET is_active = NOT is_active`), so the
+        cause does not need to be loaded first.
+
+        Parameters
+        ----------
+        user_id : int
+            The ID of the user updating the cause.
+        cause_id : int
+            The ID of the cause to update.
+
+        Returns
+        -------
+        CauseSchema
+            The schema representing the updated cause.
+        """
+        return self._update_cause(cause_id, user_id, {"is_active": ~Cause.is_active})
+
+    def _update_cause(self, cause_id: int, user_id: int, values: dict) -> CauseSchema:
+        """
+        Applies an UPDATE ... RETURNING to a cause the user is allowed to manage.
+
+        Raises
+        ------
+        ValueError
+            If the cause does not exist or the user is not an admin of its institute.
+        """
+        is_admin = exists().where(User.id == user_id, User.institute_id == Cause.institute_id)
+        statement = (
+            update(Cause)
+            .where(Cause.id == cause_id, is_admin)
+            .values(**values)
+            .returning(*CAUSE_RETURNING)
+            .execution_options(synchronize_session=False)
+        )
+        row = self.db.execute(statement).first()
 
-        cause.is_active = not cause.is_active
+        if row is None:
+            self.db.rollback()
+            # Raises the reason why no cause was updated
+            self.get_cause_for_admin(user_id=user_id, cause_id=cause_id)
+            raise ValueError("Cause not found")
 
+        bump_version(self.db, Cause.__tablename__)
         self.db.commit()
-        self.db.refresh(cause)
-        return CauseSchema.model_validate(cause)
+        cause = CauseSchema.model_validate(row)
+        invalidate_causes(cause.id)
+        return cause
 
     def get_cause_by_title(self, title: str, institute_id: int):
         """
@@ -180,15 +519,17 @@ class CauseRepository:
         """
         return (
             self.db.query(Cause)
-            .filter(Cause.title == title and Cause.institute_id == institute_id)
+            .filter(Cause.title == title, Cause.institute_id == institute_id)
             .first()
         )
 
+    @read_only
     def get_cause_by_id(self, cause_id: int):
         """
         Get a cause from the database.
 
-        This method retrieves a cause from the database using the cause_id provided.
+        This method retrieves a cause from the database using the cause_id provided. The
+        cause is cached until it changes.
 
         Parameters
         ----------
@@ -200,56 +541,124 @@ class CauseRepository:
         Cause
             The cause retrieved from the database.
         """
-        cause = self.db.query(Cause).filter(Cause.id == cause_id).first()
-        return CauseSchema.model_validate(cause)
+        return cache.get_or_set(
+            "cause",
+            cause_id,
+            lambda: CauseSchema.model_validate(
+                self.db.query(Cause).filter(Cause.id == cause_id).first()
+            ),
+            tags=(f"cause:{cause_id}",),
+        )
+
+    @read_only
+    def get_causes_version(self) -> tuple:
+        """
+        Get the version of the list of causes.
+
+        Returns
+        -------
+        tuple
+            The version of the causes table, bumped by every write changing a cause, and
+            the period of the donation counts (`donation_counts_period`).
+        """
+        return get_version(self.db, Cause.__tablename__), donation_counts_period()
+
+    @read_only
+    def get_cause_version(self, cause_id: int) -> Optional[tuple]:
+        """
+        Get what identifies the current state of a cause, without loading it.
+
+        Parameters
+        ----------
+        cause_id : int
+            The ID of the cause.
+
+        Returns
+        -------
+        tuple or None
+            The `updated_at` and donation counts of the cause, or None if it does not exist.
+        """
+        row = (
+            self.db.query(Cause.updated_at, Cause.donations_count, Cause.paid_donations_count)
+            .filter(Cause.id == cause_id)
+            .first()
+        )
+        return tuple(row) if row is not None else None
 
-    def is_user_allowed(self, user_id: int, cause_id: int) -> bool:
+    def get_cause_for_admin(self, user_id: int, cause_id: int) -> Cause:
         """
-        Check if a user is allowed to access a cause.
+        Get a cause that the user is allowed to manage.
 
-        This method checks if a user is allowed to access a cause by checking if the
-        user is an admin of the cause's institute.
+        The cause and the check that the user is an admin of the cause's institute are
+        fetched in a single query, using an EXISTS on the user's primary key instead of
+        loading the institute and its admins.
 
         Parameters
         ----------
         user_id : int
             The ID of the user to check.
         cause_id : int
-            The ID of the cause to check.
+            The ID of the cause to retrieve.
 
         Returns
         -------
-        bool
-            True if the user is allowed to access the cause, False otherwise.
+        Cause
+            The cause retrieved from the database.
+
+        Raises
+        ------
+        ValueError
+            If the cause does not exist or the user is not an admin of its institute.
         """
-        cause = self.db.query(Cause).filter(Cause.id == cause_id).first()
-        institute = cause.institute
-        return user_id in [admin.id for admin in institute.admins]
+        is_admin = exists().where(User.id == user_id, User.institute_id == Cause.institute_id)
+        row = (
+            self.db.query(Cause, is_admin.label("is_admin")).filter(Cause.id == cause_id).first()
+        )
+        if not row:
+            raise ValueError("Cause not found")
+
+        cause, allowed = row
+        if not allowed:
+            raise ValueError("User not allowed")
+        return cause
 
-    def is_user_allowed_by_institute(self, user_id: int, institute_id: int) -> bool:
+    def get_institute_for_admin(self, user_id: int, institute_id: int) -> Institute:
         """
-        Check if a user is allowed to access an institute.
+        Get an institute that the user is allowed to manage.
 
-        This method checks if a user is allowed to access an institute by checking if the
-        user is an admin of the institute.
+        The institute and the check that the user is one of its admins are fetched in a
+        single query.
 
         Parameters
         ----------
         user_id : int
             The ID of the user to check.
         institute_id : int
-            The ID of the institute to check.
+            The ID of the institute to retrieve.
 
         Returns
         -------
-        bool
-            True if the user is allowed to access the institute, False otherwise.
+        Institute
+            The institute retrieved from the database.
+
+        Raises
+        ------
+        ValueError
+            If the institute does not exist or the user is not one of its admins.
         """
-        institute = self.db.query(Institute).filter(Institute.id == institute_id).first()
-        if not institute:
+        is_admin = exists().where(User.id == user_id, User.institute_id == Institute.id)
+        row = (
+            self.db.query(Institute, is_admin.label("is_admin"))
+            .filter(Institute.id == institute_id)
+            .first()
+        )
+        if not row:
             raise ValueError("Institute not found")
 
-        return user_id in [admin.id for admin in institute.admins]
+        institute, allowed = row
+        if not allowed:
+            raise ValueError("User not allowed")
+        return institute
 
     def delete_cause(self, cause_id: int, user_id: int):
         """
@@ -269,12 +678,165 @@ class CauseRepository:
         Cause
             The cause that was deleted.
         """
-        if not self.is_user_allowed(user_id=user_id, cause_id=cause_id):
-            raise ValueError("User not allowed")
-
-        cause = self.db.query(Cause).filter(Cause.id == cause_id).first()
-        if not cause:
-            raise ValueError("Cause not found")
+        cause = self.get_cause_for_admin(user_id=user_id, cause_id=cause_id)
 
         self.db.delete(cause)
+        bump_version(self.db, Cause.__tablename__)
         self.db.commit()
+        invalidate_causes(cause_id)
+
+
+class DonationCounterRepository:
+    """
+    Repository maintaining the sharded donation counters of causes.
+
+    Counter changes are only staged in the session; they are committed together
+    with the donation writes that caused them.
+
+    Attributes
+    ----------
+    db : Session
+        The SQLAlchemy database session used for database operations.
+    """
+
+    def __init__(self, db: Session) -> None:
+        """
+        Initializes the DonationCounterRepository with the given database session.
+
+        Parameters
+        ----------
+        db : Session
+            The SQLAlchemy session to use for database operations.
+        """
+        self.db = db
+
+    def add(self, cause_id: int, donations: int = 0, paid: int = 0) -> None:
+        """
+        Adds to the donation counters of a cause.
+
+        The change goes to a random shard, with a single upsert on Postgres and SQLite.
+
+        Parameters
+        ----------
+        cause_id : int
+            The ID of the cause.
+        donations : int, optional
+            The change in the number of donations (default is 0).
+        paid : int, optional
+            The change in the number of paid donations (default is 0).
+        """
+        if cause_id is None or not (donations or paid):
+            return
+
+        shard = random.randrange(DONATION_COUNTER_SHARDS)
+        statement = on_conflict_insert(self.db, CauseDonationCounter)
+        if statement is not None:
+            statement = statement.values(
+                cause_id=cause_id, shard=shard, donations_count=donations, paid_count=paid
+            )
+            statement = statement.on_conflict_do_update(
+                index_elements=[CauseDonationCounter.cause_id, CauseDonationCounter.shard],
+                set_={
+                    "donations_count": CauseDonationCounter.donations_count + donations,
+                    "paid_count": CauseDonationCounter.paid_count + paid,
+                },
+            )
+            self.db.execute(statement)
+            return
+
+        updated = (
+            self.db.query(CauseDonationCounter)
+            .filter_by(cause_id=cause_id, shard=shard)
+            .update(
+                {
+                    CauseDonationCounter.donations_count: (
+                        CauseDonationCounter.donations_count + donations
+                    ),
+                    CauseDonationCounter.paid_count: CauseDonationCounter.paid_count + paid,
+                },
+                synchronize_session=False,
+            )
+        )
+        if not updated:
+            self.db.add(
+                CauseDonationCounter(
+                    cause_id=cause_id, shard=shard, donations_count=donations, paid_count=paid
+                )
+            )
+
+    def reconcile(self, dry_run: bool = False) -> dict:
+        """
+        Recomputes every donation counter from the donations table.
+
+        On Postgres the counters table is locked for writes meanwhile, so donations
+        recorded concurrently are counted exactly once.
+
+        Parameters
+        ----------
+        dry_run : bool, optional
+            Only report the differences, without fixing them (default is False).
+
+        Returns
+        -------
+        dict
+            The number of causes with donations and of causes whose counters were wrong.
+        """
+        if self.db.get_bind().dialect.name == "postgresql":
+            self.db.execute(text("LOCK TABLE cause_donation_counters IN EXCLUSIVE MODE"))
+
+        current = {
+            cause_id: (donations, paid)
+            for cause_id, donations, paid in self.db.query(
+                CauseDonationCounter.cause_id,
+                func.sum(CauseDonationCounter.donations_count),
+                func.sum(CauseDonationCounter.paid_count),
+            ).group_by(CauseDonationCounter.cause_id)
+        }
+        actual = {
+            cause_id: (donations, paid or 0)
+            for cause_id, donations, paid in self.db.query(
+                Donation.cause_id,
+                func.count(Donation.id),  # pylint: disable=not-callable
+                func.sum(case((Donation.is_paid.is_(True), 1), else_=0)),
+            )
+            .join(Cause, Cause.id == Donation.cause_id)
+            .group_by(Donation.cause_id)
+        }
+        wrong = [
+            cause_id
+            for cause_id in current.keys() | actual.keys()
+            if current.get(cause_id, (0, 0)) != actual.get(cause_id, (0, 0))
+        ]
+
+        if dry_run or not wrong:
+            self.db.rollback()
+        else:
+            self.db.query(CauseDonationCounter).delete(synchronize_session=False)
+            if actual:
+                self.db.execute(
+                    insert(CauseDonationCounter),
+                    [
+                        {
+                            "cause_id": cause_id,
+                            "shard": 0,
+                            "donations_count": donations,
+                            "paid_count": paid,
+                        }
+                        for cause_id, (donations, paid) in actual.items()
+                    ],
+                )
+            bump_version(self.db, Cause.__tablename__)
+            self.db.commit()
+            invalidate_causes(*wrong)
+
+        return {
+            "causes": len(actual),
+            "corrected": 0 if dry_run else len(wrong),
+            "wrong": len(wrong),
+        }
+
+
+class AsyncCauseRepository(AsyncRepository[CauseRepository]):
+    """
+    Adapter running the queries of `CauseRepository` on an `AsyncSession`.
+    """
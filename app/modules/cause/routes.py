@@ -1,37 +1,118 @@
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Optional
 
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request
+
+from app.config.env_variables import (
+    CAUSE_IMPORT_BATCH_SIZE,
+    CAUSE_IMPORT_MAX_ERRORS,
+    PAGE_SIZE_DEFAULT,
+)
+from app.infra.http.conditional import etag_matches, make_etag, not_modified, set_cache_headers
+from app.infra.http.responses import json_response
 from app.infra.logger.config import logger
-from app.modules.user.schemas import User
+from app.modules.user.principal import Principal
 from app.modules.auth.dependecies import get_current_user
+from app.modules.idempotency.dependencies import get_idempotency_repository
+from app.modules.idempotency.repository import IdempotencyRepository
+from app.modules.idempotency.runner import run_idempotent
 
 from . import schemas
 from .dependencies import get_cause_repository
+from .importer import iter_import_rows
 from .repository import CauseRepository
 
 cause_routes = APIRouter(prefix="/causes", tags=["Causes"])
 
 
 @cause_routes.post("/", response_model=schemas.CauseSchema)
-def create_cause(
+async def create_cause(
     cause: schemas.CreateCause,
-    user: User = Depends(get_current_user),
+    user: Principal = Depends(get_current_user),
+    cause_repository: CauseRepository = Depends(get_cause_repository),
+    idempotency_key: Optional[str] = Header(None, max_length=255),
+    idempotency_repository: IdempotencyRepository = Depends(get_idempotency_repository),
+):
+    async def create():
+        try:
+            user_id = user.id
+            new_cause = await cause_repository.create_cause(user_id, cause)
+            logger.info("Cause created successfully: %s", new_cause.id)
+            return new_cause
+        except Exception as e:
+            logger.error("An error occurred when creating a cause: %s", e)
+            raise HTTPException(status_code=400, detail=str(e)) from e
+
+    return await run_idempotent(
+        idempotency_repository, f"cause:{user.id}", idempotency_key, cause, create
+    )
+
+
+@cause_routes.post("/import", response_model=schemas.CauseImportResult)
+async def import_causes(
+    request: Request,
+    institute_id: int,
+    user: Principal = Depends(get_current_user),
     cause_repository: CauseRepository = Depends(get_cause_repository),
 ):
+    """
+    Import causes into an institute from a CSV or NDJSON upload.
+
+    The upload is the raw request body: CSV with a header line (the default) or NDJSON when
+    sent as `application/x-ndjson`. It is parsed while it is received and loaded in batches
+    of CAUSE_IMPORT_BATCH_SIZE rows (with COPY on Postgres). Valid rows are imported in a
+    single transaction; rows whose title already exists in the institute are skipped and
+    invalid rows are reported by line number.
+
+    Parameters
+    ----------
+    request : Request
+        The request whose body is the upload.
+    institute_id : int
+        The ID of the institute to import the causes into.
+    cause_repository : CauseRepository = Depends(get_cause_repository)
+        The instance of CauseRepository used to perform database operations.
+
+    Returns
+    -------
+    CauseImportResult
+        How many rows were received, created and skipped, and the rejected rows.
+    """
     try:
-        user_id = user.id
-        new_cause_dict = cause_repository.create_cause(user_id, cause)
-        logger.info("Cause created successfully: %s", new_cause_dict['id'])
-        return schemas.CauseSchema(**new_cause_dict)
+        await cause_repository.begin_cause_import(user.id, institute_id)
+
+        received, created, errors, batch = 0, 0, [], []
+        async for line, cause, row_errors in iter_import_rows(
+            request.stream(), request.headers.get("content-type")
+        ):
+            if cause is None:
+                if len(errors) < CAUSE_IMPORT_MAX_ERRORS:
+                    errors.append(schemas.CauseImportError(line=line, errors=row_errors))
+                continue
+
+            received += 1
+            batch.append(cause)
+            if len(batch) >= CAUSE_IMPORT_BATCH_SIZE:
+                created += await cause_repository.stage_causes(institute_id, batch)
+                batch = []
+
+        if batch:
+            created += await cause_repository.stage_causes(institute_id, batch)
+        created += await cause_repository.finish_cause_import(institute_id)
+
+        logger.info("Causes imported into institute %s: %s created", institute_id, created)
+        return schemas.CauseImportResult(
+            received=received, created=created, skipped=received - created, errors=errors
+        )
     except Exception as e:
-        logger.error("An error occurred when creating a cause: %s", e)
+        logger.error("An error occurred when importing causes: %s", e)
         raise HTTPException(status_code=400, detail=str(e)) from e
 
 
 @cause_routes.put("/{cause_id}", response_model=schemas.CauseSchema)
-def update_cause(
+async def update_cause(
     cause_id: int,
     cause: schemas.UpdateCause,
-    user: User = Depends(get_current_user),
+    user: Principal = Depends(get_current_user),
     cause_repository: CauseRepository = Depends(get_cause_repository),
 ):
     """
@@ -57,29 +138,68 @@ def update_cause(
     """
     try:
         user_id = user.id
-        updated_cause = cause_repository.update_cause(cause_id, user_id, cause)
+        updated_cause = await cause_repository.update_cause(cause_id, user_id, cause)
         logger.info("Cause updated successfully: %s", updated_cause.id)
-        return updated_cause
+        return json_response(schemas.CAUSE_ADAPTER, updated_cause)
     except Exception as e:
         logger.error("An error occurred when updating a cause: %s", e)
         raise HTTPException(status_code=400, detail=str(e)) from e
 
 
+@cause_routes.get("/search", response_model=schemas.CausesList)
+async def search_causes(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(PAGE_SIZE_DEFAULT, ge=1),
+    cause_repository: CauseRepository = Depends(get_cause_repository),
+):
+    """
+    Search causes by title and description.
+
+    Every word of `q` must match a word of the title or description, as a prefix. Causes
+    are returned best match first, title matches ranking above description matches.
+
+    Parameters
+    ----------
+    q : str
+        The search query.
+    limit : int, optional
+        The maximum number of causes to return, capped by PAGE_SIZE_MAX.
+    cause_repository : CauseRepository = Depends(get_cause_repository)
+        The instance of CauseRepository used to perform database operations.
+
+    Returns
+    -------
+    CausesList
+        The schema representing the matching causes.
+    """
+    try:
+        causes = await cause_repository.search_causes(q, limit=limit)
+        logger.info("Causes searched successfully")
+        return json_response(schemas.CAUSES_LIST_ADAPTER, schemas.CausesList(causes=causes))
+    except Exception as e:
+        logger.error("An error occurred when searching causes: %s", e)
+        raise HTTPException(status_code=400, detail=str(e)) from e
+
+
 @cause_routes.get("/{cause_id}", response_model=schemas.CauseSchema)
-def get_cause(
+async def get_cause(
     cause_id: int,
+    request: Request,
     cause_repository: CauseRepository = Depends(get_cause_repository),
 ):
     """
     Get a cause.
 
     This route receives a cause_id in the path parameters and uses the CauseRepository to get the
-    cause from the database.
+    cause from the database. The ETag of the cause is built from its `updated_at` and donation
+    counts, read first; when it matches `If-None-Match`, 304 is returned without loading it.
 
     Parameters
     ----------
     cause_id : int
         The ID of the cause to be retrieved.
+    request : Request
+        The request, whose `If-None-Match` header is checked.
     cause_repository : CauseRepository = Depends(get_cause_repository)
         The instance of CauseRepository used to perform database operations.
 
@@ -89,25 +209,54 @@ def get_cause(
         The schema representing the retrieved cause.
     """
     try:
-        cause = cause_repository.get_cause_by_id(cause_id)
+        version = await cause_repository.get_cause_version(cause_id)
+        if version is not None:
+            etag = make_etag("cause", cause_id, *version)
+            if etag_matches(request, etag):
+                return not_modified(etag)
+        cause = await cause_repository.get_cause_by_id(cause_id)
+        response = json_response(schemas.CAUSE_ADAPTER, cause)
+        if version is not None:
+            set_cache_headers(response, etag)
         logger.info("Cause retrieved successfully: %s", cause.id)
-        return cause
+        return response
     except Exception as e:
         logger.error("An error occurred when retrieving a cause: %s", e)
         raise HTTPException(status_code=400, detail=str(e)) from e
 
 
 @cause_routes.get("/", response_model=schemas.CausesList)
-def list_causes(
+async def list_causes(
+    request: Request,
+    cursor: Optional[str] = None,
+    limit: int = Query(PAGE_SIZE_DEFAULT, ge=1),
+    filters: schemas.CauseFilters = Depends(),
     cause_repository: CauseRepository = Depends(get_cause_repository),
 ):
     """
-    List all causes.
+    List causes, one page at a time.
+
+    This route uses the CauseRepository to get a page of causes from the database, filtered
+    and sorted by the database. The `next_cursor` of the response is passed back as
+    `cursor`, along with the same filters and sort, to get the following page.
 
-    This route uses the CauseRepository to get all causes from the database.
+    The ETag of a page is built from the version of the causes table, bumped by every write
+    changing a cause, the period of CACHE_TTL_SECONDS the donation counts were read in, and
+    the query string; when it matches `If-None-Match`, 304 is returned without querying the
+    page.
 
     Parameters
     ----------
+    request : Request
+        The request, whose `If-None-Match` header is checked.
+    cursor : str, optional
+        The cursor returned with the previous page; omitted for the first page.
+    limit : int, optional
+        The maximum number of causes to return, capped by PAGE_SIZE_MAX.
+    filters : CauseFilters = Depends()
+        The `institute_id`, `is_active`, `created_after` (inclusive) and `created_before`
+        (exclusive) query parameters filtering the causes, and `sort`: "created_at" for
+        oldest first (default) or "-created_at" for newest first.
     cause_repository : CauseRepository = Depends(get_cause_repository)
         The instance of CauseRepository used to perform database operations.
 
@@ -117,18 +266,28 @@ def list_causes(
         The schema representing the list of causes.
     """
     try:
-        causes = cause_repository.list_causes()
+        # Read before the page: a write landing in between only costs the client a refetch
+        version = await cause_repository.get_causes_version()
+        etag = make_etag("causes", version, request.url.query)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        page = await cause_repository.list_causes(cursor=cursor, limit=limit, filters=filters)
+        response = json_response(
+            schemas.CAUSES_LIST_ADAPTER,
+            schemas.CausesList(causes=page.items, next_cursor=page.next_cursor),
+        )
+        set_cache_headers(response, etag)
         logger.info("Causes retrieved successfully")
-        return schemas.CausesList(causes=causes)
+        return response
     except Exception as e:
         logger.error("An error occurred when retrieving causes: %s", e)
         raise HTTPException(status_code=400, detail=str(e)) from e
 
 
 @cause_routes.put("/activate/{cause_id}", response_model=schemas.CauseSchema)
-def toogle_active_cause(
+async def toogle_active_cause(
     cause_id: int,
-    user: User = Depends(get_current_user),
+    user: Principal = Depends(get_current_user),
     cause_repository: CauseRepository = Depends(get_cause_repository),
 ):
     """
@@ -151,18 +310,18 @@ def toogle_active_cause(
     """
     try:
         user_id = user.id
-        updated_cause = cause_repository.toogle_cause_active(user_id, cause_id)
+        updated_cause = await cause_repository.toogle_cause_active(user_id, cause_id)
         logger.info("Cause updated successfully: %s", updated_cause.id)
-        return updated_cause
+        return json_response(schemas.CAUSE_ADAPTER, updated_cause)
     except Exception as e:
         logger.error("An error occurred when updating a cause: %s", e)
         raise HTTPException(status_code=400, detail=str(e)) from e
 
 
 @cause_routes.delete("/{cause_id}")
-def delete_cause(
+async def delete_cause(
     cause_id: int,
-    user: User = Depends(get_current_user),
+    user: Principal = Depends(get_current_user),
     cause_repository: CauseRepository = Depends(get_cause_repository),
 ):
     """
@@ -184,7 +343,7 @@ def delete_cause(
     """
     try:
         user_id = user.id
-        cause_repository.delete_cause(cause_id, user_id)
+        await cause_repository.delete_cause(cause_id, user_id)
         logger.info("Cause deleted successfully: %s", cause_id)
         return {"message": "Cause deleted successfully"}
     except Exception as e:
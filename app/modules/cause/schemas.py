@@ -1,6 +1,7 @@
-from typing import List, Optional
+from datetime import datetime
+from typing import Any, List, Literal, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, TypeAdapter
 
 
 class CauseBase(BaseModel):
@@ -14,6 +15,10 @@ class CreateCause(CauseBase):
     institute_id: int
 
 
+class ImportCause(CauseBase):
+    description: str = ""
+
+
 class UpdateCause(BaseModel):
     title: Optional[str] = None
     description: Optional[str] = None
@@ -25,6 +30,8 @@ class CauseSchema(CauseBase):
     id: int
     institute_id: int
     is_active: bool
+    donations_count: int = 0
+    paid_donations_count: int = 0
 
     class Config:
         from_attributes = True
@@ -32,6 +39,36 @@ class CauseSchema(CauseBase):
 
 class CausesList(BaseModel):
     causes: List[CauseSchema]
+    next_cursor: Optional[str] = None
 
     class Config:
         from_attributes = True
+
+
+class CauseFilters(BaseModel):
+    institute_id: Optional[int] = None
+    is_active: Optional[bool] = None
+    created_after: Optional[datetime] = None
+    created_before: Optional[datetime] = None
+    sort: Literal["created_at", "-created_at"] = "created_at"
+
+    @property
+    def descending(self) -> bool:
+        return self.sort.startswith("-")
+
+
+class CauseImportError(BaseModel):
+    line: int
+    errors: List[Any]
+
+
+class CauseImportResult(BaseModel):
+    received: int
+    created: int
+    skipped: int
+    errors: List[CauseImportError]
+
+
+# Pre-built serializers of the schemas returned with `json_response`
+CAUSE_ADAPTER = TypeAdapter(CauseSchema)
+CAUSES_LIST_ADAPTER = TypeAdapter(CausesList)
@@ -1,13 +1,14 @@
 from fastapi import Depends
 from sqlalchemy.orm import Session
 
-from app.infra.db.database import get_db
+from app.infra.db.database import get_session
+from app.infra.db.repository import make_repository
 
-from .repository import DonationRepository
+from .repository import AsyncDonationRepository, DonationRepository
 
 
 def get_donation_repository(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_session),
 ) -> DonationRepository:
     """
     Dependency that provides a DonationRepository instance.
@@ -17,13 +18,14 @@ def get_donation_repository(
 
     Parameters
     ----------
-    db : Session
+    db : Session or AsyncSession
         The SQLAlchemy session dependency injected by FastAPI, used to perform
         database operations.
 
     Returns
     -------
     DonationRepository
-        An instance of DonationRepository initialized with the given database session.
+        A DonationRepository bound to the given session whose methods are awaited: run on the
+        threadpool in sync mode, or as AsyncDonationRepository in async mode.
     """
-    return DonationRepository(db)
+    return make_repository(db, DonationRepository, AsyncDonationRepository)
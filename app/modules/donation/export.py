@@ -0,0 +1,176 @@
+"""
+Streaming export of the donations of an institute.
+
+Rows are read with a server-side cursor (`yield_per`), one batch of
+EXPORT_BATCH_SIZE rows at a time, and encoded as they are read, so memory stays
+flat whatever the number of donations. Exports run on their own session, since
+the request's session is closed before a streaming response starts, and are
+routed to a read replica when one is configured.
+
+CSV is encoded in the request's worker. Parquet encoding is CPU bound, so the
+whole export runs in a separate process writing a temporary file, which is then
+streamed back; it needs the optional `pyarrow` package.
+"""
+
+import csv
+import importlib.util
+import io
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import AsyncIterator, Iterator, Optional
+
+from sqlalchemy import select
+
+from app.config.env_variables import EXPORT_BATCH_SIZE, EXPORT_WORKERS
+from app.infra.db.database import AsyncSessionLocal, SessionLocal
+from app.infra.db.models import Cause, Donation, Institute
+
+EXPORT_COLUMNS = (
+    ("donation_id", Donation.id),
+    ("is_paid", Donation.is_paid),
+    ("created_at", Donation.created_at),
+    ("updated_at", Donation.updated_at),
+    ("user_id", Donation.user_id),
+    ("cause_id", Cause.id),
+    ("cause_title", Cause.title),
+    ("institute_id", Institute.id),
+    ("institute_name", Institute.name),
+    ("institute_cnpj", Institute.cnpj),
+)
+
+PARQUET_AVAILABLE = importlib.util.find_spec("pyarrow") is not None
+if PARQUET_AVAILABLE:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+else:
+    pa = pq = None
+
+
+def export_statement(institute_id: int):
+    """
+    Builds the query of the donations of an institute, joined to their cause and institute.
+    """
+    return (
+        select(*(column.label(name) for name, column in EXPORT_COLUMNS))
+        .join(Cause, Cause.id == Donation.cause_id)
+        .join(Institute, Institute.id == Cause.institute_id)
+        .where(Institute.id == institute_id)
+        .order_by(Donation.id)
+        .execution_options(yield_per=EXPORT_BATCH_SIZE)
+    )
+
+
+def _csv_chunk(rows, header: bool = False) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow([name for name, _ in EXPORT_COLUMNS])
+    writer.writerows(rows)
+    return buffer.getvalue().encode("utf-8")
+
+
+def iter_csv(institute_id: int) -> Iterator[bytes]:
+    """
+    Generates the CSV export of an institute's donations, one batch of rows per chunk.
+
+    Parameters
+    ----------
+    institute_id : int
+        The ID of the institute.
+
+    Yields
+    ------
+    bytes
+        The header line, then the encoded rows of each batch.
+    """
+    yield _csv_chunk([], header=True)
+    with SessionLocal() as db:
+        db.info["read_only"] = True
+        for rows in db.execute(export_statement(institute_id)).partitions():
+            yield _csv_chunk(rows)
+
+
+async def iter_csv_async(institute_id: int) -> AsyncIterator[bytes]:
+    """
+    Async version of `iter_csv`, reading the rows with the async driver.
+    """
+    yield _csv_chunk([], header=True)
+    async with AsyncSessionLocal() as db:
+        db.sync_session.info["read_only"] = True
+        result = await db.stream(export_statement(institute_id))
+        async for rows in result.partitions():
+            yield _csv_chunk(rows)
+
+
+def write_parquet(institute_id: int, path: str) -> None:
+    """
+    Writes the Parquet export of an institute's donations to a file.
+
+    Runs in an export worker process: each batch of rows becomes a row group, so the
+    worker never holds more than one batch.
+
+    Parameters
+    ----------
+    institute_id : int
+        The ID of the institute.
+    path : str
+        The file to write.
+    """
+    schema = pa.schema(
+        [
+            ("donation_id", pa.int64()),
+            ("is_paid", pa.bool_()),
+            ("created_at", pa.timestamp("us")),
+            ("updated_at", pa.timestamp("us")),
+            ("user_id", pa.int64()),
+            ("cause_id", pa.int64()),
+            ("cause_title", pa.string()),
+            ("institute_id", pa.int64()),
+            ("institute_name", pa.string()),
+            ("institute_cnpj", pa.string()),
+        ]
+    )
+    with SessionLocal() as db, pq.ParquetWriter(path, schema) as writer:
+        db.info["read_only"] = True
+        for rows in db.execute(export_statement(institute_id)).partitions():
+            columns = list(zip(*rows))
+            writer.write_batch(
+                pa.record_batch(
+                    [pa.array(values, type=field.type) for values, field in zip(columns, schema)],
+                    schema=schema,
+                )
+            )
+
+
+class ExportWorkers:
+    """
+    The pool of export worker processes, started on first use.
+
+    Workers are spawned rather than forked, so they don't inherit the connection pools
+    and threads of the API process.
+    """
+
+    def __init__(self, max_workers: int) -> None:
+        self.max_workers = max_workers
+        self.executor: Optional[ProcessPoolExecutor] = None
+
+    def get(self) -> ProcessPoolExecutor:
+        """
+        Returns the pool, starting its processes if needed.
+        """
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(
+                max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self.executor
+
+    def shutdown(self) -> None:
+        """
+        Stops the worker processes, if they were started.
+        """
+        if self.executor is not None:
+            self.executor.shutdown(wait=True, cancel_futures=True)
+            self.executor = None
+
+
+export_workers = ExportWorkers(EXPORT_WORKERS)
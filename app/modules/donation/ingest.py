@@ -0,0 +1,214 @@
+"""
+Write-behind ingestion of donation creates, with group commit.
+
+When DONATION_INGEST_ENABLED is set, `POST /donation/` hands its donation to an
+in-process queue instead of writing it. A background writer takes the queued
+donations in batches, as soon as DONATION_INGEST_BATCH_SIZE are waiting or
+DONATION_INGEST_FLUSH_MS after the first one arrived, and writes each batch with
+a multi-row INSERT and a single commit. One fsync is thus shared by a whole
+batch instead of being paid by every request. The requests still wait for their
+batch to be committed and answer with the id it assigned them.
+
+At most DONATION_INGEST_MAX_PENDING donations wait in the queue; beyond that,
+requests wait for room. On shutdown the queue stops accepting donations and is
+drained before the writer exits.
+"""
+
+import asyncio
+from typing import List, Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+from app.config.env_variables import (
+    DB_MODE,
+    DONATION_INGEST_BATCH_SIZE,
+    DONATION_INGEST_FLUSH_MS,
+    DONATION_INGEST_MAX_PENDING,
+)
+from app.infra.db.database import AsyncSessionLocal, SessionLocal
+from app.infra.logger.config import logger
+
+from .repository import DonationRepository
+from .schemas import CreateDonation
+from .schemas import Donation as DonationSchema
+
+
+class DonationIngestQueue:
+    """
+    Queues donation creates and writes them in batches from a background task.
+
+    Attributes
+    ----------
+    batch_size : int
+        The maximum number of donations written per transaction.
+    flush_interval : float
+        How long, in seconds, the first donation of a batch waits for others.
+    max_pending : int
+        The maximum number of donations waiting to be written.
+    """
+
+    def __init__(self, batch_size: int, flush_interval: float, max_pending: int) -> None:
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._pending: List[Tuple[dict, asyncio.Future]] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._full: Optional[asyncio.Event] = None
+        self._room: Optional[asyncio.Semaphore] = None
+        self._stopping = False
+        self._task: Optional[asyncio.Task] = None
+        self.submitted = 0
+        self.written = 0
+        self.rejected = 0
+        self.batches = 0
+        self.errors = 0
+
+    @property
+    def running(self) -> bool:
+        """
+        Whether donations are currently accepted by the queue.
+        """
+        return self._task is not None and not self._stopping
+
+    async def submit(self, user_id: int, data: CreateDonation) -> DonationSchema:
+        """
+        Queues a donation and waits until its batch is committed.
+
+        Parameters
+        ----------
+        user_id : int
+            The ID of the user making the donation.
+        data : CreateDonation
+            The data of the donation.
+
+        Returns
+        -------
+        Donation
+            The created donation, with the id assigned by the database.
+
+        Raises
+        ------
+        ValueError
+            If the cause of the donation does not exist.
+        RuntimeError
+            If the queue is not running.
+        """
+        if not self.running:
+            raise RuntimeError("Donation ingestion is not running")
+
+        await self._room.acquire()
+        if not self.running:
+            self._room.release()
+            raise RuntimeError("Donation ingestion is not running")
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append(({"user_id": user_id, **data.model_dump()}, future))
+        self.submitted += 1
+        self._wakeup.set()
+        if len(self._pending) >= self.batch_size:
+            self._full.set()
+        # A cancelled request must not cancel the future its batch will resolve
+        return await asyncio.shield(future)
+
+    async def _run(self) -> None:
+        while True:
+            await self._wakeup.wait()
+            if not self._pending:
+                return
+            if not self._stopping:
+                try:
+                    await asyncio.wait_for(self._full.wait(), timeout=self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+
+            batch = self._pending[: self.batch_size]
+            self._pending = self._pending[self.batch_size :]
+            if len(self._pending) < self.batch_size:
+                self._full.clear()
+            if not self._pending and not self._stopping:
+                self._wakeup.clear()
+            await self._flush(batch)
+
+    async def _flush(self, batch: List[Tuple[dict, asyncio.Future]]) -> None:
+        rows = [row for row, _ in batch]
+        try:
+            created = await self._write(rows)
+        # Whatever the failure, every request of the batch must get it rather than hang
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            logger.error("Could not write a batch of %s donations: %s", len(rows), e)
+            self.errors += 1
+            results = [e] * len(rows)
+        else:
+            self.batches += 1
+            self.written += sum(donation is not None for donation in created)
+            self.rejected += sum(donation is None for donation in created)
+            results = [donation or ValueError("Cause not found") for donation in created]
+
+        for (_, future), result in zip(batch, results):
+            self._room.release()
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    async def _write(self, rows: List[dict]) -> list:
+        if DB_MODE == "async":
+            async with AsyncSessionLocal() as db:
+                return await db.run_sync(
+                    lambda session: DonationRepository(session).insert_donations(rows)
+                )
+        return await run_in_threadpool(self._write_sync, rows)
+
+    @staticmethod
+    def _write_sync(rows: List[dict]) -> list:
+        with SessionLocal() as db:
+            return DonationRepository(db).insert_donations(rows)
+
+    async def start(self) -> None:
+        """
+        Starts the background writer.
+        """
+        self._wakeup = asyncio.Event()
+        self._full = asyncio.Event()
+        self._room = asyncio.Semaphore(self.max_pending)
+        self._stopping = False
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """
+        Stops accepting donations and waits until the queued ones are written.
+        """
+        if self._task is not None:
+            self._stopping = True
+            self._wakeup.set()
+            await self._task
+            self._task = None
+            self._stopping = False
+
+    def stats(self) -> dict:
+        """
+        Returns the ingestion counters.
+
+        Returns
+        -------
+        dict
+            Donations submitted, written and rejected (unknown cause), batches committed,
+            failed batches and the number of donations waiting.
+        """
+        return {
+            "submitted": self.submitted,
+            "written": self.written,
+            "rejected": self.rejected,
+            "batches": self.batches,
+            "errors": self.errors,
+            "pending": len(self._pending),
+        }
+
+
+donation_ingest = DonationIngestQueue(
+    batch_size=DONATION_INGEST_BATCH_SIZE,
+    flush_interval=DONATION_INGEST_FLUSH_MS / 1000,
+    max_pending=DONATION_INGEST_MAX_PENDING,
+)
@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, ForeignKey, Integer
+from sqlalchemy import Boolean, Column, ForeignKey, Index, Integer
 from sqlalchemy.orm import relationship
 
 from app.infra.db.shared.models import TimeStampModel
@@ -6,6 +6,7 @@ from app.infra.db.shared.models import TimeStampModel
 
 class Donation(TimeStampModel):
     __tablename__ = "donations"
+    __table_args__ = (Index("ix_donations_user_id_id", "user_id", "id"),)
 
     id = Column(Integer, primary_key=True, index=True)
     is_paid = Column(Boolean, default=False)
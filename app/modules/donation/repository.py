@@ -1,8 +1,25 @@
+from collections import Counter
+from typing import List, Optional
+
+from sqlalchemy import func, insert, select, update
 from sqlalchemy.orm import Session
 
-from app.infra.db.models import Donation
+from app.infra.db.models import Cause, Donation
+from app.infra.db.pagination import Page, paginate
+from app.infra.db.repository import AsyncRepository
+from app.infra.db.routing import read_only
+from app.infra.db.statements import in_ids
+from app.modules.cause.repository import (
+    DonationCounterRepository,
+    invalidate_donation_counts,
+)
+
+from .schemas import CreateDonation
+from .schemas import Donation as DonationSchema
+from .schemas import UpdateDonation
 
-from .schemas import CreateDonation, UpdateDonation
+# Columns returned by the writes to a donation, matching the `Donation` schema
+DONATION_RETURNING = (Donation.id, Donation.is_paid, Donation.user_id, Donation.cause_id)
 
 
 class DonationRepository:
@@ -26,31 +43,110 @@ class DonationRepository:
         """
         self.db = db
 
-    def create_donation(self, user_id: str, data: CreateDonation):
+    def create_donation(self, user_id: int, data: CreateDonation) -> DonationSchema:
         """
         Creates a new `Donation` entity in the database.
 
+        The donation is inserted with INSERT ... RETURNING and committed together with
+        the update of its cause's counters, without reloading it afterwards.
+
         Parameters
         ----------
+        user_id : int
+            The ID of the user making the donation.
         data : CreateDonation
             The data to use for creating the `Donation` entity.
 
         Returns
         -------
         Donation
-            The newly created `Donation` entity.
+            The newly created donation, as a `Donation` schema.
         """
-        donation = Donation(**data.model_dump())
-        donation.user_id = user_id
-        self.db.add(donation)
+        statement = (
+            insert(Donation)
+            .values(user_id=user_id, **data.model_dump())
+            .returning(*DONATION_RETURNING)
+        )
+        donation = DonationSchema.model_validate(self.db.execute(statement).one())
+        DonationCounterRepository(self.db).add(
+            donation.cause_id, donations=1, paid=1 if donation.is_paid else 0
+        )
         self.db.commit()
-        self.db.refresh(donation)
+        invalidate_donation_counts(donation.cause_id)
         return donation
 
-    def update_donation(self, user_id: int, donation_id: int, data: UpdateDonation):
+    def create_donations(self, user_id: int, donations: List[CreateDonation]) -> list:
+        """
+        Creates many `Donation` entities with batched multi-row INSERT ... RETURNING statements.
+
+        Donations to causes that do not exist are skipped. The donations and the matching
+        counter updates are committed in a single transaction.
+
+        Parameters
+        ----------
+        user_id : int
+            The ID of the user making the donations.
+        donations : List[CreateDonation]
+            The data of the donations to create.
+
+        Returns
+        -------
+        list[Donation or None]
+            For each item of `donations`, in order, the created donation as a `Donation`
+            schema, or None if its cause does not exist.
+        """
+        return self.insert_donations(
+            [{"user_id": user_id, **donation.model_dump()} for donation in donations]
+        )
+
+    def insert_donations(self, rows: List[dict]) -> list:
+        """
+        Inserts donations, possibly of different users, in a single transaction.
+
+        Parameters
+        ----------
+        rows : List[dict]
+            The columns of each donation: `user_id` and the fields of `CreateDonation`.
+
+        Returns
+        -------
+        list[Donation or None]
+            For each row, in order, the created donation as a `Donation` schema, or None
+            if its cause does not exist.
+        """
+        cause_ids = {row["cause_id"] for row in rows}
+        existing = {
+            cause_id for (cause_id,) in self.db.query(Cause.id).filter(Cause.id.in_(cause_ids))
+        }
+        valid = [row for row in rows if row["cause_id"] in existing]
+        if not valid:
+            return [None] * len(rows)
+
+        statement = insert(Donation).returning(*DONATION_RETURNING, sort_by_parameter_order=True)
+        created = iter(
+            DonationSchema.model_validate(row) for row in self.db.execute(statement, valid)
+        )
+
+        counters = DonationCounterRepository(self.db)
+        counts = Counter(row["cause_id"] for row in valid)
+        for cause_id, count in counts.items():
+            counters.add(cause_id, donations=count)
+        self.db.commit()
+        invalidate_donation_counts(*counts)
+
+        return [next(created) if row["cause_id"] in existing else None for row in rows]
+
+    def update_donation(
+        self, user_id: int, donation_id: int, data: UpdateDonation
+    ) -> DonationSchema:
         """
         Updates an existing `Donation` entity in the database.
 
+        The donation is only written when its `is_paid` flag actually changes, with an
+        UPDATE ... WHERE is_paid IS DISTINCT FROM ... RETURNING statement. Concurrent
+        updates of the same donation are serialized by the row lock taken by the UPDATE,
+        so each flip is seen, and counted, exactly once.
+
         Parameters
         ----------
         user_id : int
@@ -63,21 +159,101 @@ class DonationRepository:
         Returns
         -------
         Donation
-            The updated `Donation` entity.
-        """
-        # Ensure the donation exists and is associated with the user
-        donation = self.db.query(Donation).filter_by(id=donation_id, user_id=user_id).first()
+            The updated donation, as a `Donation` schema.
 
-        if not donation:
-            raise ValueError("No donation found for this user with the provided ID.")
+        Raises
+        ------
+        ValueError
+            If the user has no donation with this ID.
+        """
+        statement = (
+            update(Donation)
+            .where(
+                Donation.id == donation_id,
+                Donation.user_id == user_id,
+                Donation.is_paid.is_distinct_from(data.is_paid),
+            )
+            .values(**data.model_dump())
+            .returning(*DONATION_RETURNING)
+            .execution_options(synchronize_session=False)
+        )
+        row = self.db.execute(statement).first()
 
-        for key, value in data.model_dump().items():
-            setattr(donation, key, value)
+        if row is None:
+            # Nothing changed: the donation is missing or already in the requested state
+            row = (
+                self.db.query(*DONATION_RETURNING)
+                .filter(Donation.id == donation_id, Donation.user_id == user_id)
+                .first()
+            )
+            self.db.rollback()
+            if row is None:
+                raise ValueError("No donation found for this user with the provided ID.")
+            return DonationSchema.model_validate(row)
 
+        donation = DonationSchema.model_validate(row)
+        DonationCounterRepository(self.db).add(
+            donation.cause_id, paid=1 if donation.is_paid else -1
+        )
         self.db.commit()
-        self.db.refresh(donation)
+        invalidate_donation_counts(donation.cause_id)
         return donation
 
+    def mark_paid(self, donation_ids: List[int], institute_id: Optional[int] = None) -> dict:
+        """
+        Marks a chunk of donations as paid with one set-based UPDATE and commits it.
+
+        Only the donations that are not paid yet are written (UPDATE ... WHERE id = ANY(...)
+        AND is_paid IS DISTINCT FROM true RETURNING), and the paid counters of their
+        causes are adjusted in the same transaction.
+
+        Parameters
+        ----------
+        donation_ids : List[int]
+            The IDs of the donations to mark as paid.
+        institute_id : int, optional
+            Only consider the donations to the causes of this institute.
+
+        Returns
+        -------
+        dict
+            `matched`: donations found, `changed`: donations that were not paid yet and
+            `missing`: IDs matching no donation.
+        """
+        donation_ids = set(donation_ids)
+        if not donation_ids:
+            return {"matched": 0, "changed": 0, "missing": 0}
+
+        conditions = [in_ids(self.db, Donation.id, donation_ids)]
+        if institute_id is not None:
+            conditions.append(
+                Donation.cause_id.in_(select(Cause.id).where(Cause.institute_id == institute_id))
+            )
+
+        changed = self.db.execute(
+            update(Donation)
+            .where(*conditions, Donation.is_paid.is_distinct_from(True))
+            .values(is_paid=True)
+            .returning(Donation.cause_id)
+            .execution_options(synchronize_session=False)
+        ).all()
+        # pylint: disable-next=not-callable
+        matched = self.db.query(func.count(Donation.id)).filter(*conditions).scalar()
+
+        counters = DonationCounterRepository(self.db)
+        counts = Counter(cause_id for (cause_id,) in changed)
+        for cause_id, count in counts.items():
+            counters.add(cause_id, paid=count)
+        self.db.commit()
+        invalidate_donation_counts(*counts)
+
+        return {
+            "matched": matched,
+            "changed": len(changed),
+            "missing": len(donation_ids) - matched,
+        }
+
+    @read_only
     def get_donation_by_id(self, donation_id: int):
         """
         Retrieves a `Donation` entity from the database by its ID.
@@ -93,3 +269,33 @@ class DonationRepository:
             The retrieved `Donation` entity.
         """
         return self.db.query(Donation).filter_by(id=donation_id).first()
+
+    @read_only
+    def list_donations(
+        self, user_id: int, cursor: Optional[str] = None, limit: Optional[int] = None
+    ) -> Page:
+        """
+        Lists the donations of a user, newest first, one page at a time.
+
+        Parameters
+        ----------
+        user_id : int
+            The ID of the user whose donations are listed.
+        cursor : str, optional
+            The cursor returned with the previous page; None for the first page.
+        limit : int, optional
+            The maximum number of donations to return.
+
+        Returns
+        -------
+        Page
+            The `Donation` entities of the page and the cursor of the next page.
+        """
+        query = self.db.query(Donation).filter(Donation.user_id == user_id)
+        return paginate(query, (Donation.id,), cursor=cursor, limit=limit, descending=True)
+
+
+class AsyncDonationRepository(AsyncRepository[DonationRepository]):
+    """
+    Adapter running the queries of `DonationRepository` on an `AsyncSession`.
+    """
@@ -1,31 +1,55 @@
-from fastapi import APIRouter, Depends, HTTPException
+import asyncio
+import os
+import tempfile
+from typing import Any, List, Literal, Optional
 
+from fastapi import APIRouter, Body, Depends, Header, HTTPException, Query, Request
+from fastapi.responses import FileResponse, StreamingResponse
+from pydantic import ValidationError
+from starlette.background import BackgroundTask
+
+from app.config.env_variables import DB_MODE, DONATION_BULK_MAX_ITEMS, PAGE_SIZE_DEFAULT
+from app.infra.http.responses import json_response
 from app.infra.logger.config import logger
 from app.modules.auth.dependecies import get_current_user
-from app.modules.user.schemas import User
+from app.modules.cause.importer import iter_lines
+from app.modules.idempotency.dependencies import get_idempotency_repository
+from app.modules.idempotency.repository import IdempotencyRepository
+from app.modules.idempotency.runner import run_idempotent
+from app.modules.user.principal import Principal
 
-from . import schemas
+from . import export, schemas
 from .dependencies import get_donation_repository
+from .ingest import donation_ingest
 from .repository import DonationRepository
+from .settlement import SettlementReconciliation
 
 donation_router = APIRouter(prefix="/donation", tags=["Donation"])
 
 
 @donation_router.post("/", response_model=schemas.Donation)
-def create_donation(
+async def create_donation(
     donation: schemas.CreateDonation,
-    user: User = Depends(get_current_user),
+    user: Principal = Depends(get_current_user),
     donation_repository: DonationRepository = Depends(get_donation_repository),
+    idempotency_key: Optional[str] = Header(None, max_length=255),
+    idempotency_repository: IdempotencyRepository = Depends(get_idempotency_repository),
 ):
     """
     Create a new donation with the given user data.
 
+    Retries carrying the same `Idempotency-Key` header get the response of the first
+    request instead of creating another donation. When write-behind ingestion is
+    enabled, the donation is written with others in a batch.
+
     Parameters
     ----------
     user : schemas.UserCreate
         The user data for creating a new user.
     donation_repository : DonationRepository
         The user repository dependency.
+    idempotency_key : str, optional
+        The `Idempotency-Key` header.
 
     Returns
     -------
@@ -37,26 +61,198 @@ def create_donation(
     HTTPException
         If the email is already registered.
     """
-    try:
-        created_donation = donation_repository.create_donation(
-            user_id=user.id,
-            data=donation,
+
+    async def create():
+        try:
+            if donation_ingest.running:
+                created_donation = await donation_ingest.submit(user.id, donation)
+            else:
+                created_donation = await donation_repository.create_donation(
+                    user_id=user.id,
+                    data=donation,
+                )
+            logger.info("Donation created successfully: %s", created_donation.id)
+            return created_donation
+        except ValueError as e:
+            logger.error("Error creating donation: {e}")
+            raise HTTPException(status_code=400, detail=str(e)) from e
+        except Exception as e:
+            logger.error("Error creating donation: {e}")
+            raise HTTPException(status_code=400, detail=str(e)) from e
+
+    return await run_idempotent(
+        idempotency_repository, f"donation:{user.id}", idempotency_key, donation, create
+    )
+
+
+@donation_router.post("/bulk", response_model=schemas.BulkDonationResult)
+async def create_donations(
+    donations: List[Any] = Body(...),
+    user: Principal = Depends(get_current_user),
+    donation_repository: DonationRepository = Depends(get_donation_repository),
+):
+    """
+    Create many donations at once.
+
+    Items are validated one by one: the valid ones are inserted in batched multi-row
+    statements and committed together, the invalid ones are reported by their index in
+    the request.
+
+    Parameters
+    ----------
+    donations : list
+        The donations to create, each in the `CreateDonation` format.
+    donation_repository : DonationRepository
+        The donation repository dependency.
+
+    Returns
+    -------
+    schemas.BulkDonationResult
+        The created donations, in request order, and the errors of the rejected items.
+
+    Raises
+    ------
+    HTTPException
+        If the batch is larger than DONATION_BULK_MAX_ITEMS.
+    """
+    if len(donations) > DONATION_BULK_MAX_ITEMS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many donations: at most {DONATION_BULK_MAX_ITEMS} per request",
         )
-        logger.info("Donation created successfully: %s", created_donation.id)
-        return created_donation
+
+    valid, indexes, errors = [], [], []
+    for index, item in enumerate(donations):
+        try:
+            valid.append(schemas.CreateDonation.model_validate(item))
+            indexes.append(index)
+        except ValidationError as e:
+            errors.append(
+                schemas.BulkDonationError(
+                    index=index, errors=e.errors(include_url=False, include_context=False)
+                )
+            )
+
+    created = []
+    if valid:
+        results = await donation_repository.create_donations(user_id=user.id, donations=valid)
+        for index, donation in zip(indexes, results):
+            if donation is None:
+                errors.append(schemas.BulkDonationError(index=index, errors=["Cause not found"]))
+            else:
+                created.append(donation)
+
+    errors.sort(key=lambda error: error.index)
+    logger.info("Donations created in bulk: %s created, %s rejected", len(created), len(errors))
+    return schemas.BulkDonationResult(created=created, errors=errors)
+
+
+@donation_router.post("/reconcile", response_model=schemas.ReconcileResult)
+async def reconcile_payments(
+    request: Request,
+    user: Principal = Depends(get_current_user),
+    donation_repository: DonationRepository = Depends(get_donation_repository),
+):
+    """
+    Mark the donations of a payment settlement as paid.
+
+    The settlement is the raw request body: donation ids, one per line, or a CSV file
+    with a `donation_id` column. It is parsed while it is received, and the donations
+    are updated with set-based UPDATEs in chunks of DONATION_RECONCILE_CHUNK_SIZE ids,
+    each chunk being committed on its own. Only the donations to the causes of the
+    user's institute are considered.
+
+    Parameters
+    ----------
+    request : Request
+        The request whose body is the settlement.
+    donation_repository : DonationRepository
+        The donation repository dependency.
+
+    Returns
+    -------
+    schemas.ReconcileResult
+        How many ids were received, matched a donation, changed a donation that was not
+        paid yet, matched no donation, or could not be parsed.
+
+    Raises
+    ------
+    HTTPException
+        If the user is not an admin of an institute, the CSV header has no id column or a
+        line is too long.
+    """
+    if user.institute_id is None:
+        raise HTTPException(status_code=403, detail="User is not an admin of an institute")
+
+    reconciliation = SettlementReconciliation()
+    try:
+        async for line in iter_lines(request.stream()):
+            chunk = reconciliation.add(line)
+            if chunk:
+                reconciliation.record(
+                    await donation_repository.mark_paid(chunk, user.institute_id)
+                )
     except ValueError as e:
-        logger.error("Error creating donation: {e}")
         raise HTTPException(status_code=400, detail=str(e)) from e
-    except Exception as e:
-        logger.error("Error creating donation: {e}")
+
+    chunk = reconciliation.finish()
+    if chunk:
+        reconciliation.record(await donation_repository.mark_paid(chunk, user.institute_id))
+
+    report = reconciliation.report
+    logger.info("Payments reconciled: %s", dict(report))
+    return schemas.ReconcileResult(
+        **{name: report[name] for name in schemas.ReconcileResult.model_fields}
+    )
+
+
+@donation_router.get("/", response_model=schemas.DonationsPage)
+async def list_donations(
+    cursor: Optional[str] = None,
+    limit: int = Query(PAGE_SIZE_DEFAULT, ge=1),
+    user: Principal = Depends(get_current_user),
+    donation_repository: DonationRepository = Depends(get_donation_repository),
+):
+    """
+    List the donations of the current user, newest first, with cursor pagination.
+
+    Parameters
+    ----------
+    cursor : str, optional
+        The `next_cursor` returned with the previous page; omitted for the first page.
+    limit : int, optional
+        The maximum number of donations to return, capped by PAGE_SIZE_MAX.
+    donation_repository : DonationRepository
+        The donation repository dependency.
+
+    Returns
+    -------
+    schemas.DonationsPage
+        A page of donations and the cursor of the next page.
+
+    Raises
+    ------
+    HTTPException
+        If the cursor is invalid.
+    """
+    try:
+        page = await donation_repository.list_donations(
+            user_id=user.id, cursor=cursor, limit=limit
+        )
+        return json_response(
+            schemas.DONATIONS_PAGE_ADAPTER,
+            schemas.DonationsPage(donations=page.items, next_cursor=page.next_cursor),
+        )
+    except ValueError as e:
+        logger.error("Error listing donations: %s", e)
         raise HTTPException(status_code=400, detail=str(e)) from e
 
 
 @donation_router.put("/{donation_id}", response_model=schemas.Donation)
-def update_donation(
+async def update_donation(
     donation_id: int,
     donation: schemas.UpdateDonation,
-    user: User = Depends(get_current_user),
+    user: Principal = Depends(get_current_user),
     donation_repository: DonationRepository = Depends(get_donation_repository),
 ):
     """
@@ -84,21 +280,90 @@ def update_donation(
         If the donation does not exist.
     """
     try:
-        updated_donation = donation_repository.update_donation(
+        updated_donation = await donation_repository.update_donation(
             user_id=user.id,
             donation_id=donation_id,
             data=donation,
         )
         logger.info("Donation updated successfully: %s", updated_donation.id)
-        return updated_donation
+        return json_response(schemas.DONATION_ADAPTER, updated_donation)
 
     except ValueError as e:
         logger.error("Error updating donation: %s", e)
         raise HTTPException(status_code=400, detail=str(e)) from e
 
 
+@donation_router.get("/export")
+async def export_donations(
+    institute_id: int,
+    export_format: Literal["csv", "parquet"] = Query("csv", alias="format"),
+    user: Principal = Depends(get_current_user),
+):
+    """
+    Export every donation made to the causes of an institute.
+
+    Each row holds the donation with its cause and institute. CSV is streamed while the
+    rows are read; Parquet is encoded by an export worker process and then streamed.
+
+    Parameters
+    ----------
+    institute_id : int
+        The ID of the institute whose donations are exported.
+    export_format : str, optional
+        The `format` query parameter: "csv" (default) or "parquet".
+
+    Returns
+    -------
+    StreamingResponse or FileResponse
+        The export file.
+
+    Raises
+    ------
+    HTTPException
+        If the user is not an admin of the institute, or Parquet is not available.
+    """
+    if user.institute_id != institute_id:
+        raise HTTPException(status_code=403, detail="User not allowed")
+
+    filename = f"donations-institute-{institute_id}.{export_format}"
+    logger.info("Exporting donations of institute %s as %s", institute_id, export_format)
+
+    if export_format == "csv":
+        rows = (
+            export.iter_csv_async(institute_id)
+            if DB_MODE == "async"
+            else export.iter_csv(institute_id)
+        )
+        return StreamingResponse(
+            rows,
+            media_type="text/csv",
+            headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+        )
+
+    if not export.PARQUET_AVAILABLE:
+        raise HTTPException(status_code=501, detail="Parquet export requires pyarrow")
+
+    fd, path = tempfile.mkstemp(suffix=".parquet")
+    os.close(fd)
+    try:
+        await asyncio.get_running_loop().run_in_executor(
+            export.export_workers.get(), export.write_parquet, institute_id, path
+        )
+    except Exception as e:
+        os.remove(path)
+        logger.error("Error exporting donations: %s", e)
+        raise HTTPException(status_code=500, detail="Export failed") from e
+
+    return FileResponse(
+        path,
+        media_type="application/vnd.apache.parquet",
+        filename=filename,
+        background=BackgroundTask(os.remove, path),
+    )
+
+
 @donation_router.get("/{donation_id}", response_model=schemas.Donation)
-def get_donation_by_id(
+async def get_donation_by_id(
     donation_id: int,
     donation_repository: DonationRepository = Depends(get_donation_repository),
 ):
@@ -120,8 +385,8 @@ def get_donation_by_id(
     HTTPException
         If the donation does not exist.
     """
-    donation = donation_repository.get_donation_by_id(donation_id)
+    donation = await donation_repository.get_donation_by_id(donation_id)
     if not donation:
         logger.error("Donation not found: %s", {donation_id})
         raise HTTPException(status_code=404, detail="Donation not found")
-    return donation
+    return json_response(schemas.DONATION_ADAPTER, schemas.Donation.model_validate(donation))
@@ -1,6 +1,6 @@
-from typing import Optional
+from typing import Any, List, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, TypeAdapter
 
 
 class CreateDonation(BaseModel):
@@ -19,3 +19,31 @@ class Donation(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class DonationsPage(BaseModel):
+    donations: List[Donation]
+    next_cursor: Optional[str] = None
+
+
+class BulkDonationError(BaseModel):
+    index: int
+    errors: List[Any]
+
+
+class BulkDonationResult(BaseModel):
+    created: List[Donation]
+    errors: List[BulkDonationError]
+
+
+class ReconcileResult(BaseModel):
+    received: int
+    matched: int
+    changed: int
+    missing: int
+    invalid: int
+
+
+# Pre-built serializers of the schemas returned with `json_response`
+DONATION_ADAPTER = TypeAdapter(Donation)
+DONATIONS_PAGE_ADAPTER = TypeAdapter(DonationsPage)
@@ -0,0 +1,140 @@
+"""
+Parsing of payment settlement files.
+
+A settlement lists the donations the payment provider has been paid for, either
+as donation ids, one per line, or as a CSV file whose header names a
+`donation_id` (or `id`) column. Lines are parsed one at a time, so settlements
+can be streamed whatever their size.
+"""
+
+import csv
+from collections import Counter
+from typing import List, Optional
+
+from app.config.env_variables import DONATION_RECONCILE_CHUNK_SIZE
+from app.infra.logger.config import logger
+
+ID_COLUMNS = ("donation_id", "id")
+
+
+class SettlementParser:
+    """
+    Extracts the donation ids of a settlement, line by line.
+
+    Attributes
+    ----------
+    column : int, optional
+        The position of the donation id in a line, known once the first line is read.
+    """
+
+    def __init__(self) -> None:
+        self.column: Optional[int] = None
+
+    def parse(self, line: str) -> Optional[int]:
+        """
+        Parses one line of the settlement.
+
+        Parameters
+        ----------
+        line : str
+            The line, without its terminator.
+
+        Returns
+        -------
+        int or None
+            The donation id of the line, or None for a blank line or the CSV header.
+
+        Raises
+        ------
+        ValueError
+            If the line holds no valid donation id, or the CSV header names no id column
+            (`column` is then still None).
+        """
+        if not line.strip():
+            return None
+
+        fields = [field.strip() for field in next(csv.reader([line]))]
+        if self.column is None:
+            if not fields[0].isdigit():
+                names = [name.lower() for name in fields]
+                columns = [names.index(name) for name in ID_COLUMNS if name in names]
+                if not columns:
+                    raise ValueError("The settlement header has no donation_id column")
+                self.column = columns[0]
+                return None
+            self.column = 0
+
+        if self.column >= len(fields):
+            raise ValueError(f"Missing donation id: {line!r}")
+        return int(fields[self.column])
+
+
+class SettlementReconciliation:
+    """
+    Groups the donation ids of a settlement into chunks and tallies the outcome.
+
+    The caller feeds the lines with `add`, marks each returned chunk as paid and
+    records the counts of the update with `record`, then does the same with the last
+    chunk returned by `finish`.
+
+    Attributes
+    ----------
+    report : Counter
+        The ids received, the invalid lines, and the counts recorded for each chunk.
+    """
+
+    def __init__(self, chunk_size: int = DONATION_RECONCILE_CHUNK_SIZE) -> None:
+        self.chunk_size = chunk_size
+        self.parser = SettlementParser()
+        self.report: Counter = Counter()
+        self._chunk: List[int] = []
+
+    def add(self, line: str) -> Optional[List[int]]:
+        """
+        Parses one line of the settlement; invalid lines are counted and skipped.
+
+        Parameters
+        ----------
+        line : str
+            The line, without its terminator.
+
+        Returns
+        -------
+        list[int] or None
+            The chunk of ids completed by this line, if any.
+
+        Raises
+        ------
+        ValueError
+            If the CSV header names no id column.
+        """
+        try:
+            donation_id = self.parser.parse(line)
+        except ValueError as e:
+            if self.parser.column is None:
+                raise
+            logger.error("Skipping invalid settlement line: %s", e)
+            self.report["invalid"] += 1
+            return None
+        if donation_id is None:
+            return None
+
+        self.report["received"] += 1
+        self._chunk.append(donation_id)
+        if len(self._chunk) < self.chunk_size:
+            return None
+        chunk, self._chunk = self._chunk, []
+        return chunk
+
+    def finish(self) -> Optional[List[int]]:
+        """
+        Returns the last, incomplete chunk of ids, if any.
+        """
+        chunk, self._chunk = self._chunk, []
+        return chunk or None
+
+    def record(self, counts: dict) -> None:
+        """
+        Adds the counts of the update of a chunk to the report.
+        """
+        self.report.update(counts)
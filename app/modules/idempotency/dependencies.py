@@ -0,0 +1,27 @@
+from fastapi import Depends
+from sqlalchemy.orm import Session
+
+from app.infra.db.database import get_session
+from app.infra.db.repository import make_repository
+
+from .repository import AsyncIdempotencyRepository, IdempotencyRepository
+
+
+def get_idempotency_repository(db: Session = Depends(get_session)) -> IdempotencyRepository:
+    """
+    Dependency that provides an IdempotencyRepository instance.
+
+    The session is the request's, shared with the repository performing the write, and
+    the repository's methods are awaited like those of the other repositories.
+
+    Parameters
+    ----------
+    db : Session or AsyncSession
+        The SQLAlchemy session dependency injected by FastAPI.
+
+    Returns
+    -------
+    IdempotencyRepository
+        An IdempotencyRepository bound to the given session whose methods are awaited.
+    """
+    return make_repository(db, IdempotencyRepository, AsyncIdempotencyRepository)
@@ -0,0 +1,25 @@
+from datetime import datetime
+
+from sqlalchemy import JSON, Column, DateTime, Integer, String
+
+from app.infra.db.database import Base
+
+
+class IdempotencyKey(Base):
+    """
+    A client-supplied `Idempotency-Key` and the response of the request that used it.
+
+    The primary key makes `(scope, key)` unique, so only one request can claim a key.
+    While that request runs `status_code` is NULL; once it completes, its response is
+    stored and replayed to the retries until `expires_at`.
+    """
+
+    __tablename__ = "idempotency_keys"
+
+    scope = Column(String, primary_key=True)
+    key = Column(String(255), primary_key=True)
+    fingerprint = Column(String(64), nullable=False)
+    status_code = Column(Integer, nullable=True)
+    response = Column(JSON, nullable=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.now)
+    expires_at = Column(DateTime, nullable=False, index=True)
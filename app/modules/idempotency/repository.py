@@ -0,0 +1,227 @@
+from datetime import datetime, timedelta
+from typing import Any, Optional
+
+from sqlalchemy import delete, insert, update
+from sqlalchemy.engine import Row
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.config.env_variables import (
+    IDEMPOTENCY_LOCK_TIMEOUT_SECONDS,
+    IDEMPOTENCY_TTL_SECONDS,
+)
+from app.infra.db.repository import AsyncRepository
+from app.infra.db.statements import on_conflict_insert
+
+from .models import IdempotencyKey
+
+# Columns reset when an expired key is claimed again
+CLAIM_COLUMNS = ("fingerprint", "status_code", "response", "created_at", "expires_at")
+
+
+class IdempotencyRepository:
+    """
+    Repository for performing database operations related to `IdempotencyKey` entities.
+
+    Every method commits on its own, so that other requests, in this process or
+    another one, see a key as soon as it is claimed or completed.
+
+    Attributes
+    ----------
+    db : Session
+        The SQLAlchemy database session used for database operations.
+    """
+
+    def __init__(self, db: Session) -> None:
+        """
+        Initializes the IdempotencyRepository with the given database session.
+
+        Parameters
+        ----------
+        db : Session
+            The SQLAlchemy session to use for database operations.
+        """
+        self.db = db
+
+    def claim(self, scope: str, key: str, fingerprint: str) -> bool:
+        """
+        Claims a key for the request about to run.
+
+        The claim is a single INSERT ... ON CONFLICT DO UPDATE that only overwrites an
+        existing key once it has expired, either because its stored response is past its
+        TTL or because the request holding it never completed.
+
+        Parameters
+        ----------
+        scope : str
+            The endpoint and user the key belongs to.
+        key : str
+            The `Idempotency-Key` sent by the client.
+        fingerprint : str
+            The hash of the request payload.
+
+        Returns
+        -------
+        bool
+            True if the key was claimed, False if another request holds it.
+        """
+        now = datetime.now()
+        values = {
+            "scope": scope,
+            "key": key,
+            "fingerprint": fingerprint,
+            "status_code": None,
+            "response": None,
+            "created_at": now,
+            "expires_at": now + timedelta(seconds=IDEMPOTENCY_LOCK_TIMEOUT_SECONDS),
+        }
+
+        statement = on_conflict_insert(self.db, IdempotencyKey)
+        if statement is not None:
+            statement = statement.values(**values)
+            statement = statement.on_conflict_do_update(
+                index_elements=[IdempotencyKey.scope, IdempotencyKey.key],
+                set_={name: statement.excluded[name] for name in CLAIM_COLUMNS},
+                where=IdempotencyKey.expires_at <= now,
+            )
+            row = self.db.execute(statement.returning(IdempotencyKey.key)).first()
+            claimed = row is not None
+        else:
+            self.db.execute(
+                delete(IdempotencyKey).where(
+                    IdempotencyKey.scope == scope,
+                    IdempotencyKey.key == key,
+                    IdempotencyKey.expires_at <= now,
+                )
+            )
+            try:
+                self.db.execute(insert(IdempotencyKey).values(**values))
+                claimed = True
+            except IntegrityError:
+                self.db.rollback()
+                claimed = False
+
+        self.db.commit()
+        return claimed
+
+    def get(self, scope: str, key: str) -> Optional[Row]:
+        """
+        Reads the state of a key from the primary.
+
+        The transaction is ended right away, so that the next read of a key being waited
+        on sees the commits made meanwhile.
+
+        Parameters
+        ----------
+        scope : str
+            The endpoint and user the key belongs to.
+        key : str
+            The `Idempotency-Key` sent by the client.
+
+        Returns
+        -------
+        Row or None
+            The fingerprint, status code, response and expiry of the key, or None if
+            no request holds it.
+        """
+        row = (
+            self.db.query(
+                IdempotencyKey.fingerprint,
+                IdempotencyKey.status_code,
+                IdempotencyKey.response,
+                IdempotencyKey.expires_at,
+            )
+            .filter(IdempotencyKey.scope == scope, IdempotencyKey.key == key)
+            .first()
+        )
+        self.db.rollback()
+        return row
+
+    def complete(self, scope: str, key: str, status_code: int, response: Any) -> None:
+        """
+        Stores the response of the request holding a key, to be replayed for its TTL.
+
+        Parameters
+        ----------
+        scope : str
+            The endpoint and user the key belongs to.
+        key : str
+            The `Idempotency-Key` sent by the client.
+        status_code : int
+            The status code of the response.
+        response : Any
+            The JSON-compatible body of the response.
+        """
+        self.db.execute(
+            update(IdempotencyKey)
+            .where(IdempotencyKey.scope == scope, IdempotencyKey.key == key)
+            .values(
+                status_code=status_code,
+                response=response,
+                expires_at=datetime.now() + timedelta(seconds=IDEMPOTENCY_TTL_SECONDS),
+            )
+        )
+        self.db.commit()
+
+    def release(self, scope: str, key: str) -> None:
+        """
+        Frees a key whose request failed, so that a retry runs it again.
+
+        Parameters
+        ----------
+        scope : str
+            The endpoint and user the key belongs to.
+        key : str
+            The `Idempotency-Key` sent by the client.
+        """
+        # The failed request may have left the session in a failed transaction
+        self.db.rollback()
+        self.db.execute(
+            delete(IdempotencyKey).where(
+                IdempotencyKey.scope == scope,
+                IdempotencyKey.key == key,
+                IdempotencyKey.status_code.is_(None),
+            )
+        )
+        self.db.commit()
+
+    def fail(self, scope: str, key: str, response: Any) -> None:
+        """
+        Marks a key whose write was committed but whose response could not be stored.
+
+        The key is kept for its TTL with a 409 response, so that retries neither run the
+        write again nor wait for a response that will never come.
+
+        Parameters
+        ----------
+        scope : str
+            The endpoint and user the key belongs to.
+        key : str
+            The `Idempotency-Key` sent by the client.
+        response : Any
+            The JSON-compatible body replayed to the retries.
+        """
+        # The failed completion may have left the session in a failed transaction
+        self.db.rollback()
+        self.complete(scope, key, 409, response)
+
+    def purge_expired(self) -> int:
+        """
+        Deletes the expired keys.
+
+        Returns
+        -------
+        int
+            The number of keys deleted.
+        """
+        result = self.db.execute(
+            delete(IdempotencyKey).where(IdempotencyKey.expires_at <= datetime.now())
+        )
+        self.db.commit()
+        return result.rowcount
+
+
+class AsyncIdempotencyRepository(AsyncRepository[IdempotencyRepository]):
+    """
+    Adapter running the queries of `IdempotencyRepository` on an `AsyncSession`.
+    """
@@ -0,0 +1,150 @@
+"""
+Execution of create requests carrying an `Idempotency-Key` header.
+
+The first request with a key claims it in the `idempotency_keys` table, runs the
+write and stores its response; repeats of the request get the stored response
+back without running the write again. A repeat arriving while the first request
+is still running waits for it: in the same process by joining its execution
+through `SingleFlight`, across processes by polling the key until its response is
+stored. A key reused with a different payload is rejected. Once the write is
+committed the key is never released, even if its response can't be stored, so
+that a retry can't run the write twice.
+
+Keys are scoped by endpoint and user, so two users can never see each other's
+responses.
+"""
+
+import asyncio
+import hashlib
+import json
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Optional
+
+from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.config.env_variables import (
+    IDEMPOTENCY_POLL_INTERVAL_SECONDS,
+    IDEMPOTENCY_WAIT_TIMEOUT_SECONDS,
+)
+from app.infra.concurrency.singleflight import SingleFlight
+from app.infra.logger.config import logger
+
+from .repository import IdempotencyRepository
+
+# Replayed, with a 409, to the retries of a request whose write was committed but whose
+# response could not be stored
+UNSTORED_RESPONSE_DETAIL = (
+    "The request with this Idempotency-Key was processed but its response was not stored"
+)
+
+# Concurrent requests of this process with the same key and payload share one execution
+idempotency_flight = SingleFlight("idempotency")
+
+
+def fingerprint(payload: Any) -> str:
+    """
+    Hashes a request payload, to tell a repeat from a different request reusing a key.
+    """
+    encoded = json.dumps(jsonable_encoder(payload), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+async def run_idempotent(
+    repository: IdempotencyRepository,
+    scope: str,
+    key: Optional[str],
+    payload: Any,
+    fn: Callable[[], Awaitable[Any]],
+) -> Any:
+    """
+    Runs a create request at most once per idempotency key.
+
+    Parameters
+    ----------
+    repository : IdempotencyRepository
+        The repository storing the keys.
+    scope : str
+        The endpoint and user the key belongs to, e.g. `donation:42`.
+    key : str, optional
+        The `Idempotency-Key` header; without it, `fn` simply runs.
+    payload : Any
+        The request payload, whose fingerprint is stored with the key.
+    fn : Callable[[], Awaitable]
+        Runs the request and returns its response body.
+
+    Returns
+    -------
+    Any
+        The result of `fn`, or a `JSONResponse` replaying the stored response with an
+        `Idempotent-Replayed: true` header.
+
+    Raises
+    ------
+    HTTPException
+        422 if the key was used with a different payload, 409 if the request holding the
+        key is still running after IDEMPOTENCY_WAIT_TIMEOUT_SECONDS.
+    """
+    if not key:
+        return await fn()
+
+    request_fingerprint = fingerprint(payload)
+    return await idempotency_flight.do(
+        (scope, key, request_fingerprint),
+        lambda: _run_once(repository, scope, key, request_fingerprint, fn),
+    )
+
+
+async def _run_once(
+    repository: IdempotencyRepository,
+    scope: str,
+    key: str,
+    request_fingerprint: str,
+    fn: Callable[[], Awaitable[Any]],
+) -> Any:
+    deadline = asyncio.get_running_loop().time() + IDEMPOTENCY_WAIT_TIMEOUT_SECONDS
+    claim = True
+    while True:
+        if claim and await repository.claim(scope, key, request_fingerprint):
+            break
+
+        record = await repository.get(scope, key)
+        # The key was released by a failed request or has expired: try to claim it
+        claim = record is None or record.expires_at <= datetime.now()
+        if claim:
+            continue
+        if record.fingerprint != request_fingerprint:
+            raise HTTPException(
+                status_code=422, detail="Idempotency-Key was already used with another request"
+            )
+        if record.status_code is not None:
+            return JSONResponse(
+                content=record.response,
+                status_code=record.status_code,
+                headers={"Idempotent-Replayed": "true"},
+            )
+        if asyncio.get_running_loop().time() >= deadline:
+            raise HTTPException(
+                status_code=409, detail="A request with this Idempotency-Key is in progress"
+            )
+        await asyncio.sleep(IDEMPOTENCY_POLL_INTERVAL_SECONDS)
+
+    try:
+        result = await fn()
+    except Exception:
+        await repository.release(scope, key)
+        raise
+
+    # The write is committed: from now on the key must never be released, or a retry
+    # would run it again
+    try:
+        await repository.complete(scope, key, 200, jsonable_encoder(result))
+    except Exception as e:  # pylint: disable=broad-exception-caught
+        logger.error("Could not store the response of Idempotency-Key %s: %s", key, e)
+        try:
+            await repository.fail(scope, key, {"detail": UNSTORED_RESPONSE_DETAIL})
+        except Exception as error:  # pylint: disable=broad-exception-caught
+            # The key stays claimed until IDEMPOTENCY_LOCK_TIMEOUT_SECONDS
+            logger.error("Could not mark Idempotency-Key %s as failed: %s", key, error)
+    return result
@@ -1,13 +1,14 @@
 from fastapi import Depends
 from sqlalchemy.orm import Session
 
-from app.infra.db.database import get_db
+from app.infra.db.database import get_session
+from app.infra.db.repository import make_repository
 
-from .repository import InstituteRepository
+from .repository import AsyncInstituteRepository, InstituteRepository
 
 
 def get_institute_repository(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_session),
 ) -> InstituteRepository:
     """
     Dependency that provides a InstituteRepository instance.
@@ -17,13 +18,14 @@ def get_institute_repository(
 
     Parameters
     ----------
-    db : Session
+    db : Session or AsyncSession
         The SQLAlchemy session dependency injected by FastAPI, used to perform
         database operations.
 
     Returns
     -------
     InstituteRepository
-        An instance of InstituteRepository initialized with the given database session.
+        A InstituteRepository bound to the given session whose methods are awaited: run on the
+        threadpool in sync mode, or as AsyncInstituteRepository in async mode.
     """
-    return InstituteRepository(db)
+    return make_repository(db, InstituteRepository, AsyncInstituteRepository)
@@ -1,7 +1,14 @@
+from typing import Optional
+
 from fastapi import HTTPException
+from sqlalchemy import exists, update
 from sqlalchemy.orm import Session
 
 from app.infra.db.models import Institute, User
+from app.infra.db.repository import AsyncRepository
+from app.infra.cache.cache import cache
+from app.infra.db.routing import read_only
+from app.modules.user.principal import principal_cache
 from app.modules.user.schemas import User as UserSchema
 
 from .schemas import (
@@ -13,6 +20,15 @@ from .schemas import (
 )
 
 
+def invalidate_institutes(*institute_ids: Optional[int]) -> None:
+    """
+    Drops the cached lookups of the institutes with the given IDs (admins, permissions).
+    """
+    cache.invalidate(
+        *(f"institute:{institute_id}" for institute_id in institute_ids if institute_id)
+    )
+
+
 class InstituteRepository:
     """
     Repository for performing database operations related to `User` entity.
@@ -59,30 +75,50 @@ class InstituteRepository:
             is_active=institute_data.is_active,
         )
 
+        previous_institute_id = user.institute_id
         db_institute.admins.append(user)
 
         self.db.add(db_institute)
         self.db.commit()
         self.db.refresh(db_institute)
+        principal_cache.evict(user.email)
+        invalidate_institutes(db_institute.id, previous_institute_id)
+
+        return self._to_schema(db_institute)
+
+    @staticmethod
+    def _to_schema(institute: Institute) -> InstituteSchema:
+        """
+        Builds the schema of an institute, loading its admins while the session is still usable.
 
-        # Assuming InstituteSchema is a Pydantic model with these fields
+        Parameters
+        ----------
+        institute : Institute
+            The institute model instance.
+
+        Returns
+        -------
+        InstituteSchema
+            The schema representing the institute.
+        """
         return InstituteSchema(
-            id=db_institute.id,
-            name=db_institute.name,
-            email=db_institute.email,
-            cnpj=db_institute.cnpj,
-            is_active=db_institute.is_active,
-            admins=[UserSchema.model_validate(admin) for admin in db_institute.admins],
+            id=institute.id,
+            name=institute.name,
+            email=institute.email,
+            cnpj=institute.cnpj,
+            is_active=institute.is_active,
+            admins=[UserSchema.model_validate(admin) for admin in institute.admins],
         )
 
     def update_institute(
         self, institute_id: int, user_id: int, data: UpdateInstitute
-    ) -> Institute:
+    ) -> InstituteSchema:
         """
         Update an institute in the database.
 
         This method updates an institute in the database using the given institute_id and
-        UpdateInstitute schema.
+        UpdateInstitute schema, with a single UPDATE ... RETURNING statement restricted to
+        the institute of the user.
 
         Parameters
         ----------
@@ -93,25 +129,28 @@ class InstituteRepository:
 
         Returns
         -------
-        Institute
-            The model representing the updated institute.
+        InstituteSchema
+            The schema representing the updated institute.
         """
-        if not self.is_admin(user_id, institute_id):
-            raise HTTPException(status_code=403, detail="User is not an admin of the institute")
-
-        updated_institute = self.db.query(Institute).filter(Institute.id == institute_id).first()
+        is_admin = exists().where(User.id == user_id, User.institute_id == Institute.id)
+        statement = (
+            update(Institute)
+            .where(Institute.id == institute_id, is_admin)
+            .values(**data.model_dump(exclude_unset=True))
+            .returning(Institute)
+            .execution_options(synchronize_session=False)
+        )
+        updated_institute = self.db.scalars(statement).first()
         if not updated_institute:
-            raise HTTPException(status_code=404, detail="Institute not found")
-
-        # Update the fields from the schema
-        for key, value in data.model_dump(exclude_unset=True).items():
-            setattr(updated_institute, key, value)
+            # An institute always has its admins, so a missing one is forbidden too
+            self.db.rollback()
+            raise HTTPException(status_code=403, detail="User is not an admin of the institute")
 
+        institute = self._to_schema(updated_institute)
         self.db.commit()
-        self.db.refresh(updated_institute)
-        return updated_institute
+        return institute
 
-    def add_admin(self, data: AddAdmin) -> list[User]:
+    def add_admin(self, data: AddAdmin) -> InstituteSchema:
         """
         Add an admin to an institute.
 
@@ -124,8 +163,8 @@ class InstituteRepository:
 
         Returns
         -------
-        Institute
-            The model representing the updated institute.
+        InstituteSchema
+            The schema representing the updated institute.
         """
         institute = self.db.query(Institute).filter(Institute.id == data.institute_id).first()
         if not institute:
@@ -135,17 +174,21 @@ class InstituteRepository:
         if not user:
             raise HTTPException("User not found")
 
+        previous_institute_id = user.institute_id
         institute.admins.append(user)
         self.db.commit()
         self.db.refresh(institute)
-        return institute
+        principal_cache.evict(user.email)
+        invalidate_institutes(institute.id, previous_institute_id)
+        return self._to_schema(institute)
 
     def is_admin(self, user_id: int, institute_id: int) -> bool:
         """
         Check if a user is an admin of an institute.
 
         This method checks if a user is an admin of an institute by checking if the user is
-        present in the institute's admins list.
+        present in the institute's admins list. The answer is cached until the admins of the
+        institute change.
 
         Parameters
         ----------
@@ -160,19 +203,23 @@ class InstituteRepository:
             True if the user is an admin of the institute, False otherwise.
 
         """
-        admin = (
-            self.db.query(User)
-            .filter(User.id == user_id, User.institute_id == institute_id)
-            .first()
+        return cache.get_or_set(
+            "institute_admin",
+            (institute_id, user_id),
+            lambda: self.db.query(
+                exists().where(User.id == user_id, User.institute_id == institute_id)
+            ).scalar(),
+            tags=(f"institute:{institute_id}",),
         )
-        return admin is not None
 
+    @read_only
     def get_admins(self, institute_id: int, user_id: int):
         """
         Get the list of admins of an institute.
 
         This method gets the list of admins of an institute by checking if the user is an admin of
-        the institute and returning the list of admins.
+        the institute and returning the list of admins. The list is cached until the admins
+        change.
 
         Parameters
         ----------
@@ -197,11 +244,22 @@ class InstituteRepository:
         if not self.is_admin(user_id, institute_id):
             raise HTTPException(status_code=403, detail="User is not an admin of the institute")
 
-        institute = self.db.query(Institute).filter(Institute.id == institute_id).first()
-
-        if not institute or not institute.admins:
+        admins = cache.get_or_set(
+            "institute_admins",
+            institute_id,
+            lambda: [
+                UserSchema.model_validate(admin)
+                for admin in self.db.query(User).filter(User.institute_id == institute_id)
+            ],
+            tags=(f"institute:{institute_id}",),
+        )
+        if not admins:
             raise HTTPException(status_code=404, detail="Not found")
 
-        admin_schemas = [UserSchema.model_validate(admin) for admin in institute.admins]
+        return AdminsList(admins=admins)
 
-        return AdminsList(admins=admin_schemas)
+
+class AsyncInstituteRepository(AsyncRepository[InstituteRepository]):
+    """
+    Adapter running the queries of `InstituteRepository` on an `AsyncSession`.
+    """
@@ -1,6 +1,8 @@
 from fastapi import APIRouter, Depends, HTTPException
 
+from app.infra.http.responses import json_response
 from app.infra.logger.config import logger
+from app.modules.user.principal import Principal
 from app.modules.user.schemas import User
 from app.modules.auth.dependecies import get_current_user
 
@@ -12,9 +14,9 @@ institute_routes = APIRouter(prefix="/institutes", tags=["Institutes"])
 
 
 @institute_routes.post("/", response_model=schemas.InstituteSchema, )
-def create_institute(
+async def create_institute(
     institute: schemas.CreateInstitute,
-    user: User = Depends(get_current_user),
+    user: Principal = Depends(get_current_user),
     institute_repository: InstituteRepository = Depends(get_institute_repository),
 ):
     """
@@ -36,20 +38,20 @@ def create_institute(
     """
     try:
         user_id = user.id
-        new_institute = institute_repository.create_institute(user_id, institute)
+        new_institute = await institute_repository.create_institute(user_id, institute)
         logger.info("Institute created successfully %s", new_institute.id)
-        return new_institute
+        return json_response(schemas.INSTITUTE_ADAPTER, new_institute)
     except Exception as e:
         logger.error("Error creating institute %s", e)
         raise HTTPException(status_code=500, detail=str(e)) from e
 
 
 @institute_routes.put("/{institute_id}", response_model=schemas.InstituteSchema)
-def update_institute(
+async def update_institute(
     institute_id: int,
     data: schemas.UpdateInstitute,
     institute_repository: InstituteRepository = Depends(get_institute_repository),
-    user: User = Depends(get_current_user),
+    user: Principal = Depends(get_current_user),
 ) -> schemas.InstituteSchema:
     """
     Update an institute in the database.
@@ -73,16 +75,18 @@ def update_institute(
     """
     try:
         user_id=user.id
-        updated_institute = institute_repository.update_institute(institute_id, user_id, data)
+        updated_institute = await institute_repository.update_institute(
+            institute_id, user_id, data
+        )
         logger.info("Institute updated successfully %s", updated_institute.id)
-        return updated_institute
+        return json_response(schemas.INSTITUTE_ADAPTER, updated_institute)
     except Exception as e:
         logger.error("Error updating institute %s", e)
         raise HTTPException(status_code=500, detail=str(e)) from e
 
 
 @institute_routes.post("/add-admin", response_model=schemas.InstituteSchema)
-def add_admin(
+async def add_admin(
     data: schemas.AddAdmin,
     institute_repository: InstituteRepository = Depends(get_institute_repository),
 ) -> schemas.InstituteSchema:
@@ -104,18 +108,18 @@ def add_admin(
         The model representing the updated institute.
     """
     try:
-        updated_institute = institute_repository.add_admin(data)
+        updated_institute = await institute_repository.add_admin(data)
         logger.info("Admin added successfully %s", updated_institute.id)
-        return updated_institute
+        return json_response(schemas.INSTITUTE_ADAPTER, updated_institute)
     except Exception as e:
         logger.error("Error adding admin %s", e)
         raise HTTPException(status_code=500, detail=str(e)) from e
 
 
 @institute_routes.get("/{institute_id}/admins", response_model=schemas.AdminsList)
-def get_admins(
+async def get_admins(
     institute_id: int,
-    user: User = Depends(get_current_user),
+    user: Principal = Depends(get_current_user),
     institute_repository: InstituteRepository = Depends(get_institute_repository),
 ) -> list[User]:
     """
@@ -137,9 +141,9 @@ def get_admins(
     """
     try:
         user_id = user.id
-        admins = institute_repository.get_admins(institute_id, user_id)
+        admins = await institute_repository.get_admins(institute_id, user_id)
         logger.info("Admins retrieved successfully")
-        return admins
+        return json_response(schemas.ADMINS_LIST_ADAPTER, admins)
     except Exception as e:
         logger.error("Error retrieving admins %s", e)
         raise HTTPException(status_code=500, detail=str(e)) from e
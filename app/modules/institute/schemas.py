@@ -1,6 +1,6 @@
 from typing import List, Optional
 
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, TypeAdapter
 from app.modules.user.schemas import User
 
 
@@ -56,3 +56,8 @@ class AdminsList(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+# Pre-built serializers of the schemas returned with `json_response`
+INSTITUTE_ADAPTER = TypeAdapter(InstituteSchema)
+ADMINS_LIST_ADAPTER = TypeAdapter(AdminsList)
@@ -1,12 +1,13 @@
 from fastapi import Depends
 from sqlalchemy.orm import Session
 
-from app.infra.db.database import get_db
+from app.infra.db.database import get_session
+from app.infra.db.repository import make_repository
 
-from .repository import UserRepository
+from .repository import AsyncUserRepository, UserRepository
 
 
-def get_user_repository(db: Session = Depends(get_db)) -> UserRepository:
+def get_user_repository(db: Session = Depends(get_session)) -> UserRepository:
     """
     Dependency that provides a UserRepository instance.
 
@@ -15,13 +16,14 @@ def get_user_repository(db: Session = Depends(get_db)) -> UserRepository:
 
     Parameters
     ----------
-    db : Session
+    db : Session or AsyncSession
         The SQLAlchemy session dependency injected by FastAPI, used to perform
         database operations.
 
     Returns
     -------
     UserRepository
-        An instance of UserRepository initialized with the given database session.
+        A UserRepository bound to the given session whose methods are awaited: run on the
+        threadpool in sync mode, or as AsyncUserRepository in async mode.
     """
-    return UserRepository(db)
+    return make_repository(db, UserRepository, AsyncUserRepository)
@@ -0,0 +1,56 @@
+"""
+Lightweight representation of the authenticated user.
+
+Routes only need the id of the caller and its institute membership, so the
+authentication dependency hands them a `Principal` rather than an ORM `User`.
+Principals are cached by email so authenticated requests can skip the users
+query; the repositories that change these fields evict the cached entry.
+"""
+
+from app.config.env_variables import PRINCIPAL_CACHE_MAX_SIZE, PRINCIPAL_CACHE_TTL_SECONDS
+from app.modules.auth.cache import TTLCache
+
+
+class Principal:
+    """
+    The authenticated user, as seen by the routes.
+
+    Attributes
+    ----------
+    id : int
+        The ID of the user.
+    email : str
+        The email of the user.
+    is_active : bool
+        Whether the user is active.
+    institute_id : int, optional
+        The ID of the institute the user administers, if any.
+    """
+
+    __slots__ = ("id", "email", "is_active", "institute_id")
+
+    def __init__(
+        self, user_id: int, email: str, is_active: bool, institute_id: int = None
+    ) -> None:
+        self.id = user_id
+        self.email = email
+        self.is_active = is_active
+        self.institute_id = institute_id
+
+    @classmethod
+    def from_user(cls, user) -> "Principal":
+        """
+        Builds a principal from a `User` model instance.
+        """
+        return cls(
+            user_id=user.id,
+            email=user.email,
+            is_active=user.is_active,
+            institute_id=user.institute_id,
+        )
+
+    def __repr__(self) -> str:
+        return f"Principal(id={self.id!r}, email={self.email!r})"
+
+
+principal_cache = TTLCache(max_size=PRINCIPAL_CACHE_MAX_SIZE, ttl=PRINCIPAL_CACHE_TTL_SECONDS)
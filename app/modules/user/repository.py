@@ -1,7 +1,18 @@
+from typing import Optional
+
 from fastapi import HTTPException
+from sqlalchemy import insert, update
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError
+
+from app.infra.db.pagination import Page, paginate
+from app.infra.db.repository import AsyncRepository
+from app.infra.db.routing import read_only
+from app.infra.db.statements import on_conflict_insert
+from app.modules.institute.repository import invalidate_institutes
+
 from .models import User
+from .principal import principal_cache
 from .schemas import UserCreate, UserUpdate
 
 
@@ -26,6 +37,7 @@ class UserRepository:
         """
         self.db = db
 
+    @read_only
     def get_user(self, user_id: int):
         """
         Fetches a user by their ID.
@@ -42,23 +54,24 @@ class UserRepository:
         """
         return self.db.query(User).filter(User.id == user_id).first()
 
-    def get_users(self, skip: int = 0, limit: int = 100):
+    @read_only
+    def get_users(self, cursor: Optional[str] = None, limit: Optional[int] = None) -> Page:
         """
-        Fetches a list of users, implementing pagination.
+        Fetches a page of users, using keyset pagination over the user ID.
 
         Parameters
         ----------
-        skip : int, optional
-            The number of users to skip (default is 0).
+        cursor : str, optional
+            The cursor returned with the previous page; None for the first page.
         limit : int, optional
-            The maximum number of users to return (default is 100).
+            The maximum number of users to return.
 
         Returns
         -------
-        list[User]
-            A list of user objects.
+        Page
+            The users of the page and the cursor of the next page.
         """
-        return self.db.query(User).offset(skip).limit(limit).all()
+        return paginate(self.db.query(User), (User.id,), cursor=cursor, limit=limit)
 
     def get_user_by_email(self, email: str):
         """
@@ -90,6 +103,10 @@ class UserRepository:
         """
         Creates a new user in the database.
 
+        The user is inserted with INSERT ... ON CONFLICT (email) DO NOTHING RETURNING
+        where the database supports it, so the duplicate check and the insert are a
+        single statement; other databases check the email first.
+
         Parameters
         ----------
         user : UserCreate
@@ -106,14 +123,22 @@ class UserRepository:
             If the email is already registered.
         """
         try:
-            existing_user = self.get_user_by_email(user.email)
-            if existing_user:
+            statement = on_conflict_insert(self.db, User)
+            if statement is not None:
+                statement = statement.values(**user.dict()).on_conflict_do_nothing(
+                    index_elements=[User.email]
+                )
+            else:
+                if self.get_user_by_email(user.email):
+                    raise HTTPException(status_code=400, detail="Email is already registered")
+                statement = insert(User).values(**user.dict())
+
+            db_user = self.db.scalars(statement.returning(User)).first()
+            if db_user is None:
                 raise HTTPException(status_code=400, detail="Email is already registered")
 
-            db_user = User(**user.dict())
-            self.db.add(db_user)
             self.db.commit()
-            self.db.refresh(db_user)
+            principal_cache.evict(db_user.email)
             return db_user
         except SQLAlchemyError as e:
             print(e)
@@ -129,6 +154,10 @@ class UserRepository:
         """
         Updates a user's information by their ID.
 
+        The user is updated with a single UPDATE ... RETURNING statement. Its previous
+        email is only read first when the email changes, to evict it from the principal
+        cache.
+
         Parameters
         ----------
         user_id : int
@@ -141,19 +170,32 @@ class UserRepository:
         User
             The updated user object.
         """
-        db_user = self.get_user(user_id)
+        update_data = user_update.model_dump(exclude_unset=True)
+        previous_email = None
+        if "email" in update_data:
+            previous_email = self.db.query(User.email).filter(User.id == user_id).scalar()
+
+        statement = (
+            update(User)
+            .where(User.id == user_id)
+            .values(**update_data)
+            .returning(User)
+            .execution_options(synchronize_session=False)
+        )
+        db_user = self.db.scalars(statement).first()
         if not db_user:
+            self.db.rollback()
             raise HTTPException(status_code=404, detail="User not found")
 
-        update_data = user_update.model_dump(exclude_unset=True)
-
-        for key, value in update_data.items():
-            setattr(db_user, key, value)
-
         self.db.commit()
-        self.db.refresh(db_user)
+        if previous_email:
+            principal_cache.evict(previous_email)
+        principal_cache.evict(db_user.email)
+        # The admins of an institute are listed with their details
+        invalidate_institutes(db_user.institute_id)
         return db_user
 
+    @read_only
     def get_user_by_id(self, user_id: int):
         """
         Fetches a user by their ID.
@@ -170,6 +212,24 @@ class UserRepository:
         """
         return self.db.query(User).filter(User.id == user_id).first()
 
+    @read_only
+    def get_user_version(self, user_id: int):
+        """
+        Fetches when a user was last updated, without loading it.
+
+        Parameters
+        ----------
+        user_id : int
+            The ID of the user.
+
+        Returns
+        -------
+        datetime
+            The `updated_at` of the user, or None if not found.
+        """
+        row = self.db.query(User.updated_at).filter(User.id == user_id).first()
+        return row.updated_at if row is not None else None
+
     def deleteAll(self):
         """
         Deletes all users from the database.
@@ -180,3 +240,10 @@ class UserRepository:
         """
         self.db.query(User).delete()
         self.db.commit()
+        principal_cache.clear()
+
+
+class AsyncUserRepository(AsyncRepository[UserRepository]):
+    """
+    Adapter running the queries of `UserRepository` on an `AsyncSession`.
+    """
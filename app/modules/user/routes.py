@@ -1,7 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Optional
 
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+
+from app.config.env_variables import PAGE_SIZE_DEFAULT
+from app.infra.http.conditional import etag_matches, make_etag, not_modified, set_cache_headers
+from app.infra.http.responses import json_response
 from app.infra.logger.config import logger
 from app.modules.auth.dependecies import get_current_user
+from app.modules.user.principal import Principal
 from . import schemas
 from .dependencies import get_user_repository
 from .repository import UserRepository
@@ -9,47 +15,62 @@ from .repository import UserRepository
 user_router = APIRouter(prefix="/user", tags=["User"])
 
 
-@user_router.get("/", response_model=list[schemas.User])
-def list_users(
-    skip: int = 0,
-    limit: int = 100,
+@user_router.get("/", response_model=schemas.UsersPage)
+async def list_users(
+    cursor: Optional[str] = None,
+    limit: int = Query(PAGE_SIZE_DEFAULT, ge=1),
     user_repository: UserRepository = Depends(get_user_repository),
 ):
     """
-    Retrieve a list of users, with pagination.
+    Retrieve a list of users, with cursor pagination.
 
     Parameters
     ----------
-    skip : int, optional
-        The number of items to skip (default is 0).
+    cursor : str, optional
+        The `next_cursor` returned with the previous page; omitted for the first page.
     limit : int, optional
-        The maximum number of items to return (default is 100).
+        The maximum number of items to return, capped by PAGE_SIZE_MAX.
     user_repository : UserRepository
         The user repository dependency.
 
     Returns
     -------
-    list[schemas.User]
-        A list of user objects.
+    schemas.UsersPage
+        A page of user objects and the cursor of the next page.
     """
     try:
-        users = user_repository.get_users(skip=skip, limit=limit)
+        page = await user_repository.get_users(cursor=cursor, limit=limit)
         logger.info("Users fetched successfully")
-        return users
+        return json_response(
+            schemas.USERS_PAGE_ADAPTER,
+            schemas.UsersPage(users=page.items, next_cursor=page.next_cursor),
+        )
+    except ValueError as e:
+        logger.error("Error fetching users: %s", e)
+        raise HTTPException(status_code=400, detail=str(e)) from e
     except Exception as e:
         logger.error("Error fetching users")
         raise HTTPException(status_code=500, detail=str(e)) from e
 
 
 @user_router.get("/{user_id}", response_model=schemas.User)
-def read_user(user_id: int, user_repository: UserRepository = Depends(get_user_repository)):
+async def read_user(
+    user_id: int,
+    request: Request,
+    user_repository: UserRepository = Depends(get_user_repository),
+):
     """
     Retrieve a user by their user ID.
 
+    The ETag of the user is built from its `updated_at`, read first; when it matches
+    `If-None-Match`, 304 is returned without loading the user.
+
     Parameters
     ----------
     user_id : int
         The ID of the user to retrieve.
+    request : Request
+        The request, whose `If-None-Match` header is checked.
     user_repository : UserRepository
         The user repository dependency.
 
@@ -64,18 +85,27 @@ def read_user(user_id: int, user_repository: UserRepository = Depends(get_user_r
         If no user with the given ID was found.
     """
     try:
-        user = user_repository.get_user_by_id(user_id=user_id)
+        updated_at = await user_repository.get_user_version(user_id=user_id)
+        if updated_at is None:
+            logger.error("User not found")
+            raise HTTPException(status_code=404, detail="User not found")
+        etag = make_etag("user", user_id, updated_at)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        user = await user_repository.get_user_by_id(user_id=user_id)
         if not user:
             logger.error("User not found")
             raise HTTPException(status_code=404, detail="User not found")
-        return user
+        response = json_response(schemas.USER_ADAPTER, schemas.User.model_validate(user))
+        set_cache_headers(response, etag)
+        return response
     except Exception as e:
         logger.error("Error fetching user %s", e)
         raise HTTPException(status_code=500, detail=str(e)) from e
 
 
 @user_router.put("/{user_id}")
-def update_user_by_id(
+async def update_user_by_id(
     user_id: int,
     user: schemas.UserUpdate,
     user_repository: UserRepository = Depends(get_user_repository),
@@ -98,7 +128,7 @@ def update_user_by_id(
         The updated user object.
     """
     try:
-        updated_user = user_repository.update_user(user_id=user_id, user_update=user)
+        updated_user = await user_repository.update_user(user_id=user_id, user_update=user)
         logger.info("User updated successfully %s", updated_user.id)
         return updated_user
     except Exception as e:
@@ -107,18 +137,26 @@ def update_user_by_id(
 
 
 @user_router.get("/data/me", response_model=schemas.User)
-def read_current_user(user: schemas.User = Depends(get_current_user)):
+async def read_current_user(
+    user: Principal = Depends(get_current_user),
+    user_repository: UserRepository = Depends(get_user_repository),
+):
     """
     Retrieve the current user.
 
     Parameters
     ----------
-    user : schemas.User
-        The current user.
+    user : Principal
+        The authenticated principal.
+    user_repository : UserRepository
+        The user repository dependency.
 
     Returns
     -------
     schemas.User
         The current user object.
     """
-    return user
+    db_user = await user_repository.get_user_by_id(user_id=user.id)
+    if not db_user:
+        raise HTTPException(status_code=404, detail="User not found")
+    return json_response(schemas.USER_ADAPTER, schemas.User.model_validate(db_user))
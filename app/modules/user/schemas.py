@@ -1,6 +1,6 @@
-from typing import Optional
+from typing import List, Optional
 
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, TypeAdapter
 
 
 class UserBase(BaseModel):
@@ -32,6 +32,11 @@ class User(UserBase):
         from_attributes = True
 
 
+class UsersPage(BaseModel):
+    users: List[User]
+    next_cursor: Optional[str] = None
+
+
 class UserUpdate(BaseModel):
     email: Optional[EmailStr] = None
     is_active: Optional[bool] = None
@@ -43,3 +48,8 @@ class UserUpdate(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+# Pre-built serializers of the schemas returned with `json_response`
+USER_ADAPTER = TypeAdapter(User)
+USERS_PAGE_ADAPTER = TypeAdapter(UsersPage)
@@ -0,0 +1,42 @@
+"""
+Internal endpoints exposing runtime metrics of the current worker process.
+
+They are only mounted when `INTERNAL_STATS_ENABLED` is set, and are meant to be
+scraped from inside the deployment rather than exposed publicly.
+"""
+
+from fastapi import APIRouter
+
+from app.infra.cache.cache import cache
+from app.infra.db import pool_metrics
+from app.infra.http.compression import compression_metrics
+from app.modules.auth.cache import token_cache
+from app.modules.auth.dependecies import identity_flight
+from app.modules.donation.ingest import donation_ingest
+from app.modules.idempotency.runner import idempotency_flight
+from app.modules.user.principal import principal_cache
+
+internal_router = APIRouter(prefix="/internal", tags=["Internal"])
+
+
+@internal_router.get("/stats")
+async def get_stats():
+    """
+    Returns the connection pool, cache, request coalescing and response compression
+    metrics of this worker.
+
+    Returns:
+        A dictionary of metrics grouped by subsystem.
+    """
+    return {
+        "db_pools": {name: metrics.snapshot() for name, metrics in pool_metrics.registry.items()},
+        "auth": {
+            "token_cache": token_cache.stats(),
+            "principal_cache": principal_cache.stats(),
+            "identity_flight": identity_flight.stats(),
+        },
+        "cache": cache.stats(),
+        "idempotency_flight": idempotency_flight.stats(),
+        "donation_ingest": donation_ingest.stats(),
+        "compression": compression_metrics.snapshot(),
+    }
@@ -14,6 +14,7 @@ main_router : APIRouter
 
 from fastapi import APIRouter, Depends
 
+from app.config.env_variables import INTERNAL_STATS_ENABLED
 from app.modules.cause.routes import cause_routes
 from app.modules.donation.routes import donation_router
 from app.modules.institute.routes import institute_routes
@@ -21,6 +22,7 @@ from app.modules.user.routes import user_router
 from app.modules.auth.routes import auth_router
 
 from app.modules.auth.dependecies import get_current_user
+from app.router.internal import internal_router
 
 main_router = APIRouter()
 
@@ -30,3 +32,6 @@ main_router.include_router(user_router, dependencies=[Depends(get_current_user)]
 main_router.include_router(donation_router, dependencies=[Depends(get_current_user)])
 main_router.include_router(cause_routes, dependencies=[Depends(get_current_user)])
 main_router.include_router(institute_routes, dependencies=[Depends(get_current_user)])
+
+if INTERNAL_STATS_ENABLED:
+    main_router.include_router(internal_router)
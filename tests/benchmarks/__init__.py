@@ -0,0 +1,8 @@
+"""
+Benchmarks of the optimized paths, run as scripts, e.g.
+
+    python -m tests.benchmarks.bulk_donations
+
+They are not collected by pytest; the tests check behaviour, the benchmarks report
+timings and query counts.
+"""
@@ -0,0 +1,50 @@
+"""
+Throughput of POST /donation/bulk against looping POST /donation/.
+
+    python -m tests.benchmarks.bulk_donations [--count 1000]
+
+Both create the same number of donations to one cause, in process through a
+TestClient, against the test database of `tests.support`.
+"""
+
+import argparse
+import time
+
+from tests.support import create_admin, create_cause, reset_database  # isort: split
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n", maxsplit=1)[0].strip())
+    parser.add_argument("--count", type=int, default=1000, help="donations per run")
+    args = parser.parse_args()
+
+    reset_database()
+    with TestClient(app) as client:
+        admin = create_admin(client)
+        donation = {"cause_id": create_cause(client, admin)["id"]}
+
+        start = time.perf_counter()
+        for _ in range(args.count):
+            response = client.post("/donation/", headers=admin["headers"], json=donation)
+            assert response.status_code == 200, response.text
+        single = time.perf_counter() - start
+
+        start = time.perf_counter()
+        response = client.post(
+            "/donation/bulk", headers=admin["headers"], json=[donation] * args.count
+        )
+        assert response.status_code == 200, response.text
+        assert len(response.json()["created"]) == args.count
+        bulk = time.perf_counter() - start
+
+    print(f"POST /donation/     {args.count / single:10.0f} donations/s")
+    print(f"POST /donation/bulk {args.count / bulk:10.0f} donations/s")
+    print(f"speedup             {single / bulk:10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
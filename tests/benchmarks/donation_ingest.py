@@ -0,0 +1,72 @@
+"""
+Throughput of POST /donation/ with and without write-behind ingestion.
+
+    python -m tests.benchmarks.donation_ingest [--count 2000] [--concurrency 100]
+
+The same concurrent donations are sent twice, in process through the ASGI app,
+against the test database of `tests.support`: first written by each request
+with its own commit, then queued and written in batches by `donation_ingest`.
+"""
+
+import argparse
+import asyncio
+import time
+
+from tests.support import create_admin, create_cause, reset_database  # isort: split
+
+import httpx
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.modules.donation.ingest import donation_ingest
+
+
+async def send(count: int, concurrency: int, headers: dict, donation: dict) -> float:
+    """
+    Sends `count` donations, `concurrency` at a time, and returns the elapsed seconds.
+    """
+    slots = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+
+        async def post() -> None:
+            async with slots:
+                response = await client.post("/donation/", headers=headers, json=donation)
+                assert response.status_code == 200, response.text
+
+        start = time.perf_counter()
+        await asyncio.gather(*(post() for _ in range(count)))
+        return time.perf_counter() - start
+
+
+async def run(count: int, concurrency: int, headers: dict, donation: dict) -> None:
+    per_request = await send(count, concurrency, headers, donation)
+
+    await donation_ingest.start()
+    try:
+        batched = await send(count, concurrency, headers, donation)
+    finally:
+        await donation_ingest.stop()
+    stats = donation_ingest.stats()
+
+    print(f"per-request commit {count / per_request:10.0f} donations/s")
+    print(f"write-behind       {count / batched:10.0f} donations/s")
+    print(f"speedup            {per_request / batched:10.1f}x")
+    print(f"batches            {stats['batches']:10}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n", maxsplit=1)[0].strip())
+    parser.add_argument("--count", type=int, default=2000, help="donations per run")
+    parser.add_argument("--concurrency", type=int, default=100, help="requests in flight")
+    args = parser.parse_args()
+
+    reset_database()
+    with TestClient(app) as client:
+        admin = create_admin(client)
+        donation = {"cause_id": create_cause(client, admin)["id"]}
+    asyncio.run(run(args.count, args.concurrency, admin["headers"], donation))
+
+
+if __name__ == "__main__":
+    main()
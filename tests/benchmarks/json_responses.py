@@ -0,0 +1,89 @@
+"""
+Serialization of a page of causes by FastAPI's default path and by `json_response`.
+
+    python -m tests.benchmarks.json_responses [--causes 10000] [--repeat 20]
+
+A `CausesList` of already validated causes is turned into a response body:
+
+- as FastAPI does for a returned value: validated again against the route's
+  `response_model`, converted by `jsonable_encoder` and encoded with the stdlib
+  `json` (`JSONResponse`) or with orjson (`ORJSONResponse`, the app's default);
+- by `json_response`, with the pre-built `CAUSES_LIST_ADAPTER`.
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from app.infra.http.responses import json_response
+from app.modules.cause.schemas import CAUSES_LIST_ADAPTER, CauseSchema, CausesList
+
+
+def causes_list(count: int) -> CausesList:
+    return CausesList(
+        causes=[
+            CauseSchema(
+                id=number,
+                title=f"Cause {number}",
+                description="A cause description of a realistic length, about one sentence.",
+                payment_link=f"https://pay.example.com/{number}",
+                image_links=[f"https://images.example.com/{number}.png"],
+                institute_id=number % 100,
+                is_active=True,
+                donations_count=number,
+                paid_donations_count=number // 2,
+            )
+            for number in range(count)
+        ],
+        next_cursor="eyJ2IjpbIjIwMjQtMDEtMDEiLDEwMDAwXX0",
+    )
+
+
+def best_of(repeat: int, serialize) -> float:
+    """
+    Returns the fastest of `repeat` runs of `serialize`, in seconds.
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        serialize()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n", maxsplit=1)[0].strip())
+    parser.add_argument("--causes", type=int, default=10000, help="causes in the page")
+    parser.add_argument("--repeat", type=int, default=20, help="runs of each path")
+    args = parser.parse_args()
+
+    page = causes_list(args.causes)
+    field = create_response_field(name="Response_list_causes", type_=CausesList)
+
+    def fastapi_default(response_class):
+        content = asyncio.run(serialize_response(field=field, response_content=page))
+        return response_class(content).body
+
+    bodies = {
+        "FastAPI + JSONResponse": lambda: fastapi_default(JSONResponse),
+        "FastAPI + ORJSONResponse": lambda: fastapi_default(ORJSONResponse),
+        "json_response": lambda: json_response(CAUSES_LIST_ADAPTER, page).body,
+    }
+    # Every path must produce the same document
+    documents = [json.loads(serialize()) for serialize in bodies.values()]
+    assert all(document == documents[0] for document in documents)
+
+    baseline = None
+    for name, serialize in bodies.items():
+        seconds = best_of(args.repeat, serialize)
+        baseline = baseline or seconds
+        print(f"{name:26} {seconds * 1000:8.1f} ms  {baseline / seconds:5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
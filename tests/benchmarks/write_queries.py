@@ -0,0 +1,131 @@
+"""
+Statements sent to the database by each write endpoint.
+
+    python -m tests.benchmarks.write_queries [--verbose]
+
+Each write runs once, in process through a TestClient, against the test database
+of `tests.support`; user creation has no endpoint of its own (it happens at sign
+in), so it is measured on the repository.
+
+Counts are printed next to those of the load -> mutate -> commit -> refresh path
+the writes used before they were turned into INSERT/UPDATE ... RETURNING, as
+measured by this script on SQLite, and must not exceed them. The cause writes
+also bump the causes version and the donation writes upsert a counter row, so
+they send one statement more than the write itself.
+"""
+
+import argparse
+
+from tests.support import (  # isort: split
+    count_statements,
+    create_admin,
+    create_cause,
+    create_user,
+    reset_database,
+)
+
+from fastapi.testclient import TestClient
+
+from app.infra.db.database import SessionLocal
+from app.main import app
+from app.modules.user.repository import UserRepository
+from app.modules.user.schemas import UserCreate
+
+# Statements of each write with the load -> mutate -> commit -> refresh path
+BASELINE_STATEMENTS = {
+    "POST /causes/": 4,
+    "PUT /causes/{id}": 3,
+    "PUT /causes/activate/{id}": 3,
+    "POST /donation/": 3,
+    "PUT /donation/{id}": 4,
+    "PUT /user/{id}": 3,
+    "PUT /institutes/{id}": 5,
+    "UserRepository.create_user": 3,
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n", maxsplit=1)[0].strip())
+    parser.add_argument("--verbose", action="store_true", help="print the statements")
+    args = parser.parse_args()
+
+    reset_database()
+    with TestClient(app) as client:
+        admin = create_admin(client)
+        headers = admin["headers"]
+        cause_id = create_cause(client, admin)["id"]
+        donor = create_user("donor@example.com")
+        donation_id = client.post(
+            "/donation/", headers=donor["headers"], json={"cause_id": cause_id}
+        ).json()["id"]
+
+        def create_user_in_repository():
+            with SessionLocal() as db:
+                UserRepository(db).create_user(
+                    UserCreate(email="new@example.com", first_name="New", last_name="User")
+                )
+
+        writes = [
+            (
+                "POST /causes/",
+                lambda: client.post(
+                    "/causes/",
+                    headers=headers,
+                    json={
+                        "title": "Another cause",
+                        "description": "Description",
+                        "payment_link": "https://pay.example.com",
+                        "institute_id": admin["institute_id"],
+                    },
+                ),
+            ),
+            (
+                "PUT /causes/{id}",
+                lambda: client.put(f"/causes/{cause_id}", headers=headers, json={"title": "New"}),
+            ),
+            (
+                "PUT /causes/activate/{id}",
+                lambda: client.put(f"/causes/activate/{cause_id}", headers=headers),
+            ),
+            (
+                "POST /donation/",
+                lambda: client.post(
+                    "/donation/", headers=donor["headers"], json={"cause_id": cause_id}
+                ),
+            ),
+            (
+                "PUT /donation/{id}",
+                lambda: client.put(
+                    f"/donation/{donation_id}", headers=donor["headers"], json={"is_paid": True}
+                ),
+            ),
+            (
+                "PUT /user/{id}",
+                lambda: client.put(
+                    f"/user/{donor['id']}", headers=headers, json={"first_name": "Renamed"}
+                ),
+            ),
+            (
+                "PUT /institutes/{id}",
+                lambda: client.put(
+                    f"/institutes/{admin['institute_id']}", headers=headers, json={"name": "New"}
+                ),
+            ),
+            ("UserRepository.create_user", create_user_in_repository),
+        ]
+
+        for name, write in writes:
+            with count_statements() as statements:
+                response = write()
+            if response is not None:
+                assert response.status_code == 200, f"{name}: {response.text}"
+            baseline = BASELINE_STATEMENTS[name]
+            print(f"{name:30} {baseline:3} -> {len(statements):3} statements")
+            assert len(statements) <= baseline, f"{name}: more statements than the baseline"
+            if args.verbose:
+                for statement in statements:
+                    print(f"    {' '.join(statement.split())[:120]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Fixtures of the test suite.
+
+Every test using `client` or `database` starts from empty tables and caches.
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+# The test environment is set before the application is imported
+from tests.support import create_admin, create_cause, reset_database  # isort: split
+
+from app.main import app
+
+
+@pytest.fixture
+def database():
+    """
+    Empty tables and caches.
+    """
+    reset_database()
+
+
+@pytest.fixture
+def client(database):
+    """
+    A client of the application, started up and shut down around the test.
+    """
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def admin(client):
+    """
+    A user administering an institute, created through the API.
+
+    Returns
+    -------
+    dict
+        The user's `id` and `headers`, and the `institute_id`.
+    """
+    return create_admin(client)
+
+
+@pytest.fixture
+def cause(client, admin):
+    """
+    A cause of the admin's institute.
+    """
+    return create_cause(client, admin)
@@ -0,0 +1,156 @@
+"""
+Environment and helpers shared by the tests and the benchmarks.
+
+The application reads its configuration when it is imported, so this module sets
+the test configuration before importing anything from `app`: a throwaway SQLite
+database (or TEST_DATABASE_URL), no replicas, session tokens for authentication
+and the in-process cache. Values of the developer's environment or `.env` are
+overridden, so the suite never touches a real database.
+"""
+
+import os
+import tempfile
+
+TEST_DATABASE_DIR = tempfile.mkdtemp(prefix="api-donation-tests-")
+
+os.environ.update(
+    {
+        "DATABASE_URL": os.getenv("TEST_DATABASE_URL")
+        or f"sqlite:///{TEST_DATABASE_DIR}/test.db",
+        "DATABASE_REPLICA_URLS": "",
+        "DB_MODE": "sync",
+        "LOGGER_TOKEN": "test",
+        "ALLOWED_ORIGINS": "http://localhost:3000",
+        "GOOGLE_CLIENT_ID": "test-client-id",
+        "GOOGLE_CLIENT_SECRET": "test-client-secret",
+        "GOOGLE_REDIRECT_URI": "http://localhost:8000/auth/google",
+        "AUTH_MODE": "session",
+        "SESSION_SECRET": "test-session-secret",
+        "CACHE_BACKEND": "memory",
+        "DONATION_INGEST_ENABLED": "false",
+        "INTERNAL_STATS_ENABLED": "true",
+        "COMPRESSION_ENABLED": "true",
+    }
+)
+
+# pylint: disable=wrong-import-position
+from contextlib import contextmanager
+from typing import Iterator, List, Optional
+
+from fastapi.testclient import TestClient
+from logtail import LogtailHandler
+from sqlalchemy import event
+
+# Registers every model on Base
+import app.infra.db.models
+from app.infra.cache.cache import cache
+from app.infra.db.database import Base, SessionLocal, engine
+from app.infra.logger.config import logger
+from app.modules.auth.cache import token_cache
+from app.modules.auth.session import session_tokens
+from app.modules.user.models import User
+from app.modules.user.principal import principal_cache
+
+# Logs stay local during the tests
+logger.handlers = [
+    handler for handler in logger.handlers if not isinstance(handler, LogtailHandler)
+]
+
+
+def reset_database() -> None:
+    """
+    Recreates every table and empties the in-process caches.
+    """
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    cache.clear()
+    token_cache.clear()
+    principal_cache.clear()
+
+
+def create_user(email: str, institute_id: Optional[int] = None) -> dict:
+    """
+    Inserts a user.
+
+    Returns
+    -------
+    dict
+        The `id` of the user and the `headers` authenticating requests as them.
+    """
+    with SessionLocal() as db:
+        user = User(email=email, first_name="Test", last_name="User", institute_id=institute_id)
+        db.add(user)
+        db.commit()
+        token = session_tokens.issue(user)["session_token"]
+        return {"id": user.id, "headers": {"token": f"Bearer {token}"}}
+
+
+def create_admin(client: TestClient, email: str = "admin@example.com") -> dict:
+    """
+    Creates a user and, through the API, an institute they administer.
+
+    Returns
+    -------
+    dict
+        The user's `id` and `headers`, and the `institute_id`.
+    """
+    user = create_user(email)
+    response = client.post(
+        "/institutes/",
+        headers=user["headers"],
+        json={
+            "name": "Institute",
+            "email": "institute@example.com",
+            "cnpj": "1",
+            "is_active": True,
+        },
+    )
+    assert response.status_code == 200, response.text
+    # Becoming an admin evicts the cached principal; load it again
+    client.get("/user/data/me", headers=user["headers"])
+    return {**user, "institute_id": response.json()["id"]}
+
+
+def create_cause(client: TestClient, admin: dict, title: str = "Cause") -> dict:
+    """
+    Creates a cause of the admin's institute through the API.
+
+    Returns
+    -------
+    dict
+        The cause, as returned by the API.
+    """
+    response = client.post(
+        "/causes/",
+        headers=admin["headers"],
+        json={
+            "title": title,
+            "description": "Description",
+            "payment_link": "https://pay.example.com",
+            "institute_id": admin["institute_id"],
+        },
+    )
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+@contextmanager
+def count_statements() -> Iterator[List[str]]:
+    """
+    Collects the SQL statements sent to the primary database within the block.
+
+    Yields
+    ------
+    list[str]
+        The statements, filled in as they are executed.
+    """
+    executed: List[str] = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield executed
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
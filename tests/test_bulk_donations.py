@@ -0,0 +1,55 @@
+"""
+Batched donation creation through POST /donation/bulk.
+"""
+
+import pytest
+
+from app.config.env_variables import DONATION_BULK_MAX_ITEMS
+from app.infra.db.database import engine
+from tests.support import count_statements
+
+
+def test_valid_items_are_created_in_request_order(client, admin, cause):
+    items = [{"cause_id": cause["id"]}] * 50
+
+    response = client.post("/donation/bulk", headers=admin["headers"], json=items)
+
+    assert response.status_code == 200
+    created = response.json()["created"]
+    assert len(created) == 50
+    assert [donation["id"] for donation in created] == sorted(d["id"] for d in created)
+    assert {donation["cause_id"] for donation in created} == {cause["id"]}
+
+
+# SQLite has no implicit sentinel to match RETURNING rows to parameters, so
+# SQLAlchemy sends it one INSERT per row to keep the request order
+@pytest.mark.skipif(engine.dialect.name != "postgresql", reason="batches on Postgres only")
+def test_items_are_inserted_in_one_statement(client, admin, cause):
+    items = [{"cause_id": cause["id"]}] * 50
+
+    with count_statements() as statements:
+        response = client.post("/donation/bulk", headers=admin["headers"], json=items)
+
+    assert response.status_code == 200
+    assert sum(statement.startswith("INSERT INTO donations") for statement in statements) == 1
+
+
+def test_invalid_items_are_reported_by_index(client, admin, cause):
+    items = [{"cause_id": cause["id"]}, {"cause_id": "x"}, {}, {"cause_id": cause["id"] + 1}]
+
+    response = client.post("/donation/bulk", headers=admin["headers"], json=items)
+
+    assert response.status_code == 200
+    body = response.json()
+    assert len(body["created"]) == 1
+    assert [error["index"] for error in body["errors"]] == [1, 2, 3]
+    assert body["errors"][2]["errors"] == ["Cause not found"]
+
+
+def test_batches_over_the_cap_are_rejected(client, admin, cause):
+    items = [{"cause_id": cause["id"]}] * (DONATION_BULK_MAX_ITEMS + 1)
+
+    response = client.post("/donation/bulk", headers=admin["headers"], json=items)
+
+    assert response.status_code == 400
+    assert client.get("/donation/", headers=admin["headers"]).json()["donations"] == []
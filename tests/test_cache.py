@@ -0,0 +1,165 @@
+"""
+Read-through cache: storage backends, tag invalidation and backend failures.
+"""
+
+import asyncio
+
+import fakeredis
+import pytest
+from sqlalchemy.util import greenlet_spawn
+
+from app.infra.cache.backends import MemoryBackend, RedisBackend
+from app.infra.cache.cache import Cache
+
+
+class Counted:
+    """
+    A value computed by counting the calls.
+    """
+
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def __call__(self) -> int:
+        self.calls += 1
+        return self.calls
+
+
+class UnreachableBackend:
+    """
+    A backend whose server is down.
+    """
+
+    def __getattr__(self, name):
+        def fail(*args, **kwargs):
+            raise ConnectionRefusedError("Connection refused")
+
+        return fail
+
+
+@pytest.fixture
+def cache():
+    return Cache(MemoryBackend(max_size=100), prefix="test", ttl=60, beta=0)
+
+
+def test_values_are_computed_once(cache):
+    compute = Counted()
+
+    assert cache.get_or_set("cause", 1, compute) == 1
+    assert cache.get_or_set("cause", 1, compute) == 1
+    assert cache.get_or_set("cause", 2, compute) == 2
+    assert cache.stats()["hits"] == 1
+
+
+def test_invalidating_a_tag_drops_the_values_carrying_it(cache):
+    one, two = Counted(), Counted()
+    cache.get_or_set("cause", 1, one, tags=("causes", "cause:1"))
+    cache.get_or_set("cause", 2, two, tags=("causes", "cause:2"))
+
+    cache.invalidate("cause:1")
+
+    assert cache.get_or_set("cause", 1, one, tags=("causes", "cause:1")) == 2
+    assert cache.get_or_set("cause", 2, two, tags=("causes", "cause:2")) == 1
+
+    cache.invalidate("causes")
+
+    assert cache.get_or_set("cause", 2, two, tags=("causes", "cause:2")) == 2
+
+
+def test_async_misses_of_a_key_are_computed_once(cache):
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "value"
+
+    async def read_many():
+        return await asyncio.gather(*(cache.aget_or_set("cause", 1, compute) for _ in range(5)))
+
+    assert asyncio.run(read_many()) == ["value"] * 5
+    assert len(calls) == 1
+
+
+def test_memory_backend_evicts_the_least_recently_used_entries():
+    backend = MemoryBackend(max_size=2)
+    backend.set("a", 1)
+    backend.set("b", 2)
+    backend.get_many(["a"])
+    backend.set("c", 3)
+
+    assert backend.get_many(["a", "b", "c"]) == [1, None, 3]
+    assert backend.stats()["evictions"] == 1
+
+
+def test_memory_backend_expires_entries():
+    backend = MemoryBackend(max_size=2)
+    backend.set("a", 1, ttl=-1)
+
+    assert backend.get_many(["a"]) == [None]
+    assert backend.add("a", 2)
+    assert not backend.add("a", 3)
+
+
+def test_unreachable_backend_falls_back_to_computing():
+    cache = Cache(UnreachableBackend(), prefix="test")
+    compute = Counted()
+
+    assert cache.get_or_set("cause", 1, compute, tags=("causes",)) == 1
+    assert cache.get_or_set("cause", 1, compute, tags=("causes",)) == 2
+    assert asyncio.run(cache.aget_or_set("cause", 1, lambda: asyncio.sleep(0, 3))) == 3
+    cache.invalidate("causes")
+    assert cache.errors == 4
+
+
+def test_errors_of_the_computation_are_not_swallowed(cache):
+    def fail():
+        raise ValueError("Cause not found")
+
+    with pytest.raises(ValueError):
+        cache.get_or_set("cause", 1, fail)
+    assert cache.stats()["errors"] == 0
+
+
+@pytest.fixture
+def redis_backend():
+    server = fakeredis.FakeServer()
+    return RedisBackend(
+        fakeredis.FakeRedis(server=server), fakeredis.aioredis.FakeRedis(server=server)
+    )
+
+
+def test_redis_backend_stores_values(redis_backend):
+    redis_backend.set("a", {"title": "Cause"}, ttl=60)
+    redis_backend.set_many({"b": 2, "c": 3})
+
+    assert redis_backend.get_many(["a", "b", "missing"]) == [{"title": "Cause"}, 2, None]
+    assert not redis_backend.add("b", 4)
+
+    redis_backend.delete(["b"])
+    redis_backend.clear("c")
+
+    assert redis_backend.get_many(["a", "b", "c"]) == [{"title": "Cause"}, None, None]
+
+
+def test_redis_backend_is_shared_by_the_sync_and_async_clients(redis_backend):
+    async def run():
+        await redis_backend.aset("a", 1)
+        # Sync calls made from a greenlet, as in AsyncSession.run_sync, go through the
+        # async client
+        await greenlet_spawn(redis_backend.set, "b", 2)
+        return await redis_backend.aget_many(["a", "b"])
+
+    assert asyncio.run(run()) == [1, 2]
+    assert redis_backend.get_many(["a", "b"]) == [1, 2]
+
+
+def test_cache_over_redis_invalidates_tags(redis_backend):
+    cache = Cache(redis_backend, prefix="test", beta=0)
+    compute = Counted()
+
+    cache.get_or_set("cause", 1, compute, tags=("cause:1",))
+    cache.invalidate("cause:1")
+
+    assert cache.get_or_set("cause", 1, compute, tags=("cause:1",)) == 2
+    assert cache.get_or_set("cause", 1, compute, tags=("cause:1",)) == 2
@@ -0,0 +1,87 @@
+"""
+Incremental parsing of cause import uploads.
+"""
+
+import asyncio
+
+import pytest
+
+from app.modules.cause.importer import iter_csv_records, iter_import_rows
+
+
+async def chunks(body: bytes, size: int):
+    for start in range(0, len(body), size):
+        yield body[start : start + size]
+
+
+def parse(body: str, content_type: str = "text/csv", size: int = 7) -> list:
+    async def collect():
+        return [row async for row in iter_import_rows(chunks(body.encode(), size), content_type)]
+
+    return asyncio.run(collect())
+
+
+def test_csv_records_are_parsed_across_chunks():
+    rows = parse(
+        "title,description,payment_link,image_links\r\n"
+        'First,"Spans\n""two"" lines",https://pay.example.com,https://a.png https://b.png\r\n'
+        "\r\n"
+        "Second,Plain,https://pay.example.com,\r\n"
+    )
+
+    assert [(line, cause.title) for line, cause, _ in rows] == [(2, "First"), (5, "Second")]
+    assert rows[0][1].description == 'Spans\n"two" lines'
+    assert rows[0][1].image_links == ["https://a.png", "https://b.png"]
+
+
+def test_invalid_csv_rows_are_reported_by_line():
+    rows = parse("title,description\nNo payment link,Description\n")
+
+    assert rows[0][0] == 2
+    assert rows[0][1] is None
+    assert rows[0][2][0]["loc"] == ("payment_link",)
+
+
+def test_unterminated_quote_ends_the_last_record():
+    rows = parse('title,payment_link\n"Open quote,https://pay.example.com')
+
+    # The rest of the upload is one quoted field, so the row misses its payment link
+    assert len(rows) == 1
+    assert rows[0][0] == 2
+    assert rows[0][2][0]["loc"] == ("payment_link",)
+
+
+def test_ndjson_rows_are_parsed_and_rejected_per_line():
+    rows = parse(
+        '{"title": "First", "payment_link": "https://pay.example.com"}\n\nnot json\n',
+        content_type="application/x-ndjson; charset=utf-8",
+    )
+
+    assert rows[0][0] == 1
+    assert rows[0][1].title == "First"
+    assert rows[1][0] == 3
+    assert rows[1][1] is None
+
+
+def test_long_lines_are_joined_across_chunks():
+    description = "x" * 5000
+    rows = parse(f"title,description,payment_link\nLong,{description},https://pay.example.com\n")
+
+    assert rows[0][1].description == description
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        "title,payment_link\n" + "x" * 100 + "\n",
+        "title,payment_link\n" + "x" * 100,
+        'title,payment_link\n"' + "x\n" * 60 + '",https://pay.example.com\n',
+    ],
+)
+def test_lines_and_records_longer_than_the_limit_are_rejected(body):
+    async def collect():
+        stream = chunks(body.encode(), 7)
+        return [record async for record in iter_csv_records(stream, max_length=64)]
+
+    with pytest.raises(ValueError):
+        asyncio.run(collect())
@@ -0,0 +1,97 @@
+"""
+Query plans of the keyset-paginated cause listing.
+
+A page after the first is read with `EXPLAIN QUERY PLAN`: the causes must be
+searched through the index matching the filters, already in the order of the
+cursor, so a page never scans or sorts the table.
+"""
+
+import pytest
+from sqlalchemy import event
+
+from app.infra.db.database import SessionLocal, engine
+from app.infra.db.models import Cause, Institute
+from app.modules.cause.repository import CauseRepository
+from app.modules.cause.schemas import CauseFilters
+
+pytestmark = pytest.mark.skipif(
+    engine.dialect.name != "sqlite", reason="reads SQLite query plans"
+)
+
+
+@pytest.fixture
+def institute_id(database):
+    """
+    An institute with a few active causes.
+    """
+    with SessionLocal() as db:
+        institute = Institute(name="Institute", email="i@example.com", cnpj="1", is_active=True)
+        db.add(institute)
+        db.flush()
+        db.add_all(
+            Cause(
+                title=f"Cause {number}",
+                description="Description",
+                payment_link="https://pay.example.com",
+                is_active=True,
+                institute_id=institute.id,
+            )
+            for number in range(3)
+        )
+        db.commit()
+        return institute.id
+
+
+def second_page_plan(filters: CauseFilters) -> list:
+    """
+    Lists a first page of one cause, then returns the plan of the query reading the
+    next page.
+    """
+    executed = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        executed.append((statement, parameters))
+
+    with SessionLocal() as db:
+        causes = CauseRepository(db)
+        first = causes.list_causes(limit=1, filters=filters)
+        assert first.next_cursor is not None
+
+        event.listen(engine, "before_cursor_execute", before_cursor_execute)
+        try:
+            causes.list_causes(cursor=first.next_cursor, limit=1, filters=filters)
+        finally:
+            event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+    statement, parameters = executed[0]
+    with engine.connect() as connection:
+        rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+        return [row[-1] for row in rows]
+
+
+@pytest.mark.parametrize(
+    "by_institute, filters, index",
+    [
+        (False, {}, "ix_causes_created_at_id (created_at>?)"),
+        (False, {"sort": "-created_at"}, "ix_causes_created_at_id (created_at<?)"),
+        (
+            True,
+            {"is_active": True},
+            "ix_causes_institute_active_created (institute_id=? AND is_active=? AND created_at>?)",
+        ),
+        (
+            False,
+            {"is_active": True, "sort": "-created_at"},
+            "ix_causes_active_created (is_active=? AND created_at<?)",
+        ),
+    ],
+)
+def test_next_page_is_an_index_range_search(institute_id, by_institute, filters, index):
+    if by_institute:
+        filters = {**filters, "institute_id": institute_id}
+
+    plan = second_page_plan(CauseFilters(**filters))
+
+    assert f"SEARCH causes USING INDEX {index}" in plan
+    assert not any(step.startswith("SCAN causes") for step in plan)
+    assert not any("TEMP B-TREE" in step for step in plan)
@@ -0,0 +1,87 @@
+"""
+Statements sent to the database by the mutating cause endpoints.
+
+Authorization is checked in the same statement that writes or fetches the cause,
+so each endpoint costs a fixed, small number of statements, whatever the number
+of admins of the institute.
+"""
+
+import pytest
+
+from tests.support import count_statements, create_user
+
+
+def authorizations(statements: list) -> list:
+    return [statement for statement in statements if "FROM users" in statement]
+
+
+def cause_reads(statements: list) -> list:
+    return [s for s in statements if s.startswith("SELECT") and "FROM causes" in s]
+
+
+def test_create_is_one_guarded_insert(client, admin):
+    with count_statements() as statements:
+        response = client.post(
+            "/causes/",
+            headers=admin["headers"],
+            json={
+                "title": "Another cause",
+                "description": "Description",
+                "payment_link": "https://pay.example.com",
+                "institute_id": admin["institute_id"],
+            },
+        )
+
+    assert response.status_code == 200
+    # INSERT ... SELECT ... WHERE EXISTS (admin) AND NOT EXISTS (title), then the version
+    # bump of the causes table
+    assert len(statements) == 2
+    assert statements[0].startswith("INSERT INTO causes")
+    assert len(authorizations(statements)) == 1
+
+
+@pytest.mark.parametrize(
+    "method, path, body",
+    [
+        ("PUT", "/causes/{id}", {"title": "New title"}),
+        ("PUT", "/causes/activate/{id}", None),
+    ],
+)
+def test_update_and_toggle_are_one_guarded_update(client, admin, cause, method, path, body):
+    with count_statements() as statements:
+        response = client.request(
+            method, path.format(id=cause["id"]), headers=admin["headers"], json=body
+        )
+
+    assert response.status_code == 200
+    # UPDATE ... WHERE EXISTS (admin) RETURNING, then the version bump
+    assert len(statements) == 2
+    assert statements[0].startswith("UPDATE causes")
+    assert len(authorizations(statements)) == 1
+
+
+def test_delete_fetches_and_authorizes_in_one_query(client, admin, cause):
+    with count_statements() as statements:
+        response = client.delete(f"/causes/{cause['id']}", headers=admin["headers"])
+
+    assert response.status_code == 200
+    # The cause with the admin check, the version bump, the donations the ORM detaches
+    # from the cause, and the DELETE
+    assert len(statements) == 4
+    assert len(authorizations(statements)) == 1
+    assert len(cause_reads(statements)) == 1
+
+
+def test_denied_update_costs_one_more_query(client, cause):
+    outsider = create_user("outsider@example.com")
+    client.get("/user/data/me", headers=outsider["headers"])
+
+    with count_statements() as statements:
+        response = client.put(
+            f"/causes/{cause['id']}", headers=outsider["headers"], json={"title": "Hijacked"}
+        )
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "User not allowed"
+    # The UPDATE matching no row, then the lookup telling why
+    assert len(statements) == 2
@@ -0,0 +1,179 @@
+"""
+Compression of the response bodies: negotiation, thresholds, streaming and ETags.
+"""
+
+import csv
+import io
+import zlib
+
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import Response, StreamingResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from app.infra.http import compression
+from app.infra.http.compression import (
+    CompressionConfig,
+    CompressionMiddleware,
+    negotiate,
+)
+from tests.support import create_cause
+
+BODY = b'{"title": "Cause"}' * 200
+
+
+def page(request):
+    return Response(BODY, media_type="application/json", headers={"ETag": '"page"'})
+
+
+def small(request):
+    return Response(b'{"title": "Cause"}', media_type="application/json")
+
+
+def image(request):
+    return Response(BODY, media_type="image/png")
+
+
+def stream(request):
+    async def rows():
+        for number in range(3):
+            yield f"{number},Cause {number}\n".encode()
+
+    return StreamingResponse(rows(), media_type="text/csv")
+
+
+@pytest.fixture
+def middleware_client():
+    app = Starlette(
+        routes=[
+            Route("/page", page),
+            Route("/small", small),
+            Route("/image", image),
+            Route("/stream", stream),
+        ]
+    )
+    app.add_middleware(CompressionMiddleware, config=CompressionConfig(minimum_size=1024))
+    return TestClient(app)
+
+
+def get(client, path: str, encoding: str = "gzip"):
+    return client.get(path, headers={"Accept-Encoding": encoding})
+
+
+@pytest.mark.parametrize(
+    ("accept_encoding", "expected"),
+    [
+        ("gzip, deflate, br", "br"),
+        ("gzip;q=1.0, br;q=0.5", "gzip"),
+        ("br;q=0, gzip;q=0", None),
+        ("*", "br"),
+        ("identity", None),
+        ("gzip;q=x, br", "br"),
+    ],
+)
+def test_negotiation_follows_the_q_values(accept_encoding, expected):
+    assert negotiate(accept_encoding, ("br", "gzip")) == expected
+
+
+def test_bodies_are_compressed_with_gzip(middleware_client):
+    response = get(middleware_client, "/page")
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert int(response.headers["content-length"]) < len(BODY)
+    assert response.content == BODY
+
+
+def test_bodies_are_compressed_with_brotli(middleware_client):
+    response = get(middleware_client, "/page", "gzip, br")
+
+    assert response.headers["content-encoding"] == "br"
+    assert response.content == BODY
+
+
+def test_bodies_are_sent_as_is_without_accept_encoding(middleware_client):
+    response = get(middleware_client, "/page", "identity")
+
+    assert "content-encoding" not in response.headers
+    assert response.headers["etag"] == '"page"'
+    assert response.content == BODY
+
+
+def test_small_bodies_and_binary_types_are_sent_as_is(middleware_client):
+    response = get(middleware_client, "/small")
+    assert "content-encoding" not in response.headers
+    assert response.headers["vary"] == "Accept-Encoding"
+
+    response = get(middleware_client, "/image")
+    assert "content-encoding" not in response.headers
+    assert "vary" not in response.headers
+
+
+def test_streaming_bodies_are_compressed_chunk_by_chunk(middleware_client):
+    with middleware_client.stream(
+        "GET", "/stream", headers={"Accept-Encoding": "gzip"}
+    ) as response:
+        raw = b"".join(response.iter_raw())
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    assert zlib.decompress(raw, 31) == b"0,Cause 0\n1,Cause 1\n2,Cause 2\n"
+
+
+def test_compressed_etags_are_weak_and_bodies_reused(middleware_client, monkeypatch):
+    metrics = compression.CompressionMetrics()
+    monkeypatch.setattr(compression, "compression_metrics", metrics)
+
+    first = get(middleware_client, "/page")
+    second = get(middleware_client, "/page")
+
+    assert first.headers["etag"] == second.headers["etag"] == 'W/"page"'
+    assert second.content == BODY
+    assert sum(route["cache_hits"] for route in metrics.snapshot().values()) == 1
+
+
+def test_compressed_body_cache_is_bounded_and_checked():
+    cache = compression.CompressedBodyCache(max_bytes=10)
+    cache.set("a", b"body a", b"12345")
+    cache.set("b", b"body b", b"12345")
+    cache.set("c", b"body c", b"12345")
+
+    assert cache.get("a", b"body a") is None
+    assert cache.get("b", b"body b") == b"12345"
+    # Same key, different body: compressed again rather than served stale
+    assert cache.get("b", b"body B") is None
+    assert cache.size == 10
+
+
+def test_csv_export_is_streamed_compressed(client, admin, cause):
+    client.post("/donation/bulk", headers=admin["headers"], json=[{"cause_id": cause["id"]}] * 3)
+
+    response = client.get(
+        "/donation/export",
+        headers={**admin["headers"], "Accept-Encoding": "gzip"},
+        params={"institute_id": admin["institute_id"]},
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert len(list(csv.DictReader(io.StringIO(response.text)))) == 3
+
+
+def test_not_modified_matches_the_weak_etag(client, admin, cause):
+    # Enough causes for the list to be compressed
+    for number in range(10):
+        create_cause(client, admin, f"Cause {number}")
+    headers = {**admin["headers"], "Accept-Encoding": "gzip"}
+
+    response = client.get("/causes/", headers=headers)
+    etag = response.headers["etag"]
+    assert response.headers["content-encoding"] == "gzip"
+    assert etag.startswith('W/"')
+
+    not_modified = client.get("/causes/", headers={**headers, "If-None-Match": etag})
+    assert not_modified.status_code == 304
+    assert not_modified.headers["etag"] == etag
+    # The identity representation revalidates against the same ETag
+    identity = client.get("/causes/", headers={**admin["headers"], "If-None-Match": etag[2:]})
+    assert identity.status_code == 304
@@ -0,0 +1,92 @@
+"""
+Conditional GET of causes: ETags, 304 Not Modified and revalidation after writes.
+"""
+
+from app.modules.cause import repository
+from tests.support import create_cause
+
+
+def revalidate(client, admin, path: str, etag: str):
+    return client.get(path, headers={**admin["headers"], "If-None-Match": etag})
+
+
+def test_unchanged_list_is_not_modified(client, admin, cause):
+    response = client.get("/causes/", headers=admin["headers"])
+    etag = response.headers["etag"]
+
+    assert response.status_code == 200
+    assert response.headers["cache-control"] == "private, no-cache"
+
+    not_modified = revalidate(client, admin, "/causes/", etag)
+    assert not_modified.status_code == 304
+    assert not_modified.headers["etag"] == etag
+    assert not_modified.content == b""
+
+
+def test_list_etag_depends_on_the_query(client, admin, cause):
+    etag = client.get("/causes/", headers=admin["headers"]).headers["etag"]
+
+    response = revalidate(client, admin, "/causes/?is_active=true", etag)
+
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+
+def test_list_changes_after_a_cause_is_created(client, admin, cause):
+    etag = client.get("/causes/", headers=admin["headers"]).headers["etag"]
+    create_cause(client, admin, "Another cause")
+
+    response = revalidate(client, admin, "/causes/", etag)
+
+    assert response.status_code == 200
+    assert len(response.json()["causes"]) == 2
+
+
+def test_list_changes_after_an_import(client, admin, cause):
+    etag = client.get("/causes/", headers=admin["headers"]).headers["etag"]
+
+    imported = client.post(
+        "/causes/import",
+        headers={**admin["headers"], "Content-Type": "text/csv"},
+        params={"institute_id": admin["institute_id"]},
+        content="title,payment_link\nImported,https://pay.example.com\n",
+    )
+    assert imported.json()["created"] == 1
+
+    response = revalidate(client, admin, "/causes/", etag)
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert [cause["title"] for cause in response.json()["causes"]] == ["Cause", "Imported"]
+
+
+def test_unchanged_cause_is_not_modified_until_updated(client, admin, cause):
+    path = f"/causes/{cause['id']}"
+    etag = client.get(path, headers=admin["headers"]).headers["etag"]
+
+    assert revalidate(client, admin, path, etag).status_code == 304
+
+    client.put(path, headers=admin["headers"], json={"title": "New title"})
+    response = revalidate(client, admin, path, etag)
+
+    assert response.status_code == 200
+    assert response.json()["title"] == "New title"
+
+
+def test_donations_refresh_the_cause_but_not_the_list(client, admin, cause, monkeypatch):
+    path = f"/causes/{cause['id']}"
+    list_etag = client.get("/causes/", headers=admin["headers"]).headers["etag"]
+    cause_etag = client.get(path, headers=admin["headers"]).headers["etag"]
+
+    client.post("/donation/", headers=admin["headers"], json={"cause_id": cause["id"]})
+
+    response = revalidate(client, admin, path, cause_etag)
+    assert response.status_code == 200
+    assert response.json()["donations_count"] == 1
+    assert revalidate(client, admin, "/causes/", list_etag).status_code == 304
+
+    # The counts of the list are read again in the next period
+    period = repository.donation_counts_period()
+    monkeypatch.setattr(repository, "donation_counts_period", lambda: period + 1)
+    response = revalidate(client, admin, "/causes/", list_etag)
+    assert response.status_code == 200
+    assert response.json()["causes"][0]["donations_count"] == 1
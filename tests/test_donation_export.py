@@ -0,0 +1,71 @@
+"""
+Export of the donations of an institute.
+"""
+
+import csv
+import io
+
+import pyarrow.parquet as pq
+import pytest
+
+from tests.support import create_user
+
+
+@pytest.fixture
+def donations(client, admin, cause):
+    """
+    Three donations to the admin's cause.
+    """
+    response = client.post(
+        "/donation/bulk", headers=admin["headers"], json=[{"cause_id": cause["id"]}] * 3
+    )
+    assert response.status_code == 200, response.text
+    return response.json()["created"]
+
+
+def test_csv_export_holds_every_donation(client, admin, donations):
+    response = client.get(
+        "/donation/export",
+        headers=admin["headers"],
+        params={"institute_id": admin["institute_id"]},
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [int(row["donation_id"]) for row in rows] == [d["id"] for d in donations]
+    assert {row["institute_name"] for row in rows} == {"Institute"}
+
+
+def test_parquet_export_is_written_by_a_worker(client, admin, donations):
+    response = client.get(
+        "/donation/export",
+        headers=admin["headers"],
+        params={"institute_id": admin["institute_id"], "format": "parquet"},
+    )
+
+    assert response.status_code == 200
+    table = pq.read_table(io.BytesIO(response.content))
+    assert table.column("donation_id").to_pylist() == [d["id"] for d in donations]
+
+
+def test_unknown_format_is_rejected(client, admin):
+    response = client.get(
+        "/donation/export",
+        headers=admin["headers"],
+        params={"institute_id": admin["institute_id"], "format": "xlsx"},
+    )
+
+    assert response.status_code == 422
+
+
+def test_only_admins_of_the_institute_can_export(client, admin):
+    outsider = create_user("outsider@example.com")
+
+    response = client.get(
+        "/donation/export",
+        headers=outsider["headers"],
+        params={"institute_id": admin["institute_id"]},
+    )
+
+    assert response.status_code == 403
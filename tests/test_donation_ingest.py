@@ -0,0 +1,87 @@
+"""
+Write-behind ingestion of donation creates.
+"""
+
+import asyncio
+
+import pytest
+from sqlalchemy import func, select
+
+from app.infra.db.database import SessionLocal
+from app.infra.db.models import Donation
+from app.modules.donation.ingest import DonationIngestQueue
+from app.modules.donation.schemas import CreateDonation
+
+
+def donations_count() -> int:
+    with SessionLocal() as db:
+        return db.execute(select(func.count()).select_from(Donation)).scalar_one()
+
+
+def test_stop_drains_the_queue(admin, cause):
+    # Batches would wait for ten seconds; stopping writes them right away
+    queue = DonationIngestQueue(batch_size=4, flush_interval=10, max_pending=100)
+
+    async def run():
+        await queue.start()
+        submitted = [
+            asyncio.create_task(queue.submit(admin["id"], CreateDonation(cause_id=cause_id)))
+            for cause_id in [cause["id"]] * 10 + [cause["id"] + 1]
+        ]
+        await asyncio.sleep(0)
+        await queue.stop()
+        return await asyncio.gather(*submitted, return_exceptions=True)
+
+    results = asyncio.run(asyncio.wait_for(run(), timeout=5))
+
+    assert [donation.cause_id for donation in results[:10]] == [cause["id"]] * 10
+    assert isinstance(results[10], ValueError)
+    assert donations_count() == 10
+    assert queue.stats() == {
+        "submitted": 11,
+        "written": 10,
+        "rejected": 1,
+        "batches": 3,
+        "errors": 0,
+        "pending": 0,
+    }
+    assert not queue.running
+
+
+def test_failed_batch_fails_every_waiting_request(admin, cause):
+    queue = DonationIngestQueue(batch_size=10, flush_interval=0.01, max_pending=5)
+
+    async def failing_write(rows):
+        raise RuntimeError("database unavailable")
+
+    queue._write = failing_write
+
+    def submit_all():
+        return asyncio.gather(
+            *(queue.submit(admin["id"], CreateDonation(cause_id=cause["id"])) for _ in range(5)),
+            return_exceptions=True,
+        )
+
+    async def run():
+        await queue.start()
+        try:
+            failed = await submit_all()
+            # The slots of the failed batch were given back, so as many donations fit again
+            del queue._write
+            return failed, await submit_all()
+        finally:
+            await queue.stop()
+
+    failed, retried = asyncio.run(asyncio.wait_for(run(), timeout=5))
+
+    assert all(isinstance(result, RuntimeError) for result in failed)
+    assert all(donation.cause_id == cause["id"] for donation in retried)
+    assert queue.stats()["errors"] == 1
+    assert donations_count() == 5
+
+
+def test_submit_is_refused_when_the_queue_is_not_running(admin, cause):
+    queue = DonationIngestQueue(batch_size=10, flush_interval=0.01, max_pending=5)
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(queue.submit(admin["id"], CreateDonation(cause_id=cause["id"])))
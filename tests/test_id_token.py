@@ -0,0 +1,163 @@
+"""
+Local verification of Google ID tokens against a cached JWKS.
+"""
+
+import asyncio
+import json
+import time
+
+import httpx
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jose import jwk, jwt
+from jose.exceptions import JWTError
+
+from app.modules.auth.google.id_token import verify_id_token
+from app.modules.auth.google.jwks import JWKSCache
+
+AUDIENCE = "test-client-id"
+
+
+@pytest.fixture(scope="module")
+def signing_key():
+    """
+    A locally generated RSA key, as PEM, and its public JWK with kid "k1".
+    """
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    private_pem = key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    ).decode()
+    public_pem = key.public_key().public_bytes(
+        serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+    )
+    public_jwk = {
+        name: value.decode() if isinstance(value, bytes) else value
+        for name, value in jwk.construct(public_pem, "RS256").to_dict().items()
+    }
+    return private_pem, {**public_jwk, "kid": "k1", "alg": "RS256"}
+
+
+@pytest.fixture
+def jwks(signing_key, tmp_path):
+    """
+    A key set loaded from a local JWKS file.
+    """
+    path = tmp_path / "jwks.json"
+    path.write_text(json.dumps({"keys": [signing_key[1]]}))
+    key_set = JWKSCache(client=None, url="", path=str(path))
+    asyncio.run(key_set.refresh())
+    return key_set
+
+
+def sign(signing_key, kid="k1", **claims) -> str:
+    claims = {
+        "iss": "https://accounts.google.com",
+        "aud": AUDIENCE,
+        "exp": int(time.time()) + 60,
+        "email": "user@example.com",
+        "email_verified": True,
+        **claims,
+    }
+    return jwt.encode(claims, signing_key[0], algorithm="RS256", headers={"kid": kid})
+
+
+def test_valid_token_is_verified_locally(signing_key, jwks):
+    claims = verify_id_token(sign(signing_key), jwks=jwks, audience=AUDIENCE)
+
+    assert claims["email"] == "user@example.com"
+
+
+@pytest.mark.parametrize(
+    "claims",
+    [
+        {"aud": "another-client"},
+        {"iss": "https://evil.example.com"},
+        {"exp": int(time.time()) - 60},
+        {"email_verified": False},
+    ],
+)
+def test_invalid_claims_are_rejected(signing_key, jwks, claims):
+    with pytest.raises(JWTError):
+        verify_id_token(sign(signing_key, **claims), jwks=jwks, audience=AUDIENCE)
+
+
+def test_tampered_token_is_rejected(signing_key, jwks):
+    header, _, signature = sign(signing_key).split(".")
+    forged = sign(signing_key, email="admin@example.com").split(".")[1]
+
+    with pytest.raises(JWTError):
+        verify_id_token(f"{header}.{forged}.{signature}", jwks=jwks, audience=AUDIENCE)
+
+
+def test_unknown_key_is_rejected_and_asks_for_a_refresh(signing_key, jwks):
+    async def verify_rotated_key() -> bool:
+        # The event must be created inside the running loop on Python 3.9
+        jwks._wakeup = asyncio.Event()
+        jwks._last_refresh = 0.0
+
+        with pytest.raises(JWTError):
+            verify_id_token(sign(signing_key, kid="rotated"), jwks=jwks, audience=AUDIENCE)
+        return jwks._wakeup.is_set()
+
+    assert asyncio.run(verify_rotated_key())
+
+
+class StubClient:
+    """
+    Serves a JWKS response with the given headers.
+    """
+
+    def __init__(self, keys: list, headers: dict) -> None:
+        self.keys = keys
+        self.headers = headers
+        self.calls = 0
+
+    async def get(self, url: str) -> httpx.Response:
+        self.calls += 1
+        return httpx.Response(
+            200,
+            json={"keys": self.keys},
+            headers=self.headers,
+            request=httpx.Request("GET", url),
+        )
+
+
+@pytest.mark.parametrize(
+    "headers, expected",
+    [
+        ({"Cache-Control": "public, max-age=21600"}, 21600),
+        ({"Cache-Control": "public, max-age=21600", "Age": "600"}, 21000),
+        ({"Cache-Control": "max-age=5"}, 60),
+        ({"Cache-Control": "max-age=999999"}, 24 * 3600),
+        ({}, 60),
+    ],
+)
+def test_refresh_honors_the_cache_headers(signing_key, headers, expected):
+    client = StubClient([signing_key[1]], headers)
+    key_set = JWKSCache(client=client, url="https://www.googleapis.com/oauth2/v3/certs")
+
+    max_age = asyncio.run(key_set.refresh())
+
+    assert max_age == expected
+    assert key_set.get_key("k1") == signing_key[1]
+
+
+def test_refresh_uses_expires_without_max_age(signing_key):
+    expires = time.strftime("%a, %d %b %Y %H:%M:%S GMT", time.gmtime(time.time() + 3600))
+    key_set = JWKSCache(client=StubClient([signing_key[1]], {"Expires": expires}), url="x")
+
+    assert 3500 < asyncio.run(key_set.refresh()) <= 3600
+
+
+def test_verification_makes_no_network_call(signing_key):
+    client = StubClient([signing_key[1]], {"Cache-Control": "max-age=3600"})
+    key_set = JWKSCache(client=client, url="x")
+    asyncio.run(key_set.refresh())
+
+    for _ in range(3):
+        verify_id_token(sign(signing_key), jwks=key_set, audience=AUDIENCE)
+
+    assert client.calls == 1
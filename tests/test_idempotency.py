@@ -0,0 +1,83 @@
+"""
+Create requests carrying an Idempotency-Key: replays, reuse and concurrent retries.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import func, select
+
+from app.infra.db.database import SessionLocal
+from app.infra.db.models import Donation
+from app.modules.idempotency.repository import IdempotencyRepository
+
+
+def donations_count() -> int:
+    with SessionLocal() as db:
+        return db.execute(select(func.count()).select_from(Donation)).scalar_one()
+
+
+def post_donation(client, admin, cause_id: int, key: str = "key"):
+    return client.post(
+        "/donation/",
+        headers={**admin["headers"], "Idempotency-Key": key},
+        json={"cause_id": cause_id},
+    )
+
+
+def test_retry_is_replayed_without_a_second_insert(client, admin, cause):
+    first = post_donation(client, admin, cause["id"])
+    retry = post_donation(client, admin, cause["id"])
+
+    assert first.status_code == retry.status_code == 200
+    assert retry.json()["id"] == first.json()["id"]
+    assert retry.headers["idempotent-replayed"] == "true"
+    assert "idempotent-replayed" not in first.headers
+    assert donations_count() == 1
+
+
+def test_key_reused_with_another_payload_is_rejected(client, admin, cause):
+    other = client.post(
+        "/causes/",
+        headers=admin["headers"],
+        json={
+            "title": "Other",
+            "description": "Description",
+            "payment_link": "https://pay.example.com",
+            "institute_id": admin["institute_id"],
+        },
+    ).json()
+
+    assert post_donation(client, admin, cause["id"]).status_code == 200
+    assert post_donation(client, admin, other["id"]).status_code == 422
+    assert donations_count() == 1
+
+
+def test_concurrent_retries_share_one_insert(client, admin, cause):
+    with ThreadPoolExecutor(max_workers=5) as pool:
+        responses = list(pool.map(lambda _: post_donation(client, admin, cause["id"]), range(5)))
+
+    assert [response.status_code for response in responses] == [200] * 5
+    assert len({response.json()["id"] for response in responses}) == 1
+    assert donations_count() == 1
+
+
+def test_retry_of_a_write_whose_response_was_not_stored_is_not_run_again(
+    client, admin, cause, monkeypatch
+):
+    complete = IdempotencyRepository.complete
+
+    def complete_without_success(self, scope, key, status_code, response):
+        if status_code == 200:
+            raise RuntimeError("database unavailable")
+        complete(self, scope, key, status_code, response)
+
+    monkeypatch.setattr(IdempotencyRepository, "complete", complete_without_success)
+
+    first = post_donation(client, admin, cause["id"])
+    retry = post_donation(client, admin, cause["id"])
+
+    # Releasing the key would let the retry create a second donation
+    assert first.status_code == 200
+    assert retry.status_code == 409
+    assert retry.headers["idempotent-replayed"] == "true"
+    assert donations_count() == 1
@@ -0,0 +1,113 @@
+"""
+Routing of read-only repository methods to read replicas.
+
+Two SQLite databases stand for the primary and the replica; each holds a user
+with its own email, so a query tells which database served it.
+"""
+
+import asyncio
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+from app.infra.db.database import Base
+from app.infra.db.routing import Replica, ReplicaSet, RoutingSession, read_only
+from app.modules.user.models import User
+
+
+class UserEmails:
+    """
+    A repository reading the emails of the users.
+    """
+
+    def __init__(self, db) -> None:
+        self.db = db
+
+    @read_only
+    def read_emails(self) -> list:
+        return self.db.execute(select(User.email)).scalars().all()
+
+    def read_emails_from_primary(self) -> list:
+        return self.db.execute(select(User.email)).scalars().all()
+
+    def add_user(self, email: str) -> None:
+        self.db.add(User(email=email, first_name="New", last_name="User"))
+        self.db.flush()
+
+
+def database(path, email: str):
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.execute(
+            User.__table__.insert().values(email=email, first_name="A", last_name="B")
+        )
+    return engine
+
+
+@pytest.fixture
+def replica(tmp_path):
+    return Replica("replica_0", database(tmp_path / "replica.db", "replica@example.com"))
+
+
+@pytest.fixture
+def session_factory(tmp_path, replica):
+    primary = database(tmp_path / "primary.db", "primary@example.com")
+    return sessionmaker(
+        class_=RoutingSession,
+        bind=primary,
+        expire_on_commit=False,
+        replicas=ReplicaSet([replica], check_interval=10),
+    )
+
+
+def test_read_only_methods_are_served_by_a_replica(session_factory):
+    with session_factory() as db:
+        emails = UserEmails(db)
+
+        assert emails.read_emails() == ["replica@example.com"]
+        assert emails.read_emails_from_primary() == ["primary@example.com"]
+
+
+def test_reads_follow_the_writes_of_the_session(session_factory):
+    with session_factory() as db:
+        emails = UserEmails(db)
+        emails.add_user("new@example.com")
+
+        assert sorted(emails.read_emails()) == ["new@example.com", "primary@example.com"]
+
+    with session_factory() as db:
+        assert UserEmails(db).read_emails() == ["replica@example.com"]
+
+
+def test_unhealthy_replicas_are_skipped(session_factory, replica):
+    replica.healthy = False
+
+    with session_factory() as db:
+        assert UserEmails(db).read_emails() == ["primary@example.com"]
+
+
+def test_failing_replica_is_marked_unhealthy_and_the_read_retried_on_the_primary(
+    session_factory, replica
+):
+    with replica.engine.begin() as connection:
+        connection.exec_driver_sql("DROP TABLE users")
+
+    with session_factory() as db:
+        assert UserEmails(db).read_emails() == ["primary@example.com"]
+    assert not replica.healthy
+
+
+def test_health_checks_track_the_replicas(tmp_path):
+    broken = Replica("broken", create_engine(f"sqlite:///{tmp_path}/missing/replica.db"))
+    replicas = ReplicaSet([broken], check_interval=10)
+
+    asyncio.run(replicas.check())
+    assert not broken.healthy
+    assert replicas.choose() is None
+
+    (tmp_path / "missing").mkdir()
+    asyncio.run(replicas.check())
+    assert broken.healthy
+    assert replicas.choose() is broken
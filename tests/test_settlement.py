@@ -0,0 +1,75 @@
+"""
+Reconciliation of payment settlements, through the API and the command.
+"""
+
+import sys
+
+import pytest
+
+from app.commands import reconcile_payments
+from app.modules.donation.settlement import SettlementReconciliation
+
+
+@pytest.fixture
+def donations(client, admin, cause):
+    """
+    Three unpaid donations to the admin's cause.
+    """
+    response = client.post(
+        "/donation/bulk", headers=admin["headers"], json=[{"cause_id": cause["id"]}] * 3
+    )
+    assert response.status_code == 200, response.text
+    return [donation["id"] for donation in response.json()["created"]]
+
+
+def paid(client, admin) -> list:
+    donations = client.get("/donation/", headers=admin["headers"]).json()["donations"]
+    return sorted(donation["id"] for donation in donations if donation["is_paid"])
+
+
+def test_lines_are_grouped_in_chunks():
+    reconciliation = SettlementReconciliation(chunk_size=2)
+
+    chunks = [reconciliation.add(line) for line in ["id", "1", "", "2", "x", "3"]]
+
+    assert [chunk for chunk in chunks if chunk] == [[1, 2]]
+    assert reconciliation.finish() == [3]
+    assert reconciliation.finish() is None
+    assert reconciliation.report == {"received": 3, "invalid": 1}
+
+
+def test_settlement_is_reconciled_through_the_api(client, admin, donations):
+    first, second, _ = donations
+    body = f"amount,donation_id\n10,{first}\n10,{second}\n10,not-an-id\n10,999999\n10,{first}\n"
+
+    response = client.post("/donation/reconcile", headers=admin["headers"], content=body)
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "received": 4,
+        # The repeated id is matched once
+        "matched": 2,
+        "changed": 2,
+        "missing": 1,
+        "invalid": 1,
+    }
+    assert paid(client, admin) == donations[:2]
+
+
+def test_settlement_without_an_id_column_is_rejected(client, admin, donations):
+    response = client.post("/donation/reconcile", headers=admin["headers"], content="a,b\n1,2\n")
+
+    assert response.status_code == 400
+    assert paid(client, admin) == []
+
+
+def test_settlement_file_is_reconciled_by_the_command(
+    client, admin, donations, tmp_path, monkeypatch
+):
+    settlement = tmp_path / "settlement.txt"
+    settlement.write_text("\ufeff" + "\n".join(str(donation_id) for donation_id in donations))
+    monkeypatch.setattr(sys, "argv", ["reconcile_payments", str(settlement)])
+
+    reconcile_payments.main()
+
+    assert paid(client, admin) == donations
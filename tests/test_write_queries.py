@@ -0,0 +1,75 @@
+"""
+Statements sent to the database by the donation, user and institute writes.
+
+Each write is an INSERT or UPDATE ... RETURNING, plus the bookkeeping statements
+listed in each test, without loading the row first or refreshing it after the
+commit.
+"""
+
+import pytest
+
+from tests.support import count_statements, create_user
+
+
+@pytest.fixture
+def donor(client):
+    user = create_user("donor@example.com")
+    client.get("/user/data/me", headers=user["headers"])
+    return user
+
+
+@pytest.fixture
+def donation(client, donor, cause):
+    response = client.post("/donation/", headers=donor["headers"], json={"cause_id": cause["id"]})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_donation_create_is_one_insert(client, donor, cause):
+    with count_statements() as statements:
+        response = client.post(
+            "/donation/", headers=donor["headers"], json={"cause_id": cause["id"]}
+        )
+
+    assert response.status_code == 200
+    # The INSERT ... RETURNING and the counter upsert
+    assert len(statements) == 2
+    assert statements[0].startswith("INSERT INTO donations")
+
+
+def test_donation_update_is_one_update(client, donor, donation):
+    with count_statements() as statements:
+        response = client.put(
+            f"/donation/{donation['id']}", headers=donor["headers"], json={"is_paid": True}
+        )
+
+    assert response.status_code == 200
+    assert response.json()["is_paid"] is True
+    # The UPDATE ... RETURNING and the counter upsert
+    assert len(statements) == 2
+    assert statements[0].startswith("UPDATE donations")
+
+
+def test_user_update_is_one_update(client, donor):
+    with count_statements() as statements:
+        response = client.put(
+            f"/user/{donor['id']}", headers=donor["headers"], json={"first_name": "Renamed"}
+        )
+
+    assert response.status_code == 200
+    assert response.json()["first_name"] == "Renamed"
+    assert len(statements) == 1
+    assert statements[0].startswith("UPDATE users")
+
+
+def test_institute_update_is_one_guarded_update(client, admin):
+    with count_statements() as statements:
+        response = client.put(
+            f"/institutes/{admin['institute_id']}", headers=admin["headers"], json={"name": "New"}
+        )
+
+    assert response.status_code == 200
+    assert response.json()["name"] == "New"
+    # UPDATE ... WHERE EXISTS (admin) RETURNING, then the admins of the response
+    assert len(statements) == 2
+    assert statements[0].startswith("UPDATE institute")